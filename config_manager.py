@@ -6,6 +6,7 @@ import sys
 import threading
 import platform
 from pathlib import Path
+from storage import atomic_write_json
 from llm_adapters import create_llm_adapter
 from embedding_adapters import create_embedding_adapter
 
@@ -197,8 +198,7 @@ def save_config(config_data: dict, config_file: str = None) -> bool:
         # 确保目录存在
         config_file.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(merged_config, f, ensure_ascii=False, indent=4)
+        atomic_write_json(str(config_file), merged_config, indent=4)
         
         # 添加日志以验证保存内容
         print(f"配置已保存到: {config_file}")
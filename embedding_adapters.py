@@ -3,8 +3,12 @@
 import logging
 import traceback
 from typing import List
-import requests
-from langchain_openai import AzureOpenAIEmbeddings, OpenAIEmbeddings
+from lazy_import import lazy_module, lazy_attr
+
+# 首次创建对应适配器时才导入
+requests = lazy_module("requests")
+AzureOpenAIEmbeddings = lazy_attr("langchain_openai", "AzureOpenAIEmbeddings")
+OpenAIEmbeddings = lazy_attr("langchain_openai", "OpenAIEmbeddings")
 
 def ensure_openai_base_url_has_v1(url: str) -> str:
     """
@@ -0,0 +1,96 @@
+# lazy_import.py
+# -*- coding: utf-8 -*-
+"""
+延迟导入
+
+LLM/向量库相关的依赖（langchain、chromadb、google.generativeai、azure、nltk、sklearn 等）导入耗时以秒计，
+而用户可能几分钟后才会用到。这里的代理对象在首次访问属性或被调用时才真正导入，
+模块顶层可以照常写 `ChatOpenAI = lazy_attr("langchain_openai", "ChatOpenAI")`，启动时不付出导入代价。
+"""
+import sys
+import importlib
+import importlib.util
+import threading
+import types
+from typing import Any, Iterable, List
+
+_import_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """首次访问属性时才导入的模块代理"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with _import_lock:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self) -> List[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+class LazyAttribute:
+    """模块中某个对象（通常是类）的代理，调用或访问其属性时才导入模块"""
+
+    def __init__(self, module_name: str, attr: str):
+        self._module_name = module_name
+        self._attr = attr
+        self._target = None
+
+    def _load(self) -> Any:
+        if self._target is None:
+            with _import_lock:
+                if self._target is None:
+                    self._target = getattr(importlib.import_module(self._module_name), self._attr)
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy '{self._module_name}.{self._attr}'>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """返回模块 name 的延迟代理（已导入时直接返回模块本身）"""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def lazy_attr(module_name: str, attr: str) -> LazyAttribute:
+    """返回 module_name.attr 的延迟代理"""
+    return LazyAttribute(module_name, attr)
+
+
+def is_available(name: str) -> bool:
+    """不导入模块，只检查其是否已安装"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        # 父包缺失或模块处于半初始化状态
+        return False
+
+
+def missing_modules(names: Iterable[str]) -> List[str]:
+    """返回未安装的模块名列表"""
+    return [name for name in names if not is_available(name)]
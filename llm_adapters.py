@@ -1,17 +1,22 @@
 # llm_adapters.py
 # -*- coding: utf-8 -*-
 import logging
+import threading
 from typing import Optional
-from langchain_openai import ChatOpenAI, AzureChatOpenAI
+from lazy_import import lazy_module, lazy_attr
+
+# 各后端SDK导入较慢，首次创建对应适配器时才导入
+ChatOpenAI = lazy_attr("langchain_openai", "ChatOpenAI")
+AzureChatOpenAI = lazy_attr("langchain_openai", "AzureChatOpenAI")
 # from google import genai
-import google.generativeai as genai
-# from google.genai import types
-from google.generativeai import types
-from azure.ai.inference import ChatCompletionsClient
-from azure.core.credentials import AzureKeyCredential
-from azure.ai.inference.models import SystemMessage, UserMessage
-from openai import OpenAI
-import requests
+genai = lazy_module("google.generativeai")
+ChatCompletionsClient = lazy_attr("azure.ai.inference", "ChatCompletionsClient")
+AzureKeyCredential = lazy_attr("azure.core.credentials", "AzureKeyCredential")
+SystemMessage = lazy_attr("azure.ai.inference.models", "SystemMessage")
+UserMessage = lazy_attr("azure.ai.inference.models", "UserMessage")
+OpenAI = lazy_attr("openai", "OpenAI")
+DefaultHttpxClient = lazy_attr("openai", "DefaultHttpxClient")
+requests = lazy_module("requests")
 
 
 def check_base_url(url: str) -> str:
@@ -33,6 +38,68 @@ def check_base_url(url: str) -> str:
             url = url.rstrip('/') + '/v1'
     return url
 
+# 表示输出达到 max_tokens 被截断的结束原因（OpenAI 兼容接口、Gemini、Azure AI Inference）
+TRUNCATED_FINISH_REASONS = {"length", "max_tokens", "token_limit_reached"}
+
+
+def is_truncated_finish(finish_reason: Optional[str]) -> bool:
+    """结束原因是否表示输出被 max_tokens 截断"""
+    return bool(finish_reason) and finish_reason.lower() in TRUNCATED_FINISH_REASONS
+
+
+def _finish_reason_text(reason) -> Optional[str]:
+    """统一各SDK的结束原因（字符串、str 枚举或 proto 枚举）为字符串"""
+    if reason is None:
+        return None
+    if isinstance(reason, str):
+        return getattr(reason, "value", reason) or None
+    return getattr(reason, "name", None) or str(reason)
+
+
+def _collect_stream(chunks, cancel_token, text_of, finish_of=None) -> tuple:
+    """
+    拼接流式返回的文本；每块检查一次取消令牌，取消后关闭流（释放连接）并返回已收到的部分
+
+    Returns:
+        (文本, 最后一个非空的结束原因)
+    """
+    parts = []
+    finish_reason = None
+    try:
+        for chunk in chunks:
+            parts.append(text_of(chunk) or "")
+            if finish_of is not None:
+                finish_reason = _finish_reason_text(finish_of(chunk)) or finish_reason
+            if cancel_token.is_cancelled:
+                break
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+    return "".join(parts), finish_reason
+
+
+def _delta_text(chunk) -> str:
+    """OpenAI 兼容接口流式块中的文本"""
+    return chunk.choices[0].delta.content if chunk.choices else ""
+
+
+def _delta_finish(chunk):
+    """OpenAI 兼容接口流式块中的结束原因"""
+    return chunk.choices[0].finish_reason if chunk.choices else None
+
+
+def _message_finish(message):
+    """langchain 消息（或流式消息块）中的结束原因"""
+    return (getattr(message, "response_metadata", None) or {}).get("finish_reason")
+
+
+def _gemini_finish(response):
+    """Gemini 响应（或流式块）中的结束原因"""
+    candidates = getattr(response, "candidates", None)
+    return candidates[0].finish_reason if candidates else None
+
+
 class BaseLLMAdapter:
     """
     统一的 LLM 接口基类，为不同后端（OpenAI、Ollama、ML Studio、Gemini等）提供一致的方法签名。
@@ -40,6 +107,44 @@ class BaseLLMAdapter:
     def invoke(self, prompt: str) -> str:
         raise NotImplementedError("Subclasses must implement .invoke(prompt) method.")
 
+    def stream_invoke(self, prompt: str, cancel_token) -> str:
+        """
+        流式调用：每收到一块数据检查一次 cancel_token.is_cancelled，取消后关闭流并返回已收到的部分。
+        不支持流式的后端退化为 invoke()。
+        """
+        return self.invoke(prompt)
+
+    @property
+    def last_finish_reason(self) -> Optional[str]:
+        """
+        当前线程最近一次调用的结束原因（如 "stop"、"length"），后端未提供时为 None。
+        并行生成时多个线程共用一个适配器，因此按线程记录。
+        """
+        return getattr(self._call_state(), "finish_reason", None)
+
+    def _call_state(self) -> threading.local:
+        # 子类不调用基类 __init__，按需创建；dict.setdefault 是原子操作
+        return self.__dict__.setdefault("_thread_state", threading.local())
+
+    def _record_finish_reason(self, reason):
+        self._call_state().finish_reason = _finish_reason_text(reason)
+
+    def _stream(self, chunks, cancel_token, text_of, finish_of=None) -> str:
+        """拼接流式输出并记录结束原因"""
+        text, finish_reason = _collect_stream(chunks, cancel_token, text_of, finish_of)
+        self._record_finish_reason(finish_reason)
+        return text
+
+    def abort(self):
+        """
+        关闭适配器独占的 HTTP 客户端以中断进行中的请求（取消时由其他线程调用，之后适配器不再可用）。
+        langchain 适配器关闭传给 ChatOpenAI 的 httpx 客户端，其他适配器关闭各自 SDK 的客户端。
+        """
+        client = getattr(self, "_http_client", None) or getattr(self, "_client", None)
+        close = getattr(client, "close", None)
+        if callable(close):
+            close()
+
 class DeepSeekAdapter(BaseLLMAdapter):
     """
     适配官方/OpenAI兼容接口（使用 langchain.ChatOpenAI）
@@ -52,7 +157,10 @@ class DeepSeekAdapter(BaseLLMAdapter):
         self.temperature = temperature
         self.timeout = timeout
 
+        # 独占的 HTTP 客户端，取消时由 abort() 关闭以中断进行中的请求
+        self._http_client = DefaultHttpxClient()
         self._client = ChatOpenAI(
+            http_client=self._http_client,
             model=self.model_name,
             api_key=self.api_key,
             base_url=self.base_url,
@@ -63,11 +171,15 @@ class DeepSeekAdapter(BaseLLMAdapter):
 
     def invoke(self, prompt: str) -> str:
         response = self._client.invoke(prompt)
+        self._record_finish_reason(_message_finish(response))
         if not response:
             logging.warning("No response from DeepSeekAdapter.")
             return ""
         return response.content
 
+    def stream_invoke(self, prompt: str, cancel_token) -> str:
+        return self._stream(self._client.stream(prompt), cancel_token, lambda chunk: chunk.content, _message_finish)
+
 class OpenAIAdapter(BaseLLMAdapter):
     """
     适配官方/OpenAI兼容接口（使用 langchain.ChatOpenAI）
@@ -80,7 +192,10 @@ class OpenAIAdapter(BaseLLMAdapter):
         self.temperature = temperature
         self.timeout = timeout
 
+        # 独占的 HTTP 客户端，取消时由 abort() 关闭以中断进行中的请求
+        self._http_client = DefaultHttpxClient()
         self._client = ChatOpenAI(
+            http_client=self._http_client,
             model=self.model_name,
             api_key=self.api_key,
             base_url=self.base_url,
@@ -91,11 +206,15 @@ class OpenAIAdapter(BaseLLMAdapter):
 
     def invoke(self, prompt: str) -> str:
         response = self._client.invoke(prompt)
+        self._record_finish_reason(_message_finish(response))
         if not response:
             logging.warning("No response from OpenAIAdapter.")
             return ""
         return response.content
 
+    def stream_invoke(self, prompt: str, cancel_token) -> str:
+        return self._stream(self._client.stream(prompt), cancel_token, lambda chunk: chunk.content, _message_finish)
+
 class GeminiAdapter(BaseLLMAdapter):
     """
     适配 Google Gemini (Google Generative AI) 接口
@@ -128,6 +247,7 @@ class GeminiAdapter(BaseLLMAdapter):
                 prompt,
                 generation_config=generation_config
             )
+            self._record_finish_reason(_gemini_finish(response))
             
             if response and response.text:
                 return response.text
@@ -138,6 +258,20 @@ class GeminiAdapter(BaseLLMAdapter):
             logging.error(f"Gemini API 调用失败: {e}")
             return ""
 
+    def stream_invoke(self, prompt: str, cancel_token) -> str:
+        try:
+            generation_config = genai.types.GenerationConfig(
+                max_output_tokens=self.max_tokens,
+                temperature=self.temperature,
+            )
+            chunks = self._model.generate_content(prompt, generation_config=generation_config, stream=True)
+            return self._stream(chunks, cancel_token, lambda chunk: chunk.text if chunk.parts else "", _gemini_finish)
+        except Exception as e:
+            if cancel_token.is_cancelled:
+                return ""
+            logging.error(f"Gemini API 调用失败: {e}")
+            return ""
+
 class AzureOpenAIAdapter(BaseLLMAdapter):
     """
     适配 Azure OpenAI 接口（使用 langchain.ChatOpenAI）
@@ -158,7 +292,10 @@ class AzureOpenAIAdapter(BaseLLMAdapter):
         self.temperature = temperature
         self.timeout = timeout
 
+        # 独占的 HTTP 客户端，取消时由 abort() 关闭以中断进行中的请求
+        self._http_client = DefaultHttpxClient()
         self._client = AzureChatOpenAI(
+            http_client=self._http_client,
             azure_endpoint=self.azure_endpoint,
             azure_deployment=self.azure_deployment,
             api_version=self.api_version,
@@ -170,11 +307,15 @@ class AzureOpenAIAdapter(BaseLLMAdapter):
 
     def invoke(self, prompt: str) -> str:
         response = self._client.invoke(prompt)
+        self._record_finish_reason(_message_finish(response))
         if not response:
             logging.warning("No response from AzureOpenAIAdapter.")
             return ""
         return response.content
 
+    def stream_invoke(self, prompt: str, cancel_token) -> str:
+        return self._stream(self._client.stream(prompt), cancel_token, lambda chunk: chunk.content, _message_finish)
+
 class OllamaAdapter(BaseLLMAdapter):
     """
     Ollama 同样有一个 OpenAI-like /v1/chat 接口，可直接使用 ChatOpenAI。
@@ -190,7 +331,10 @@ class OllamaAdapter(BaseLLMAdapter):
         if self.api_key == '':
             self.api_key= 'ollama'
 
+        # 独占的 HTTP 客户端，取消时由 abort() 关闭以中断进行中的请求
+        self._http_client = DefaultHttpxClient()
         self._client = ChatOpenAI(
+            http_client=self._http_client,
             model=self.model_name,
             api_key=self.api_key,
             base_url=self.base_url,
@@ -201,11 +345,15 @@ class OllamaAdapter(BaseLLMAdapter):
 
     def invoke(self, prompt: str) -> str:
         response = self._client.invoke(prompt)
+        self._record_finish_reason(_message_finish(response))
         if not response:
             logging.warning("No response from OllamaAdapter.")
             return ""
         return response.content
 
+    def stream_invoke(self, prompt: str, cancel_token) -> str:
+        return self._stream(self._client.stream(prompt), cancel_token, lambda chunk: chunk.content, _message_finish)
+
 class MLStudioAdapter(BaseLLMAdapter):
     def __init__(self, api_key: str, base_url: str, model_name: str, max_tokens: int, temperature: float = 0.7, timeout: Optional[int] = 600):
         self.base_url = check_base_url(base_url)
@@ -215,7 +363,10 @@ class MLStudioAdapter(BaseLLMAdapter):
         self.temperature = temperature
         self.timeout = timeout
 
+        # 独占的 HTTP 客户端，取消时由 abort() 关闭以中断进行中的请求
+        self._http_client = DefaultHttpxClient()
         self._client = ChatOpenAI(
+            http_client=self._http_client,
             model=self.model_name,
             api_key=self.api_key,
             base_url=self.base_url,
@@ -227,6 +378,7 @@ class MLStudioAdapter(BaseLLMAdapter):
     def invoke(self, prompt: str) -> str:
         try:
             response = self._client.invoke(prompt)
+            self._record_finish_reason(_message_finish(response))
             if not response:
                 logging.warning("No response from MLStudioAdapter.")
                 return ""
@@ -235,6 +387,15 @@ class MLStudioAdapter(BaseLLMAdapter):
             logging.error(f"ML Studio API 调用超时或失败: {e}")
             return ""
 
+    def stream_invoke(self, prompt: str, cancel_token) -> str:
+        try:
+            return self._stream(self._client.stream(prompt), cancel_token, lambda chunk: chunk.content, _message_finish)
+        except Exception as e:
+            if cancel_token.is_cancelled:
+                return ""
+            logging.error(f"ML Studio API 调用超时或失败: {e}")
+            return ""
+
 class AzureAIAdapter(BaseLLMAdapter):
     """
     适配 Azure AI Inference 接口，用于访问Azure AI服务部署的模型
@@ -277,6 +438,7 @@ class AzureAIAdapter(BaseLLMAdapter):
                 ]
             )
             if response and response.choices:
+                self._record_finish_reason(response.choices[0].finish_reason)
                 return response.choices[0].message.content
             else:
                 logging.warning("No response from AzureAIAdapter.")
@@ -285,6 +447,22 @@ class AzureAIAdapter(BaseLLMAdapter):
             logging.error(f"Azure AI Inference API 调用失败: {e}")
             return ""
 
+    def stream_invoke(self, prompt: str, cancel_token) -> str:
+        try:
+            updates = self._client.complete(
+                messages=[
+                    SystemMessage("You are a helpful assistant."),
+                    UserMessage(prompt)
+                ],
+                stream=True
+            )
+            return self._stream(updates, cancel_token, _delta_text, _delta_finish)
+        except Exception as e:
+            if cancel_token.is_cancelled:
+                return ""
+            logging.error(f"Azure AI Inference API 调用失败: {e}")
+            return ""
+
 # 火山引擎实现
 class VolcanoEngineAIAdapter(BaseLLMAdapter):
     def __init__(self, api_key: str, base_url: str, model_name: str, max_tokens: int, temperature: float = 0.7, timeout: Optional[int] = 600):
@@ -313,11 +491,30 @@ class VolcanoEngineAIAdapter(BaseLLMAdapter):
             if not response:
                 logging.warning("No response from DeepSeekAdapter.")
                 return ""
+            self._record_finish_reason(response.choices[0].finish_reason)
             return response.choices[0].message.content
         except Exception as e:
             logging.error(f"火山引擎API调用超时或失败: {e}")
             return ""
 
+    def stream_invoke(self, prompt: str, cancel_token) -> str:
+        try:
+            chunks = self._client.chat.completions.create(
+                model=self.model_name,
+                messages=[
+                    {"role": "system", "content": "你是DeepSeek，是一个 AI 人工智能助手"},
+                    {"role": "user", "content": prompt},
+                ],
+                timeout=self.timeout,
+                stream=True
+            )
+            return self._stream(chunks, cancel_token, _delta_text, _delta_finish)
+        except Exception as e:
+            if cancel_token.is_cancelled:
+                return ""
+            logging.error(f"火山引擎API调用超时或失败: {e}")
+            return ""
+
 class SiliconFlowAdapter(BaseLLMAdapter):
     def __init__(self, api_key: str, base_url: str, model_name: str, max_tokens: int, temperature: float = 0.7, timeout: Optional[int] = 600):
         self.base_url = check_base_url(base_url)
@@ -345,10 +542,29 @@ class SiliconFlowAdapter(BaseLLMAdapter):
             if not response:
                 logging.warning("No response from DeepSeekAdapter.")
                 return ""
+            self._record_finish_reason(response.choices[0].finish_reason)
             return response.choices[0].message.content
         except Exception as e:
             logging.error(f"硅基流动API调用超时或失败: {e}")
             return ""
+
+    def stream_invoke(self, prompt: str, cancel_token) -> str:
+        try:
+            chunks = self._client.chat.completions.create(
+                model=self.model_name,
+                messages=[
+                    {"role": "system", "content": "你是DeepSeek，是一个 AI 人工智能助手"},
+                    {"role": "user", "content": prompt},
+                ],
+                timeout=self.timeout,
+                stream=True
+            )
+            return self._stream(chunks, cancel_token, _delta_text, _delta_finish)
+        except Exception as e:
+            if cancel_token.is_cancelled:
+                return ""
+            logging.error(f"硅基流动API调用超时或失败: {e}")
+            return ""
 # grok實現
 class GrokAdapter(BaseLLMAdapter):
     """
@@ -381,6 +597,7 @@ class GrokAdapter(BaseLLMAdapter):
                 timeout=self.timeout
             )
             if response and response.choices:
+                self._record_finish_reason(response.choices[0].finish_reason)
                 return response.choices[0].message.content
             else:
                 logging.warning("No response from GrokAdapter.")
@@ -389,6 +606,26 @@ class GrokAdapter(BaseLLMAdapter):
             logging.error(f"Grok API 调用失败: {e}")
             return ""
 
+    def stream_invoke(self, prompt: str, cancel_token) -> str:
+        try:
+            chunks = self._client.chat.completions.create(
+                model=self.model_name,
+                messages=[
+                    {"role": "system", "content": "You are Grok, created by xAI."},
+                    {"role": "user", "content": prompt},
+                ],
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                timeout=self.timeout,
+                stream=True
+            )
+            return self._stream(chunks, cancel_token, _delta_text, _delta_finish)
+        except Exception as e:
+            if cancel_token.is_cancelled:
+                return ""
+            logging.error(f"Grok API 调用失败: {e}")
+            return ""
+
 def create_llm_adapter(
     interface_format: str,
     base_url: str,
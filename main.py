@@ -22,6 +22,7 @@ from PySide6.QtGui import QIcon
 # 导入自定义模块
 from ui_qt import setup_application, MainWindow
 from config_manager import load_config
+from lazy_import import missing_modules as find_missing_modules
 
 # 设置日志
 def setup_logging():
@@ -62,12 +63,8 @@ def check_dependencies():
         'transformers', 'torch', 'sentence_transformers'
     ]
 
-    missing_modules = []
-    for module in required_modules:
-        try:
-            __import__(module)
-        except ImportError:
-            missing_modules.append(module)
+    # 只检查是否已安装，不在启动时导入（这些库要到首次使用时才由 lazy_import 导入）
+    missing_modules = find_missing_modules(required_modules)
 
     if missing_modules:
         logging.error(f"缺少依赖模块: {', '.join(missing_modules)}")
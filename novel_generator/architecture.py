@@ -7,7 +7,9 @@ import os
 import json
 import logging
 import traceback
-from novel_generator.common import invoke_with_cleaning
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Optional
+from novel_generator.common import invoke_with_cleaning, CancellationToken
 from llm_adapters import create_llm_adapter
 from prompt_definitions import (
     core_seed_prompt,
@@ -23,7 +25,9 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
 )
-from utils import clear_file_content, save_string_to_txt
+from utils import save_string_to_txt, save_strings_to_txt_atomic
+from storage import atomic_write_json
+from novel_generator.character_state_store import CharacterStateStore
 
 def load_partial_architecture_data(filepath: str) -> dict:
     """
@@ -47,11 +51,69 @@ def save_partial_architecture_data(filepath: str, data: dict):
     """
     partial_file = os.path.join(filepath, "partial_architecture.json")
     try:
-        with open(partial_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        atomic_write_json(partial_file, data)
     except Exception as e:
         logging.warning(f"Failed to save partial_architecture.json: {e}")
 
+class ArchitectureNode:
+    """架构生成图中的一个节点：结果写入 partial_data[key]，依赖 deps 中的节点先完成"""
+
+    def __init__(self, key: str, deps: tuple, run):
+        self.key = key
+        self.deps = deps
+        self.run = run
+
+
+def run_architecture_graph(nodes: list, partial_data: dict, filepath: str, max_workers: int = 3) -> bool:
+    """
+    按依赖关系并行执行架构生成节点，每个节点完成后立即写入 partial_architecture.json。
+    已在 partial_data 中的节点直接跳过；某个节点失败（返回空或抛出异常）后不再启动新节点，
+    等待正在运行的节点结束并保存其结果，下次调用时从断点继续。
+
+    Returns:
+        全部节点是否完成；节点抛出的异常会在保存检查点后重新抛出
+    """
+    pending = [node for node in nodes if node.key not in partial_data]
+    for node in nodes:
+        if node.key in partial_data:
+            logging.info(f"{node.key} already done. Skipping...")
+
+    failed = False
+    error = None
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="architecture") as executor:
+        while pending or running:
+            if not failed:
+                for node in [n for n in pending if all(dep in partial_data for dep in n.deps)]:
+                    pending.remove(node)
+                    running[executor.submit(node.run)] = node
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logging.error(f"{node.key} generation failed: {e}")
+                    failed = True
+                    error = error or e
+                    continue
+                if not result.strip():
+                    logging.warning(f"{node.key} generation failed and returned empty.")
+                    failed = True
+                    continue
+                # 只在调度线程中修改 partial_data 和写检查点
+                partial_data[node.key] = result
+                save_partial_architecture_data(filepath, partial_data)
+
+    if failed:
+        save_partial_architecture_data(filepath, partial_data)
+    if error is not None:
+        raise error
+    return not failed
+
 def Novel_architecture_generate(
     interface_format: str,
     api_key: str,
@@ -65,21 +127,23 @@ def Novel_architecture_generate(
     user_guidance: str = "",  # 新增参数
     temperature: float = 0.7,
     max_tokens: int = 2048,
-    timeout: int = 600
+    timeout: int = 600,
+    cancel_token: Optional[CancellationToken] = None
 ) -> None:
     """
-    依次调用:
+    按依赖关系调用:
       1. core_seed_prompt
-      2. character_dynamics_prompt
-      3. world_building_prompt
-      4. plot_architecture_prompt
-    若在中间任何一步报错且重试多次失败，则将已经生成的内容写入 partial_architecture.json 并退出；
+      2. character_dynamics_prompt 与 3. world_building_prompt（均只依赖核心种子，并行执行）
+      4. plot_architecture_prompt（依赖前三步）
+    每一步完成后立即写入 partial_architecture.json；若某一步报错且重试多次失败，则保存已经生成的内容并退出，
     下次调用时可从该步骤继续。
     最终输出 Novel_architecture.txt
 
+    cancel_token 被置位时，进行中的请求立即中断，已完成步骤的检查点保留，随后抛出 OperationCancelled。
+
     新增：
     - 在完成角色动力学设定后，依据该角色体系，使用 create_character_state_prompt 生成初始角色状态表，
-      并存储到 character_state.txt，后续维护更新。
+      并存储到 character_state.txt，后续维护更新。该步骤与世界观、情节架构的生成重叠执行。
     """
     os.makedirs(filepath, exist_ok=True)
     partial_data = load_partial_architecture_data(filepath)
@@ -92,8 +156,7 @@ def Novel_architecture_generate(
         max_tokens=max_tokens,
         timeout=timeout
     )
-    # Step1: 核心种子
-    if "core_seed_result" not in partial_data:
+    def core_seed_node() -> str:
         logging.info("Step1: Generating core_seed_prompt (核心种子) ...")
         prompt_core = core_seed_prompt.format(
             topic=topic,
@@ -102,66 +165,41 @@ def Novel_architecture_generate(
             word_number=word_number,
             user_guidance=user_guidance  # 修复：添加内容指导
         )
-        core_seed_result = invoke_with_cleaning(llm_adapter, prompt_core)
-        if not core_seed_result.strip():
-            logging.warning("core_seed_prompt generation failed and returned empty.")
-            save_partial_architecture_data(filepath, partial_data)
-            return
-        partial_data["core_seed_result"] = core_seed_result
-        save_partial_architecture_data(filepath, partial_data)
-    else:
-        logging.info("Step1 already done. Skipping...")
-    # Step2: 角色动力学
-    if "character_dynamics_result" not in partial_data:
+        return invoke_with_cleaning(llm_adapter, prompt_core, cancel_token=cancel_token)
+
+    def character_dynamics_node() -> str:
         logging.info("Step2: Generating character_dynamics_prompt ...")
         prompt_character = character_dynamics_prompt.format(
             core_seed=partial_data["core_seed_result"].strip(),
             user_guidance=user_guidance
         )
-        character_dynamics_result = invoke_with_cleaning(llm_adapter, prompt_character)
-        if not character_dynamics_result.strip():
-            logging.warning("character_dynamics_prompt generation failed.")
-            save_partial_architecture_data(filepath, partial_data)
-            return
-        partial_data["character_dynamics_result"] = character_dynamics_result
-        save_partial_architecture_data(filepath, partial_data)
-    else:
-        logging.info("Step2 already done. Skipping...")
-    # 生成初始角色状态
-    if "character_dynamics_result" in partial_data and "character_state_result" not in partial_data:
+        return invoke_with_cleaning(llm_adapter, prompt_character, cancel_token=cancel_token)
+
+    def character_state_node() -> str:
         logging.info("Generating initial character state from character dynamics ...")
         prompt_char_state_init = create_character_state_prompt.format(
             character_dynamics=partial_data["character_dynamics_result"].strip()
         )
-        character_state_init = invoke_with_cleaning(llm_adapter, prompt_char_state_init)
-        if not character_state_init.strip():
-            logging.warning("create_character_state_prompt generation failed.")
-            save_partial_architecture_data(filepath, partial_data)
-            return
-        partial_data["character_state_result"] = character_state_init
-        character_state_file = os.path.join(filepath, "character_state.txt")
-        clear_file_content(character_state_file)
-        save_string_to_txt(character_state_init, character_state_file)
-        save_partial_architecture_data(filepath, partial_data)
-        logging.info("Initial character state created and saved.")
-    # Step3: 世界观
-    if "world_building_result" not in partial_data:
+        character_state_init = invoke_with_cleaning(llm_adapter, prompt_char_state_init, cancel_token=cancel_token)
+        if character_state_init.strip():
+            # 初始状态同时写入结构化存储，character_state.txt 为其渲染结果
+            character_state_store = CharacterStateStore.from_text(character_state_init)
+            save_strings_to_txt_atomic({
+                CharacterStateStore.get_store_file(filepath): character_state_store.dumps(),
+                CharacterStateStore.get_text_file(filepath): character_state_store.render()
+            })
+            logging.info("Initial character state created and saved.")
+        return character_state_init
+
+    def world_building_node() -> str:
         logging.info("Step3: Generating world_building_prompt ...")
         prompt_world = world_building_prompt.format(
             core_seed=partial_data["core_seed_result"].strip(),
             user_guidance=user_guidance  # 修复：添加用户指导
         )
-        world_building_result = invoke_with_cleaning(llm_adapter, prompt_world)
-        if not world_building_result.strip():
-            logging.warning("world_building_prompt generation failed.")
-            save_partial_architecture_data(filepath, partial_data)
-            return
-        partial_data["world_building_result"] = world_building_result
-        save_partial_architecture_data(filepath, partial_data)
-    else:
-        logging.info("Step3 already done. Skipping...")
-    # Step4: 三幕式情节
-    if "plot_arch_result" not in partial_data:
+        return invoke_with_cleaning(llm_adapter, prompt_world, cancel_token=cancel_token)
+
+    def plot_arch_node() -> str:
         logging.info("Step4: Generating plot_architecture_prompt ...")
         prompt_plot = plot_architecture_prompt.format(
             core_seed=partial_data["core_seed_result"].strip(),
@@ -169,15 +207,20 @@ def Novel_architecture_generate(
             world_building=partial_data["world_building_result"].strip(),
             user_guidance=user_guidance  # 修复：添加用户指导
         )
-        plot_arch_result = invoke_with_cleaning(llm_adapter, prompt_plot)
-        if not plot_arch_result.strip():
-            logging.warning("plot_architecture_prompt generation failed.")
-            save_partial_architecture_data(filepath, partial_data)
-            return
-        partial_data["plot_arch_result"] = plot_arch_result
-        save_partial_architecture_data(filepath, partial_data)
-    else:
-        logging.info("Step4 already done. Skipping...")
+        return invoke_with_cleaning(llm_adapter, prompt_plot, cancel_token=cancel_token)
+
+    # 依赖关系：世界观只依赖核心种子，可与角色动力学并行；初始角色状态与世界观、情节架构重叠执行
+    architecture_nodes = [
+        ArchitectureNode("core_seed_result", (), core_seed_node),
+        ArchitectureNode("character_dynamics_result", ("core_seed_result",), character_dynamics_node),
+        ArchitectureNode("world_building_result", ("core_seed_result",), world_building_node),
+        ArchitectureNode("character_state_result", ("character_dynamics_result",), character_state_node),
+        ArchitectureNode("plot_arch_result",
+                         ("core_seed_result", "character_dynamics_result", "world_building_result"),
+                         plot_arch_node),
+    ]
+    if not run_architecture_graph(architecture_nodes, partial_data, filepath):
+        return
 
     core_seed_result = partial_data["core_seed_result"]
     character_dynamics_result = partial_data["character_dynamics_result"]
@@ -198,7 +241,6 @@ def Novel_architecture_generate(
     )
 
     arch_file = os.path.join(filepath, "Novel_architecture.txt")
-    clear_file_content(arch_file)
     save_string_to_txt(final_content, arch_file)
     logging.info("Novel_architecture.txt has been generated successfully.")
 
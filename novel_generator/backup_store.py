@@ -0,0 +1,246 @@
+# novel_generator/backup_store.py
+# -*- coding: utf-8 -*-
+"""
+内容寻址的增量备份
+
+备份目录结构：
+    objects/ab/cdef...   按 SHA-256 存放的文件内容，相同内容只存一份
+    snapshots/<id>.json  每次快照的清单：相对路径 -> 哈希、大小、mtime
+
+创建快照时，大小和 mtime 与上一份清单一致的文件直接沿用其哈希，不再读取；
+只有新增或修改过的文件才会被读取并写入对象库，因此每次备份只写入变化的章节。
+备份目录自身、旧的整目录备份以及（默认）向量库不进入快照。
+
+恢复在目标目录内逐个文件进行：内容有变化的文件原子写回，快照中没有的文件删除，
+目标目录本身（权限、监视它的进程、打开的句柄）保持不变；快照之后新建的章节和文件不会残留。
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from storage import atomic_write, atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+OBJECTS_DIR = "objects"
+SNAPSHOTS_DIR = "snapshots"
+
+# 不参与快照的目录名
+EXCLUDED_DIRS = {"backup", "backups", "__pycache__"}
+VECTORSTORE_DIR = "vectorstore"
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BackupStore:
+    """一个备份目录"""
+
+    def __init__(self, backup_dir: str):
+        """
+        Args:
+            backup_dir: 备份目录
+        """
+        self.backup_dir = os.path.abspath(str(backup_dir))
+        self.objects_dir = os.path.join(self.backup_dir, OBJECTS_DIR)
+        self.snapshots_dir = os.path.join(self.backup_dir, SNAPSHOTS_DIR)
+
+    # ========== 对象库 ==========
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def _store_object(self, source_path: str, digest: str) -> bool:
+        """对象不存在时写入，返回是否实际写入"""
+        target = self._object_path(digest)
+        if os.path.exists(target):
+            return False
+        with open(source_path, "rb") as f:
+            atomic_write(target, f.read())
+        return True
+
+    # ========== 快照 ==========
+
+    def list_snapshots(self) -> List[str]:
+        """按时间顺序返回所有快照编号"""
+        if not os.path.isdir(self.snapshots_dir):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.snapshots_dir) if name.endswith(".json"))
+
+    def load_manifest(self, snapshot_id: str) -> Dict[str, Any]:
+        with open(os.path.join(self.snapshots_dir, f"{snapshot_id}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _excluded_dirs(include_vectorstore: bool) -> set:
+        excluded_dirs = set(EXCLUDED_DIRS)
+        if not include_vectorstore:
+            excluded_dirs.add(VECTORSTORE_DIR)
+        return excluded_dirs
+
+    def _is_excluded_dir(self, path: str, excluded_dirs: set) -> bool:
+        return os.path.basename(path) in excluded_dirs or os.path.abspath(path) == self.backup_dir
+
+    def _iter_project_files(self, project_path: str, include_vectorstore: bool,
+                            excluded_files: Iterable[str]) -> Iterable[str]:
+        """遍历需要备份的文件，返回相对路径（统一用 / 分隔）"""
+        excluded_dirs = self._excluded_dirs(include_vectorstore)
+        excluded_files = set(excluded_files)
+
+        for root, dirs, files in os.walk(project_path):
+            dirs[:] = [d for d in dirs if not self._is_excluded_dir(os.path.join(root, d), excluded_dirs)]
+            for name in files:
+                # 原子写入残留的临时文件不备份
+                if name.startswith(".") and name.endswith(".tmp"):
+                    continue
+                rel = os.path.relpath(os.path.join(root, name), project_path).replace(os.sep, "/")
+                if rel not in excluded_files:
+                    yield rel
+
+    def create_snapshot(self, project_path: str, include_vectorstore: bool = False,
+                        extra_files: Optional[Dict[str, str]] = None,
+                        excluded_files: Iterable[str] = ()) -> str:
+        """
+        创建一次增量快照
+
+        Args:
+            project_path: 项目目录
+            include_vectorstore: 是否备份向量库目录
+            extra_files: 额外加入快照的文件 {快照内相对路径: 实际文件路径}（如数据库的在线备份）
+            excluded_files: 不备份的相对路径
+
+        Returns:
+            快照编号
+        """
+        project_path = os.path.abspath(str(project_path))
+        snapshots = self.list_snapshots()
+        previous = self.load_manifest(snapshots[-1])["files"] if snapshots else {}
+
+        files: Dict[str, Dict[str, Any]] = {}
+        written = 0
+        sources = {rel: os.path.join(project_path, rel)
+                   for rel in self._iter_project_files(project_path, include_vectorstore, excluded_files)}
+        sources.update(extra_files or {})
+
+        for rel, path in sorted(sources.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            old = previous.get(rel)
+            if (old and old["size"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns
+                    and os.path.exists(self._object_path(old["hash"]))):
+                digest = old["hash"]
+            else:
+                digest = _hash_file(path)
+                if self._store_object(path, digest):
+                    written += 1
+            files[rel] = {"hash": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+        snapshot_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        atomic_write_json(os.path.join(self.snapshots_dir, f"{snapshot_id}.json"), {
+            "id": snapshot_id,
+            "created": datetime.now().isoformat(),
+            "source": project_path,
+            "include_vectorstore": include_vectorstore,
+            "files": files,
+        })
+        logger.info(f"快照 {snapshot_id} 已创建：{len(files)} 个文件，新写入 {written} 个对象")
+        return snapshot_id
+
+    # ========== 恢复 ==========
+
+    def restore_snapshot(self, snapshot_id: str, target_path: str) -> int:
+        """
+        把快照恢复到目标目录，恢复后目标目录与快照一致：
+          1. 先确认快照引用的对象都在，缺失时不做任何修改
+          2. 内容与快照不同的文件从对象库原子写回（内容未变的文件不动）
+          3. 删除快照中没有的文件（快照之后新建的章节、数据库的 -wal/-shm 等），
+             不进入快照的目录（备份、未备份的向量库等）保持原样
+        目标目录本身不被替换，每个文件单独原子写入；中途失败时可再次恢复同一快照完成剩余文件。
+
+        Returns:
+            从对象库写入的文件数
+        """
+        manifest = self.load_manifest(snapshot_id)
+        target_path = os.path.abspath(str(target_path))
+        files = manifest["files"]
+
+        for rel, entry in files.items():
+            if not os.path.exists(self._object_path(entry["hash"])):
+                raise FileNotFoundError(f"备份对象缺失: {rel} ({entry['hash']})")
+
+        os.makedirs(target_path, exist_ok=True)
+        restored = 0
+        for rel, entry in files.items():
+            target = os.path.join(target_path, *rel.split("/"))
+            if os.path.isfile(target) and os.path.getsize(target) == entry["size"] \
+                    and _hash_file(target) == entry["hash"]:
+                continue
+            with open(self._object_path(entry["hash"]), "rb") as f:
+                atomic_write(target, f.read())
+            restored += 1
+
+        removed = self._remove_unlisted(target_path, set(files),
+                                        self._excluded_dirs(manifest.get("include_vectorstore", False)))
+        logger.info(f"快照 {snapshot_id} 已恢复到 {target_path}，写入 {restored} 个文件，删除 {removed} 个文件")
+        return restored
+
+    def _remove_unlisted(self, target_path: str, listed: set, excluded_dirs: set) -> int:
+        """删除目标目录中快照没有的文件和由此变空的目录，跳过不进入快照的目录，返回删除的文件数"""
+        removed = 0
+        visited = []
+        for root, dirs, files in os.walk(target_path):
+            dirs[:] = [d for d in dirs if not self._is_excluded_dir(os.path.join(root, d), excluded_dirs)]
+            visited.append(root)
+            for name in files:
+                rel = os.path.relpath(os.path.join(root, name), target_path).replace(os.sep, "/")
+                if rel not in listed:
+                    os.remove(os.path.join(root, name))
+                    removed += 1
+        for directory in reversed(visited[1:]):
+            if not os.listdir(directory):
+                os.rmdir(directory)
+        return removed
+
+    # ========== 清理 ==========
+
+    def prune(self, keep: int) -> int:
+        """
+        只保留最近 keep 个快照，并删除不再被引用的对象
+
+        Returns:
+            删除的对象数
+        """
+        snapshots = self.list_snapshots()
+        for snapshot_id in snapshots[:max(0, len(snapshots) - max(keep, 0))]:
+            os.remove(os.path.join(self.snapshots_dir, f"{snapshot_id}.json"))
+
+        referenced = set()
+        for snapshot_id in self.list_snapshots():
+            referenced.update(entry["hash"] for entry in self.load_manifest(snapshot_id)["files"].values())
+
+        removed = 0
+        if os.path.isdir(self.objects_dir):
+            for prefix in os.listdir(self.objects_dir):
+                prefix_dir = os.path.join(self.objects_dir, prefix)
+                for name in os.listdir(prefix_dir):
+                    if prefix + name not in referenced:
+                        os.remove(os.path.join(prefix_dir, name))
+                        removed += 1
+                if not os.listdir(prefix_dir):
+                    os.rmdir(prefix_dir)
+        logger.info(f"备份清理完成：保留 {min(keep, len(snapshots))} 个快照，删除 {removed} 个对象")
+        return removed
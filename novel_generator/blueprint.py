@@ -5,11 +5,23 @@
 """
 import os
 import re
+import json
+import math
+import hashlib
 import logging
-from novel_generator.common import invoke_with_cleaning
-from llm_adapters import create_llm_adapter
-from prompt_definitions import chapter_blueprint_prompt, chunked_chapter_blueprint_prompt
-from utils import read_file, clear_file_content, save_string_to_txt
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from novel_generator.common import invoke_with_cleaning, CancellationToken
+from llm_adapters import create_llm_adapter, is_truncated_finish
+from prompt_definitions import (
+    chapter_blueprint_prompt,
+    chunked_chapter_blueprint_prompt,
+    blueprint_arc_outline_prompt,
+    arc_chapter_blueprint_prompt
+)
+from novel_generator.token_utils import calculate_tokens
+from utils import read_file, clear_file_content, save_string_to_txt, save_strings_to_txt_atomic
 logging.basicConfig(
     filename='app.log',      # 日志文件名
     filemode='a',            # 追加模式（'w' 会覆盖）
@@ -17,14 +29,18 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
 )
-def compute_chunk_size(number_of_chapters: int, max_tokens: int) -> int:
+DEFAULT_TOKENS_PER_CHAPTER = 200.0
+TARGET_OUTPUT_SHARE = 0.8  # 分块输出占 max_tokens 的目标比例
+
+
+def compute_chunk_size(number_of_chapters: int, max_tokens: int,
+                       tokens_per_chapter: float = DEFAULT_TOKENS_PER_CHAPTER) -> int:
     """
-    基于“每章约100 tokens”的粗略估算，
+    基于“每章约200 tokens”的粗略估算，
     再结合当前max_tokens，计算分块大小：
-      chunk_size = (floor(max_tokens/100/10)*10) - 10
+      chunk_size = (floor(max_tokens/200/10)*10) - 10
     并确保 chunk_size 不会小于1或大于实际章节数。
     """
-    tokens_per_chapter = 200.0
     ratio = max_tokens / tokens_per_chapter
     ratio_rounded_to_10 = int(ratio // 10) * 10
     chunk_size = ratio_rounded_to_10 - 10
@@ -47,6 +63,483 @@ def limit_chapter_blueprint(blueprint_text: str, limit_chapters: int = 100) -> s
     selected = chapters[-limit_chapters:]
     return "\n\n".join(selected).strip()
 
+# ========== 自适应分块 ==========
+
+_CHAPTER_LINE = re.compile(r"^\s*第\s*(\d+)\s*章", re.MULTILINE)
+
+
+class BlueprintChunkSizer:
+    """
+    根据已完成分块实测的每章token数调整分块大小，使输出约占 max_tokens 的 TARGET_OUTPUT_SHARE。
+    并行模式下多个线程共用一个实例。
+    """
+
+    def __init__(self, number_of_chapters: int, max_tokens: int, interface_format: str = "openai",
+                 model: str = "gpt-3.5-turbo"):
+        self.max_tokens = max_tokens
+        self.initial_size = compute_chunk_size(number_of_chapters, max_tokens)
+        self.provider = interface_format.strip().lower()
+        self.model = model
+        self.measured_tokens = 0
+        self.measured_chapters = 0
+        self._lock = threading.Lock()
+
+    @property
+    def tokens_per_chapter(self) -> float:
+        if not self.measured_chapters:
+            return DEFAULT_TOKENS_PER_CHAPTER
+        return self.measured_tokens / self.measured_chapters
+
+    def record(self, chunk_text: str, chapter_count: int):
+        """记录一个分块的实际输出"""
+        if chapter_count <= 0 or not chunk_text:
+            return
+        tokens = calculate_tokens(chunk_text, self.provider, self.model)
+        with self._lock:
+            self.measured_tokens += tokens
+            self.measured_chapters += chapter_count
+        logging.info(f"Blueprint output measured at {self.tokens_per_chapter:.0f} tokens per chapter.")
+
+    def next_size(self, remaining: int) -> int:
+        """下一个分块的章节数（不超过 remaining）"""
+        with self._lock:
+            if self.measured_chapters:
+                size = int(self.max_tokens * TARGET_OUTPUT_SHARE / self.tokens_per_chapter)
+            else:
+                size = self.initial_size
+        return max(1, min(size, remaining))
+
+
+# 章节目录每章必须包含的字段（与各蓝图提示词的输出格式一致）
+BLUEPRINT_FIELDS = ("本章定位", "核心作用", "悬念密度", "伏笔操作", "认知颠覆", "本章简述")
+# 字段行前允许的树形/列表前缀（"├── "、"└── "、"- "、"* " 等）和加粗标记
+_FIELD_PREFIX = r"^[\s├└│─\-*•·]*(?:\*\*)?"
+# 输出 token 达到 max_tokens 的这个比例时，即使后端没有提供结束原因也视为被截断
+TRUNCATION_TOKEN_SHARE = 0.95
+
+
+def is_complete_chapter_block(block: str) -> bool:
+    """
+    结构检查（后端没有提供结束原因时使用）：格式要求的字段是否都有内容。
+    输出被 max_tokens 截断时，最后一章通常缺少后面的字段；字段行可带树形或列表前缀，不要求句末标点。
+    """
+    return all(
+        re.search(rf"{_FIELD_PREFIX}{field}(?:\*\*)?\s*[：:]\s*\S", block, re.MULTILINE)
+        for field in BLUEPRINT_FIELDS
+    )
+
+
+def split_complete_chapters(chunk_text: str, n: int, m: int,
+                            truncated: Optional[bool] = None) -> Tuple[str, int]:
+    """
+    去掉分块输出中被截断的最后一章，由下一个分块从该章重新生成（章节目录只追加，不完整的条目写入后就无法修正）。
+
+    Args:
+        truncated: 输出是否被 max_tokens 截断（来自结束原因或输出 token 数）；
+                   None 表示无法判断，此时用 is_complete_chapter_block 检查最后一章
+
+    Returns:
+        (完整章节文本, 最后一个完整章节号)；一章都不完整时返回 ("", n - 1)
+    """
+    matches = list(_CHAPTER_LINE.finditer(chunk_text))
+    if not matches:
+        return "", n - 1
+    numbers = [int(match.group(1)) for match in matches]
+    if truncated is None:
+        truncated = not is_complete_chapter_block(chunk_text[matches[-1].start():])
+    if not truncated:
+        return chunk_text.strip(), max(numbers)
+    if len(matches) < 2:
+        return "", n - 1
+    return chunk_text[:matches[-1].start()].strip(), max(numbers[:-1])
+
+
+def output_truncated(llm_adapter, text: str, max_tokens: int, interface_format: str = "openai",
+                     model: str = "gpt-3.5-turbo") -> Optional[bool]:
+    """
+    判断刚完成的一次调用是否被 max_tokens 截断：
+    优先使用后端返回的结束原因；没有结束原因时，输出 token 数接近 max_tokens 视为截断；
+    否则返回 None，由调用方做结构检查。
+    """
+    finish_reason = getattr(llm_adapter, "last_finish_reason", None)
+    if finish_reason:
+        return is_truncated_finish(finish_reason)
+    if max_tokens > 0 and calculate_tokens(text, interface_format, model) >= max_tokens * TRUNCATION_TOKEN_SHARE:
+        return True
+    return None
+
+
+def generate_blueprint_chunk(llm_adapter, build_prompt, start: int, limit_end: int,
+                             sizer: BlueprintChunkSizer,
+                             cancel_token: Optional[CancellationToken] = None) -> Tuple[str, int]:
+    """
+    从第 start 章开始生成一个分块（不超过第 limit_end 章），分块大小由 sizer 决定。
+    输出被 max_tokens 截断时保留完整的章节；一章都不完整时把分块减半重试。
+
+    Args:
+        build_prompt: (n, m) -> 生成第n到第m章的提示词
+
+    Returns:
+        (分块文本, 最后一章)；生成结果为空时返回 ("", start - 1)
+    """
+    size = sizer.next_size(limit_end - start + 1)
+    while True:
+        end = start + size - 1
+        logging.info(f"Generating chapters [{start}..{end}] in a chunk...")
+        chunk_result = invoke_with_cleaning(llm_adapter, build_prompt(start, end), cancel_token=cancel_token)
+        if not chunk_result.strip():
+            logging.warning(f"Chunk generation for chapters [{start}..{end}] is empty.")
+            return "", start - 1
+
+        truncated = output_truncated(llm_adapter, chunk_result, sizer.max_tokens, sizer.provider, sizer.model)
+        complete_text, last_chapter = split_complete_chapters(chunk_result, start, end, truncated)
+        if complete_text:
+            if last_chapter < end:
+                logging.warning(f"Chunk [{start}..{end}] was truncated, keeping chapters [{start}..{last_chapter}].")
+            sizer.record(complete_text, last_chapter - start + 1)
+            return complete_text, last_chapter
+        if size == 1:
+            # 无法再拆分，按原样接受
+            logging.warning(f"Chapter {start} output looks incomplete, keeping it as is.")
+            return chunk_result.strip(), start
+        size = max(1, size // 2)
+        logging.warning(f"Chunk [{start}..{end}] was truncated before any complete chapter, retrying with {size} chapters.")
+
+
+# ========== 并行分块模式 ==========
+
+ARC_OUTLINE_FILE = "Novel_arc_outline.txt"
+TOKENS_PER_ARC_OUTLINE = 250  # 篇章大纲中每个篇章约占的输出token
+_CHAPTER_HEADING = re.compile(r"第\s*(\d+)\s*章")
+_ARC_HEADING = re.compile(r"第\s*(\d+)\s*[-－~～至到]\s*(\d+)\s*章")
+
+
+def plan_arc_ranges(number_of_chapters: int, chunk_size: int, max_tokens: int) -> List[Tuple[int, int]]:
+    """
+    划分篇章：默认每个篇章一个分块；篇章过多以致大纲无法一次生成时，加大篇章长度，
+    篇章内再按分块顺序生成。
+    """
+    max_arcs = max(1, max_tokens // TOKENS_PER_ARC_OUTLINE)
+    arc_size = max(chunk_size, math.ceil(number_of_chapters / max_arcs))
+    return [
+        (start, min(start + arc_size - 1, number_of_chapters))
+        for start in range(1, number_of_chapters + 1, arc_size)
+    ]
+
+
+def parse_arc_outline(outline_text: str) -> Dict[Tuple[int, int], str]:
+    """解析篇章大纲，返回 {(起始章, 结束章): 篇章大纲文本}"""
+    arcs = {}
+    matches = list(_ARC_HEADING.finditer(outline_text))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(outline_text)
+        arcs[(int(match.group(1)), int(match.group(2)))] = outline_text[match.start():end].strip()
+    return arcs
+
+
+def _arc_field(arc_text: str, field: str) -> str:
+    match = re.search(rf"{field}[：:]\s*(.+)", arc_text)
+    return match.group(1).strip() if match else ""
+
+
+def last_chapter_block(blueprint_text: str) -> str:
+    """取章节目录中的最后一章，作为下一分块的衔接边界"""
+    matches = list(_CHAPTER_HEADING.finditer(blueprint_text))
+    return blueprint_text[matches[-1].start():].strip() if matches else ""
+
+
+# ========== 追加写入与检查点 ==========
+
+BLUEPRINT_FILE = "Novel_directory.txt"
+BLUEPRINT_CHECKPOINT_FILE = "blueprint_checkpoint.json"
+BLUEPRINT_TAIL_BYTES = 128 * 1024  # 续写时读取的文件末尾长度，足够容纳最近100章目录
+
+
+BLUEPRINT_CHECKPOINT_DIGEST_BYTES = 4096  # 检查点记录偏移量之前这么多字节的摘要
+
+
+def blueprint_prefix_digest(filename_dir: str, offset: int) -> str:
+    """文件中 offset 之前最后 BLUEPRINT_CHECKPOINT_DIGEST_BYTES 字节的 sha256，用于确认检查点仍与文件一致"""
+    with open(filename_dir, "rb") as f:
+        start = max(0, offset - BLUEPRINT_CHECKPOINT_DIGEST_BYTES)
+        f.seek(start)
+        data = f.read(offset - start)
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_blueprint_checkpoint(filepath: str) -> Tuple[int, int, str, Optional[dict]]:
+    """
+    读取检查点，返回 (已生成的最后一章, 对应的文件字节数, 偏移量之前内容的摘要, 正在追加的分块)；
+    无检查点时返回 (0, -1, "", None)。正在追加的分块为 {"start", "end", "last_chapter"}，没有时为 None。
+    """
+    checkpoint_file = os.path.join(filepath, BLUEPRINT_CHECKPOINT_FILE)
+    if not os.path.exists(checkpoint_file):
+        return 0, -1, "", None
+    try:
+        with open(checkpoint_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        pending = data.get("pending")
+        if pending is not None:
+            pending = {key: int(pending[key]) for key in ("start", "end", "last_chapter")}
+        return (int(data.get("last_chapter", 0)), int(data.get("offset", -1)),
+                str(data.get("digest", "")), pending)
+    except Exception as e:
+        logging.warning(f"Failed to load {BLUEPRINT_CHECKPOINT_FILE}: {e}")
+        return 0, -1, "", None
+
+
+def save_blueprint_checkpoint(filepath: str, last_chapter: int, offset: int, pending: Optional[dict] = None):
+    """
+    保存检查点。追加分块前先以 pending 记录该分块的起止字节位置，
+    中断后续写时只截断确实属于这个未写完分块的字节。
+    """
+    filename_dir = os.path.join(filepath, BLUEPRINT_FILE)
+    data = {
+        "last_chapter": last_chapter,
+        "offset": offset,
+        "digest": blueprint_prefix_digest(filename_dir, offset)
+    }
+    if pending is not None:
+        data["pending"] = pending
+    save_strings_to_txt_atomic({
+        os.path.join(filepath, BLUEPRINT_CHECKPOINT_FILE): json.dumps(data, ensure_ascii=False)
+    })
+
+
+def resume_blueprint(filepath: str) -> int:
+    """
+    根据检查点确定续写位置，返回已生成的最后一章。
+    检查点记录了偏移量之前最后一段内容的摘要，只有文件在该位置之前的内容与摘要一致时才采用检查点：
+      - 文件长度等于检查点记录：直接采用
+      - 文件比检查点长，且多出的字节恰好落在检查点记录的未写完分块范围内：
+        分块已完整写入则采用它，否则视为追加中途被中断，截断到分块起点
+    其余情况（没有检查点、文件变短、检查点之前的内容被手动修改、检查点之后有来历不明的内容）
+    扫描一次全文并重建检查点，不截断文件。
+    """
+    filename_dir = os.path.join(filepath, BLUEPRINT_FILE)
+    if not os.path.exists(filename_dir):
+        open(filename_dir, "w", encoding="utf-8").close()
+    size = os.path.getsize(filename_dir)
+    last_chapter, offset, digest, pending = load_blueprint_checkpoint(filepath)
+
+    if 0 <= offset <= size and digest and blueprint_prefix_digest(filename_dir, offset) == digest:
+        if offset == size:
+            if pending is not None:
+                save_blueprint_checkpoint(filepath, last_chapter, offset)
+            return last_chapter
+        if pending is not None and pending["start"] == offset and size <= pending["end"]:
+            if size == pending["end"]:
+                # 分块已完整写入，只是没来得及更新检查点
+                save_blueprint_checkpoint(filepath, pending["last_chapter"], size)
+                return pending["last_chapter"]
+            logging.warning(f"Blueprint file has {size - offset} bytes of an unfinished chunk, truncating interrupted write.")
+            with open(filename_dir, "r+b") as f:
+                f.truncate(offset)
+                f.flush()
+                os.fsync(f.fileno())
+            save_blueprint_checkpoint(filepath, last_chapter, offset)
+            return last_chapter
+        logging.warning(
+            f"Blueprint file has {size - offset} bytes after the checkpoint that were not written by "
+            f"an unfinished chunk (edited manually?), keeping them and rescanning."
+        )
+    elif offset >= 0:
+        logging.warning("Blueprint file no longer matches its checkpoint, rescanning.")
+
+    existing_blueprint = read_file(filename_dir).strip()
+    existing_chapter_numbers = [int(x) for x in _CHAPTER_HEADING.findall(existing_blueprint)]
+    last_chapter = max(existing_chapter_numbers) if existing_chapter_numbers else 0
+    if last_chapter == 0 and size > 0:
+        # 没有任何章节的残留内容，清空后从头生成
+        clear_file_content(filename_dir)
+        size = 0
+    save_blueprint_checkpoint(filepath, last_chapter, size)
+    logging.info(f"Existing blueprint indicates up to chapter {last_chapter} has been generated.")
+    return last_chapter
+
+
+def append_blueprint_chunk(filepath: str, chunk_text: str) -> int:
+    """
+    把一个分块追加到章节目录末尾并 fsync，然后更新检查点；不重写已有内容。
+    追加前先在检查点中记录分块的起止位置，中断后 resume_blueprint 据此只截断这个分块。
+
+    Returns:
+        追加后已生成的最后一章
+    """
+    filename_dir = os.path.join(filepath, BLUEPRINT_FILE)
+    last_chapter, _, _, _ = load_blueprint_checkpoint(filepath)
+    chunk_numbers = [int(x) for x in _CHAPTER_HEADING.findall(chunk_text)]
+    new_last_chapter = max(chunk_numbers + [last_chapter])
+
+    with open(filename_dir, "ab") as f:
+        start = f.seek(0, os.SEEK_END)
+        separator = b"\n\n" if start > 0 else b""
+        data = separator + chunk_text.strip().encode("utf-8")
+        save_blueprint_checkpoint(filepath, last_chapter, start, pending={
+            "start": start,
+            "end": start + len(data),
+            "last_chapter": new_last_chapter
+        })
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+        offset = f.tell()
+    save_blueprint_checkpoint(filepath, new_last_chapter, offset)
+    return new_last_chapter
+
+
+def read_blueprint_tail(filepath: str, max_bytes: int = BLUEPRINT_TAIL_BYTES) -> str:
+    """只读取章节目录末尾（从某一章的开头起），用于续写时的上下文"""
+    filename_dir = os.path.join(filepath, BLUEPRINT_FILE)
+    if not os.path.exists(filename_dir):
+        return ""
+    with open(filename_dir, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - max_bytes))
+        tail = f.read().decode("utf-8", errors="ignore")
+    if size <= max_bytes:
+        return tail.strip()
+    match = _CHAPTER_HEADING.search(tail)
+    return tail[match.start():].strip() if match else ""
+
+
+def _load_or_generate_arc_outline(llm_adapter, filepath: str, architecture_text: str, number_of_chapters: int,
+                                  arc_ranges: List[Tuple[int, int]], user_guidance: str,
+                                  cancel_token: Optional[CancellationToken] = None) -> Dict[Tuple[int, int], str]:
+    """读取已保存的篇章大纲（篇章划分一致时），否则重新生成并保存"""
+    outline_file = os.path.join(filepath, ARC_OUTLINE_FILE)
+    arcs = parse_arc_outline(read_file(outline_file))
+    if arcs and all(arc in arcs for arc in arc_ranges):
+        logging.info(f"Reusing existing arc outline ({len(arcs)} arcs).")
+        return arcs
+
+    logging.info(f"Generating arc outline for {len(arc_ranges)} arcs...")
+    outline_text = invoke_with_cleaning(llm_adapter, blueprint_arc_outline_prompt.format(
+        novel_architecture=architecture_text,
+        number_of_chapters=number_of_chapters,
+        arc_ranges="\n".join(f"第{start}-{end}章" for start, end in arc_ranges),
+        user_guidance=user_guidance
+    ), cancel_token=cancel_token)
+    if not outline_text.strip():
+        return {}
+    save_string_to_txt(outline_text.strip(), outline_file)
+    return parse_arc_outline(outline_text)
+
+
+def generate_blueprint_parallel(
+    llm_adapter,
+    filepath: str,
+    architecture_text: str,
+    number_of_chapters: int,
+    start_chapter: int,
+    chunk_size: int,
+    max_tokens: int,
+    user_guidance: str = "",
+    max_workers: int = 4,
+    sizer: BlueprintChunkSizer = None,
+    cancel_token: Optional[CancellationToken] = None
+) -> bool:
+    """
+    并行分块生成章节目录：
+      1. 先生成（或复用）篇章大纲，每个篇章带“开篇衔接/收尾落点”
+      2. 各篇章并行生成，只依赖本篇章大纲与相邻篇章的边界；篇章内的分块按顺序衔接
+      3. 分块按章节顺序追加到 Novel_directory.txt 并更新检查点，不重写已有内容
+    某个分块失败后不再启动新分块，已连续完成的部分保留在文件中，下次从断点继续。
+
+    Returns:
+        是否生成到了第 number_of_chapters 章
+    """
+    arc_ranges = plan_arc_ranges(number_of_chapters, chunk_size, max_tokens)
+    sizer = sizer or BlueprintChunkSizer(number_of_chapters, max_tokens)
+    arcs = _load_or_generate_arc_outline(
+        llm_adapter, filepath, architecture_text, number_of_chapters, arc_ranges, user_guidance, cancel_token
+    )
+    if not arcs:
+        logging.warning("Arc outline generation failed.")
+        return False
+
+    def arc_text(index: int) -> str:
+        return arcs.get(arc_ranges[index], "") if 0 <= index < len(arc_ranges) else ""
+
+    # 只生成断点之后的篇章（断点所在篇章从断点处开始）
+    jobs = [(i, max(start, start_chapter), end) for i, (start, end) in enumerate(arc_ranges) if end >= start_chapter]
+
+    lock = threading.Lock()
+    stop_event = threading.Event()
+    finished_chunks: Dict[int, List[str]] = {}  # 起始章 -> 已完成的分块
+    arc_done: Dict[int, bool] = {}  # 起始章 -> 篇章是否全部完成
+    job_starts = [job_start for _, job_start, _ in jobs]
+    flushed = {"job": 0, "chunk": 0}
+
+    def flush_in_order():
+        # 按章节顺序把连续完成的分块追加到文件
+        while flushed["job"] < len(job_starts):
+            job_start = job_starts[flushed["job"]]
+            chunks = finished_chunks.get(job_start, [])
+            while flushed["chunk"] < len(chunks):
+                append_blueprint_chunk(filepath, chunks[flushed["chunk"]])
+                flushed["chunk"] += 1
+            if not arc_done.get(job_start):
+                return
+            flushed["job"] += 1
+            flushed["chunk"] = 0
+
+    def run_arc(arc_index: int, job_start: int, job_end: int) -> bool:
+        arc_start, arc_end = arc_ranges[arc_index]
+        if job_start > arc_start:
+            previous_boundary = last_chapter_block(read_blueprint_tail(filepath)) or "（无）"
+        else:
+            previous_boundary = _arc_field(arc_text(arc_index - 1), "收尾落点") or "（本书开篇）"
+
+        def build_prompt(n: int, m: int) -> str:
+            if m == arc_end:
+                next_boundary = _arc_field(arc_text(arc_index + 1), "开篇衔接") or "（全书结束）"
+            else:
+                next_boundary = f"（第{m + 1}章起仍属本篇章，按篇章大纲继续推进）"
+            return arc_chapter_blueprint_prompt.format(
+                novel_architecture=architecture_text,
+                number_of_chapters=number_of_chapters,
+                arc_start=arc_start,
+                arc_end=arc_end,
+                arc_outline=arc_text(arc_index) or "（无篇章大纲，请按小说架构推进）",
+                previous_boundary=previous_boundary,
+                next_boundary=next_boundary,
+                n=n,
+                m=m,
+                user_guidance=user_guidance
+            )
+
+        current_start = job_start
+        while current_start <= job_end:
+            if stop_event.is_set():
+                return False
+            chunk_text, last_chapter = generate_blueprint_chunk(
+                llm_adapter, build_prompt, current_start, job_end, sizer, cancel_token
+            )
+            if not chunk_text:
+                stop_event.set()
+                return False
+            with lock:
+                finished_chunks.setdefault(job_start, []).append(chunk_text)
+                flush_in_order()
+            previous_boundary = last_chapter_block(chunk_text)
+            current_start = last_chapter + 1
+        with lock:
+            arc_done[job_start] = True
+            flush_in_order()
+        return True
+
+    logging.info(f"Generating {len(jobs)} arcs in parallel with {max_workers} workers...")
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="blueprint") as executor:
+        futures = [executor.submit(run_arc, *job) for job in jobs]
+        try:
+            results = [future.result() for future in futures]
+        except Exception:
+            stop_event.set()
+            raise
+
+    return all(results)
+
 def Chapter_blueprint_generate(
     interface_format: str,
     api_key: str,
@@ -57,16 +550,23 @@ def Chapter_blueprint_generate(
     user_guidance: str = "",  # 新增参数
     temperature: float = 0.7,
     max_tokens: int = 4096,
-    timeout: int = 600
+    timeout: int = 600,
+    max_workers: int = 1,
+    cancel_token: Optional[CancellationToken] = None
 ) -> None:
     """
     若 Novel_directory.txt 已存在且内容非空，则表示可能是之前的部分生成结果；
-      解析其中已有的章节数，从下一个章节继续分块生成；
+      根据 blueprint_checkpoint.json 记录的最后一章，从下一个章节继续分块生成；
       对于已有章节目录，传入时仅保留最近100章目录，避免prompt过长。
     否则：
       - 若章节数 <= chunk_size，直接一次性生成
       - 若章节数 > chunk_size，进行分块生成
-    生成完成后输出至 Novel_directory.txt。
+    每个分块生成后追加到 Novel_directory.txt 并 fsync，再更新检查点，写入量与章节数成线性。
+
+    max_workers > 1 且需要分块时，使用并行分块模式（见 generate_blueprint_parallel）：
+    先生成篇章大纲，再按篇章并行生成，分块按顺序追加到文件。
+
+    cancel_token 被置位时，进行中的请求立即中断，已追加的完整分块和检查点保留，随后抛出 OperationCancelled。
     """
     arch_file = os.path.join(filepath, "Novel_architecture.txt")
     if not os.path.exists(arch_file):
@@ -88,92 +588,83 @@ def Chapter_blueprint_generate(
         timeout=timeout
     )
 
-    filename_dir = os.path.join(filepath, "Novel_directory.txt")
-    if not os.path.exists(filename_dir):
-        open(filename_dir, "w", encoding="utf-8").close()
-
-    existing_blueprint = read_file(filename_dir).strip()
-    chunk_size = compute_chunk_size(number_of_chapters, max_tokens)
+    max_existing_chap = resume_blueprint(filepath)
+    sizer = BlueprintChunkSizer(number_of_chapters, max_tokens, interface_format, llm_model)
+    chunk_size = sizer.initial_size
     logging.info(f"Number of chapters = {number_of_chapters}, computed chunk_size = {chunk_size}.")
+    # 续写时以已有目录的实际输出长度作为初始估计
+    recent_blueprint = limit_chapter_blueprint(read_blueprint_tail(filepath), 100)
+    if max_existing_chap > 0:
+        sizer.record(recent_blueprint, len(_CHAPTER_LINE.findall(recent_blueprint)))
+    if max_existing_chap >= number_of_chapters:
+        logging.info("All chapters blueprint have already been generated.")
+        return
 
-    if existing_blueprint:
-        logging.info("Detected existing blueprint content. Will resume chunked generation from that point.")
-        pattern = r"第\s*(\d+)\s*章"
-        existing_chapter_numbers = re.findall(pattern, existing_blueprint)
-        existing_chapter_numbers = [int(x) for x in existing_chapter_numbers if x.isdigit()]
-        max_existing_chap = max(existing_chapter_numbers) if existing_chapter_numbers else 0
-        logging.info(f"Existing blueprint indicates up to chapter {max_existing_chap} has been generated.")
-        final_blueprint = existing_blueprint
-        current_start = max_existing_chap + 1
-        while current_start <= number_of_chapters:
-            current_end = min(current_start + chunk_size - 1, number_of_chapters)
-            limited_blueprint = limit_chapter_blueprint(final_blueprint, 100)
-            chunk_prompt = chunked_chapter_blueprint_prompt.format(
-                novel_architecture=architecture_text,
-                chapter_list=limited_blueprint,
-                number_of_chapters=number_of_chapters,
-                n=current_start,
-                m=current_end,
-                user_guidance=user_guidance  # 新增参数
-            )
-            logging.info(f"Generating chapters [{current_start}..{current_end}] in a chunk...")
-            chunk_result = invoke_with_cleaning(llm_adapter, chunk_prompt)
-            if not chunk_result.strip():
-                logging.warning(f"Chunk generation for chapters [{current_start}..{current_end}] is empty.")
-                clear_file_content(filename_dir)
-                save_string_to_txt(final_blueprint.strip(), filename_dir)
-                return
-            final_blueprint += "\n\n" + chunk_result.strip()
-            clear_file_content(filename_dir)
-            save_string_to_txt(final_blueprint.strip(), filename_dir)
-            current_start = current_end + 1
-
-        logging.info("All chapters blueprint have been generated (resumed chunked).")
+    if max_workers > 1 and chunk_size < number_of_chapters:
+        completed = generate_blueprint_parallel(
+            llm_adapter,
+            filepath,
+            architecture_text,
+            number_of_chapters,
+            start_chapter=max_existing_chap + 1,
+            chunk_size=chunk_size,
+            max_tokens=max_tokens,
+            user_guidance=user_guidance,
+            max_workers=max_workers,
+            sizer=sizer,
+            cancel_token=cancel_token
+        )
+        if completed:
+            logging.info("Novel_directory.txt (chapter blueprint) has been generated successfully (parallel chunked).")
         return
 
-    if chunk_size >= number_of_chapters:
+    if max_existing_chap == 0 and chunk_size >= number_of_chapters:
         prompt = chapter_blueprint_prompt.format(
             novel_architecture=architecture_text,
             number_of_chapters=number_of_chapters,
             user_guidance=user_guidance  # 新增参数
         )
-        blueprint_text = invoke_with_cleaning(llm_adapter, prompt)
+        blueprint_text = invoke_with_cleaning(llm_adapter, prompt, cancel_token=cancel_token)
         if not blueprint_text.strip():
             logging.warning("Chapter blueprint generation result is empty.")
             return
 
-        clear_file_content(filename_dir)
-        save_string_to_txt(blueprint_text, filename_dir)
-        logging.info("Novel_directory.txt (chapter blueprint) has been generated successfully (single-shot).")
-        return
+        truncated = output_truncated(llm_adapter, blueprint_text, max_tokens, interface_format, llm_model)
+        complete_text, max_existing_chap = split_complete_chapters(blueprint_text, 1, number_of_chapters, truncated)
+        if complete_text:
+            append_blueprint_chunk(filepath, complete_text)
+            if max_existing_chap >= number_of_chapters:
+                logging.info("Novel_directory.txt (chapter blueprint) has been generated successfully (single-shot).")
+                return
+            sizer.record(complete_text, max_existing_chap)
+            recent_blueprint = limit_chapter_blueprint(complete_text, 100)
+        # 一次性生成被截断，剩余章节改为分块续写
+        logging.warning(f"Single-shot blueprint was truncated at chapter {max_existing_chap}, continuing in chunks.")
 
-    logging.info("Will generate chapter blueprint in chunked mode from scratch.")
-    final_blueprint = ""
-    current_start = 1
-    while current_start <= number_of_chapters:
-        current_end = min(current_start + chunk_size - 1, number_of_chapters)
-        limited_blueprint = limit_chapter_blueprint(final_blueprint, 100)
-        chunk_prompt = chunked_chapter_blueprint_prompt.format(
+    if max_existing_chap > 0:
+        logging.info("Detected existing blueprint content. Will resume chunked generation from that point.")
+    else:
+        logging.info("Will generate chapter blueprint in chunked mode from scratch.")
+    # 只在内存中保留最近100章作为上下文，不再反复读写整个文件
+    def build_prompt(n: int, m: int) -> str:
+        return chunked_chapter_blueprint_prompt.format(
             novel_architecture=architecture_text,
-            chapter_list=limited_blueprint,
+            chapter_list=recent_blueprint,
             number_of_chapters=number_of_chapters,
-            n=current_start,
-            m=current_end,
+            n=n,
+            m=m,
             user_guidance=user_guidance  # 新增参数
         )
-        logging.info(f"Generating chapters [{current_start}..{current_end}] in a chunk...")
-        chunk_result = invoke_with_cleaning(llm_adapter, chunk_prompt)
-        if not chunk_result.strip():
-            logging.warning(f"Chunk generation for chapters [{current_start}..{current_end}] is empty.")
-            clear_file_content(filename_dir)
-            save_string_to_txt(final_blueprint.strip(), filename_dir)
+
+    current_start = max_existing_chap + 1
+    while current_start <= number_of_chapters:
+        chunk_text, last_chapter = generate_blueprint_chunk(
+            llm_adapter, build_prompt, current_start, number_of_chapters, sizer, cancel_token
+        )
+        if not chunk_text:
             return
-        if final_blueprint.strip():
-            final_blueprint += "\n\n" + chunk_result.strip()
-        else:
-            final_blueprint = chunk_result.strip()
-        clear_file_content(filename_dir)
-        save_string_to_txt(final_blueprint.strip(), filename_dir)
-        current_start = current_end + 1
+        append_blueprint_chunk(filepath, chunk_text)
+        recent_blueprint = limit_chapter_blueprint((recent_blueprint + "\n\n" + chunk_text).strip(), 100)
+        current_start = last_chapter + 1
 
     logging.info("Novel_directory.txt (chapter blueprint) has been generated successfully (chunked).")
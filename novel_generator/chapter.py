@@ -7,6 +7,7 @@ import os
 import json
 import logging
 import re  # 添加re模块导入
+from typing import Optional
 from llm_adapters import create_llm_adapter
 from prompt_definitions import (
     first_chapter_draft_prompt, 
@@ -16,8 +17,12 @@ from prompt_definitions import (
     knowledge_search_prompt
 )
 from novel_generator.chapter_directory_parser import get_chapter_info_from_blueprint
-from novel_generator.common import invoke_with_cleaning
-from utils import read_file, clear_file_content, save_string_to_txt
+from novel_generator.common import invoke_with_cleaning, CancellationToken, OperationCancelled
+from novel_generator.summary_store import load_summary_view
+from novel_generator.character_state_store import load_character_state_view
+from novel_generator.chapter_repository import get_chapter_repository
+from utils import read_file
+from storage import atomic_write_json
 from novel_generator.vectorstore_utils import (
     get_relevant_context_from_vector_store,
     load_vector_store  # 添加导入
@@ -34,16 +39,10 @@ def get_last_n_chapters_text(chapters_dir: str, current_chapter_num: int, n: int
     """
     从目录 chapters_dir 中获取最近 n 章的文本内容，返回文本列表。
     """
-    texts = []
     start_chap = max(1, current_chapter_num - n)
-    for c in range(start_chap, current_chapter_num):
-        chap_file = os.path.join(chapters_dir, f"chapter_{c}.txt")
-        if os.path.exists(chap_file):
-            text = read_file(chap_file).strip()
-            texts.append(text)
-        else:
-            texts.append("")
-    return texts
+    numbers = range(start_chap, current_chapter_num)
+    chapters = get_chapter_repository(os.path.dirname(os.path.abspath(chapters_dir))).read_many(numbers)
+    return [chapters.get(c, "").strip() for c in numbers]
 
 def summarize_recent_chapters(
     interface_format: str,
@@ -56,7 +55,8 @@ def summarize_recent_chapters(
     novel_number: int,            # 新增参数
     chapter_info: dict,           # 新增参数
     next_chapter_info: dict,      # 新增参数
-    timeout: int = 600
+    timeout: int = 600,
+    cancel_token: Optional[CancellationToken] = None
 ) -> str:  # 修改返回值类型为 str，不再是 tuple
     """
     根据前三章内容生成当前章节的精准摘要。
@@ -106,7 +106,7 @@ def summarize_recent_chapters(
             next_chapter_plot_twist_level=next_chapter_info.get("plot_twist_level", "★☆☆☆☆")
         )
         
-        response_text = invoke_with_cleaning(llm_adapter, prompt)
+        response_text = invoke_with_cleaning(llm_adapter, prompt, cancel_token=cancel_token)
         summary = extract_summary_from_response(response_text)
         
         if not summary:
@@ -115,6 +115,8 @@ def summarize_recent_chapters(
             
         return summary[:2000]  # 限制摘要长度
         
+    except OperationCancelled:
+        raise
     except Exception as e:
         logging.error(f"Error in summarize_recent_chapters: {str(e)}")
         return ""
@@ -229,7 +231,8 @@ def get_filtered_knowledge_context(
     chapter_info: dict,
     retrieved_texts: list,
     max_tokens: int = 2048,
-    timeout: int = 600
+    timeout: int = 600,
+    cancel_token: Optional[CancellationToken] = None
 ) -> str:
     """优化后的知识过滤处理"""
     if not retrieved_texts:
@@ -269,9 +272,11 @@ def get_filtered_knowledge_context(
             retrieved_texts="\n\n".join(formatted_texts) if formatted_texts else "（无检索结果）"
         )
         
-        filtered_content = invoke_with_cleaning(llm_adapter, prompt)
+        filtered_content = invoke_with_cleaning(llm_adapter, prompt, cancel_token=cancel_token)
         return filtered_content if filtered_content else "（知识内容过滤失败）"
         
+    except OperationCancelled:
+        raise
     except Exception as e:
         logging.error(f"Error in knowledge filtering: {str(e)}")
         return "（内容过滤过程出错）"
@@ -296,7 +301,9 @@ def build_chapter_prompt(
     embedding_retrieval_k: int = 2,
     interface_format: str = "openai",
     max_tokens: int = 2048,
-    timeout: int = 600
+    timeout: int = 600,
+    cancel_token: Optional[CancellationToken] = None,
+    context_limit: Optional[int] = None
 ) -> str:
     """
     构造当前章节的请求提示词（完整实现版）
@@ -304,16 +311,16 @@ def build_chapter_prompt(
     1. 优化知识库检索流程
     2. 新增内容重复检测机制
     3. 集成提示词应用规则
+
+    context_limit 不为 None 时，前文只取第 context_limit 章之前（已定稿）的章节，
+    供并发起草时各章互不依赖。
     """
     # 读取基础文件
     arch_file = os.path.join(filepath, "Novel_architecture.txt")
     novel_architecture_text = read_file(arch_file)
     directory_file = os.path.join(filepath, "Novel_directory.txt")
     blueprint_text = read_file(directory_file)
-    global_summary_file = os.path.join(filepath, "global_summary.txt")
-    global_summary_text = read_file(global_summary_file)
-    character_state_file = os.path.join(filepath, "character_state.txt")
-    character_state_text = read_file(character_state_file)
+    global_summary_text = load_summary_view(filepath, novel_number)
     
     # 获取章节信息
     chapter_info = get_chapter_info_from_blueprint(blueprint_text, novel_number)
@@ -336,6 +343,13 @@ def build_chapter_prompt(
     next_chapter_twist = next_chapter_info.get("plot_twist_level", "★☆☆☆☆")
     next_chapter_summary = next_chapter_info.get("chapter_summary", "衔接过渡内容")
 
+    # 只注入本章出场角色的状态
+    character_state_text = load_character_state_view(
+        filepath,
+        characters_involved,
+        "\n".join([chapter_title, chapter_summary, user_guidance or ""])
+    )
+
     # 创建章节目录
     chapters_dir = os.path.join(filepath, "chapters")
     os.makedirs(chapters_dir, exist_ok=True)
@@ -361,7 +375,8 @@ def build_chapter_prompt(
         )
 
     # 获取前文内容和摘要
-    recent_texts = get_last_n_chapters_text(chapters_dir, novel_number, n=3)
+    context_end = novel_number if context_limit is None else min(novel_number, context_limit)
+    recent_texts = get_last_n_chapters_text(chapters_dir, context_end, n=3)
 
     # 新增：基于向量检索的上下文检索
     context_from_previous_chapter = ""
@@ -420,9 +435,12 @@ def build_chapter_prompt(
             novel_number=novel_number,
             chapter_info=chapter_info,
             next_chapter_info=next_chapter_info,
-            timeout=timeout
+            timeout=timeout,
+            cancel_token=cancel_token
         )
         logging.info("Summary generated successfully")
+    except OperationCancelled:
+        raise
     except Exception as e:
         logging.error(f"Error in summarize_recent_chapters: {str(e)}")
         short_summary = "（摘要生成失败）"
@@ -461,7 +479,7 @@ def build_chapter_prompt(
             time_constraint=time_constraint
         )
         
-        search_response = invoke_with_cleaning(llm_adapter, search_prompt)
+        search_response = invoke_with_cleaning(llm_adapter, search_prompt, cancel_token=cancel_token)
         keyword_groups = parse_search_keywords(search_response)
 
         # 执行向量检索
@@ -523,9 +541,12 @@ def build_chapter_prompt(
             chapter_info=chapter_info_for_filter,
             retrieved_texts=processed_contexts,
             max_tokens=max_tokens,
-            timeout=timeout
+            timeout=timeout,
+            cancel_token=cancel_token
         )
         
+    except OperationCancelled:
+        raise
     except Exception as e:
         logging.error(f"知识处理流程异常：{str(e)}")
         filtered_context = "（知识库处理失败）"
@@ -583,10 +604,14 @@ def generate_chapter_draft(
     interface_format: str = "openai",
     max_tokens: int = 2048,
     timeout: int = 600,
-    custom_prompt_text: str = None
+    custom_prompt_text: str = None,
+    cancel_token: Optional[CancellationToken] = None,
+    context_limit: Optional[int] = None
 ) -> str:
     """
     生成章节草稿，支持自定义提示词
+    cancel_token 被置位时抛出 OperationCancelled，且不写入章节文件；
+    context_limit 见 build_chapter_prompt
     """
     if custom_prompt_text is None:
         prompt_text = build_chapter_prompt(
@@ -609,7 +634,9 @@ def generate_chapter_draft(
             embedding_retrieval_k=embedding_retrieval_k,
             interface_format=interface_format,
             max_tokens=max_tokens,
-            timeout=timeout
+            timeout=timeout,
+            cancel_token=cancel_token,
+            context_limit=context_limit
         )
     else:
         prompt_text = custom_prompt_text
@@ -627,12 +654,10 @@ def generate_chapter_draft(
         timeout=timeout
     )
 
-    chapter_content = invoke_with_cleaning(llm_adapter, prompt_text)
+    chapter_content = invoke_with_cleaning(llm_adapter, prompt_text, cancel_token=cancel_token)
     if not chapter_content.strip():
         logging.warning("Generated chapter draft is empty.")
-    chapter_file = os.path.join(chapters_dir, f"chapter_{novel_number}.txt")
-    clear_file_content(chapter_file)
-    save_string_to_txt(chapter_content, chapter_file)
+    get_chapter_repository(filepath).write(novel_number, chapter_content)
     logging.info(f"[Draft] Chapter {novel_number} generated as a draft.")
     return chapter_content
 
@@ -814,8 +839,7 @@ def save_character_name_registry(project_path: str):
 
     try:
         registry_file = os.path.join(project_path, "character_names.json")
-        with open(registry_file, 'w', encoding='utf-8') as f:
-            json.dump(character_name_registry, f, ensure_ascii=False, indent=2)
+        atomic_write_json(registry_file, character_name_registry)
         logging.info(f"角色名字注册表已保存到：{registry_file}")
     except Exception as e:
         logging.error(f"保存角色名字注册表失败：{e}")
@@ -0,0 +1,306 @@
+# novel_generator/chapter_repository.py
+# -*- coding: utf-8 -*-
+"""
+统一的章节存储层
+
+历史上存在两种章节文件：生成流程写 chapters/chapter_{n}.txt，章节编辑器（DataManager）写
+chapters/chapter_{n:03d}.md。ChapterRepository 把两者合并为同一套章节编号：
+- 列表来自缓存的目录索引，只有章节目录的 mtime 变化（增删改名文件）时才重新扫描；
+- 同一章两种文件都存在时，读取较新的一份；
+- 读取结果按 (mtime, 大小) 缓存，文件被外部改写后自动失效；
+- 删除章节会同时删除两种文件。
+
+使用单文件存储（project.db）的项目由 SqliteChapterRepository 提供相同的接口，章节读写直接走数据库。
+同一项目的所有调用方通过 get_chapter_repository 共享一个实例。
+"""
+
+import os
+import re
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from storage import atomic_write_text
+from .sqlite_store import SqliteProjectStore, get_project_store, uses_sqlite_store
+
+logger = logging.getLogger(__name__)
+
+CHAPTERS_DIR = "chapters"
+FORMAT_TXT = "txt"  # 生成流程：chapter_{n}.txt
+FORMAT_MD = "md"    # 章节编辑器：chapter_{n:03d}.md
+
+_CHAPTER_FILE = re.compile(r"^chapter_(\d+)\.(txt|md)$")
+_CONTENT_CACHE_SIZE = 64
+
+
+def chapter_filename(chapter_number: int, fmt: str = FORMAT_TXT) -> str:
+    """返回指定格式的章节文件名"""
+    if fmt == FORMAT_MD:
+        return f"chapter_{chapter_number:03d}.md"
+    return f"chapter_{chapter_number}.txt"
+
+
+class ChapterRepository:
+    """单个项目的章节仓库"""
+
+    def __init__(self, project_path: str):
+        """
+        Args:
+            project_path: 项目根目录
+        """
+        self.project_path = str(project_path)
+        self.chapters_dir = os.path.join(self.project_path, CHAPTERS_DIR)
+        self._lock = threading.RLock()
+        self._index: Dict[int, Dict[str, str]] = {}  # 章节号 -> {格式: 文件名}
+        self._dir_mtime_ns: Optional[int] = None
+        self._content_cache: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+
+    # ========== 目录索引 ==========
+
+    def _dir_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.chapters_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def _ensure_index(self):
+        """章节目录的 mtime 变化时重建索引（只 stat 目录一次）"""
+        mtime = self._dir_mtime()
+        if mtime is not None and mtime == self._dir_mtime_ns:
+            return
+        index: Dict[int, Dict[str, str]] = {}
+        if mtime is not None:
+            with os.scandir(self.chapters_dir) as it:
+                for entry in it:
+                    match = _CHAPTER_FILE.match(entry.name)
+                    if match and entry.is_file():
+                        index.setdefault(int(match.group(1)), {})[match.group(2)] = entry.name
+        self._index = index
+        self._dir_mtime_ns = mtime
+
+    def invalidate(self):
+        """丢弃目录索引和内容缓存"""
+        with self._lock:
+            self._dir_mtime_ns = None
+            self._content_cache.clear()
+
+    def list_chapters(self) -> List[int]:
+        """按章节号排序返回所有章节号"""
+        with self._lock:
+            self._ensure_index()
+            return sorted(self._index)
+
+    def exists(self, chapter_number: int) -> bool:
+        with self._lock:
+            self._ensure_index()
+            return chapter_number in self._index
+
+    def chapter_path(self, chapter_number: int) -> Optional[str]:
+        """
+        返回章节当前有效的文件路径；两种文件都存在时取较新的一份
+
+        Returns:
+            文件路径，章节不存在时返回 None
+        """
+        with self._lock:
+            self._ensure_index()
+            files = self._index.get(chapter_number)
+        if not files:
+            return None
+        paths = [os.path.join(self.chapters_dir, name) for name in files.values()]
+        if len(paths) == 1:
+            return paths[0]
+
+        def mtime(path: str) -> int:
+            try:
+                return os.stat(path).st_mtime_ns
+            except OSError:
+                return -1
+
+        return max(paths, key=mtime)
+
+    # ========== 读取 ==========
+
+    def read(self, chapter_number: int) -> str:
+        """
+        读取章节内容
+
+        Returns:
+            章节内容，章节不存在时返回空字符串
+        """
+        path = self.chapter_path(chapter_number)
+        if path is None:
+            return ""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.invalidate()
+            return ""
+
+        with self._lock:
+            cached = self._content_cache.get(path)
+            if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                self._content_cache.move_to_end(path)
+                return cached[2]
+
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        self._remember(path, stat, content)
+        return content
+
+    def read_many(self, chapter_numbers: Iterable[int]) -> Dict[int, str]:
+        """
+        批量读取章节，不存在的章节不出现在结果中
+
+        Returns:
+            {章节号: 内容}
+        """
+        result = {}
+        for chapter_number in chapter_numbers:
+            if self.exists(chapter_number):
+                result[chapter_number] = self.read(chapter_number)
+        return result
+
+    def read_all(self) -> Dict[int, str]:
+        """按章节号顺序读取所有章节"""
+        return self.read_many(self.list_chapters())
+
+    def _remember(self, path: str, stat: os.stat_result, content: str):
+        with self._lock:
+            self._content_cache[path] = (stat.st_mtime_ns, stat.st_size, content)
+            self._content_cache.move_to_end(path)
+            while len(self._content_cache) > _CONTENT_CACHE_SIZE:
+                self._content_cache.popitem(last=False)
+
+    # ========== 写入 ==========
+
+    def write(self, chapter_number: int, content: str, fmt: str = FORMAT_TXT) -> str:
+        """
+        原子地写入章节
+
+        Args:
+            chapter_number: 章节号
+            content: 章节内容
+            fmt: 文件格式，FORMAT_TXT（生成流程）或 FORMAT_MD（章节编辑器）
+
+        Returns:
+            写入的文件路径
+        """
+        os.makedirs(self.chapters_dir, exist_ok=True)
+        name = chapter_filename(chapter_number, fmt)
+        path = os.path.join(self.chapters_dir, name)
+        with self._lock:
+            self._ensure_index()
+            atomic_write_text(path, content)
+            # 自己的写入直接更新索引，不必因目录 mtime 变化而重新扫描
+            self._index.setdefault(chapter_number, {})[fmt] = name
+            self._dir_mtime_ns = self._dir_mtime()
+            self._remember(path, os.stat(path), content)
+        return path
+
+    def delete(self, chapter_number: int) -> List[str]:
+        """
+        删除章节的所有文件
+
+        Returns:
+            已删除的文件名列表
+        """
+        with self._lock:
+            self._ensure_index()
+            files = self._index.pop(chapter_number, {})
+            removed = []
+            for name in files.values():
+                path = os.path.join(self.chapters_dir, name)
+                self._content_cache.pop(path, None)
+                try:
+                    os.remove(path)
+                    removed.append(name)
+                except FileNotFoundError:
+                    pass
+            self._dir_mtime_ns = self._dir_mtime()
+            return removed
+
+
+class SqliteChapterRepository:
+    """单文件存储项目的章节仓库，接口与 ChapterRepository 相同"""
+
+    def __init__(self, project_path: str):
+        """
+        Args:
+            project_path: 项目根目录
+        """
+        self.project_path = str(project_path)
+
+    @property
+    def store(self) -> SqliteProjectStore:
+        """项目共享的数据库实例（每次取用，恢复备份后拿到的是新实例）"""
+        return get_project_store(self.project_path)
+
+    def invalidate(self):
+        """数据库没有需要失效的缓存"""
+
+    def list_chapters(self) -> List[int]:
+        return self.store.list_chapters()
+
+    def exists(self, chapter_number: int) -> bool:
+        return self.store.has_chapter(chapter_number)
+
+    def chapter_path(self, chapter_number: int) -> Optional[str]:
+        """章节不对应单独的文件，返回 None"""
+        return None
+
+    def read(self, chapter_number: int) -> str:
+        content = self.store.read_chapter(chapter_number)
+        return content if content is not None else ""
+
+    def read_many(self, chapter_numbers: Iterable[int]) -> Dict[int, str]:
+        return self.store.read_chapters(chapter_numbers)
+
+    def read_all(self) -> Dict[int, str]:
+        return self.read_many(self.list_chapters())
+
+    def write(self, chapter_number: int, content: str, fmt: str = FORMAT_TXT) -> str:
+        """
+        写入章节（fmt 只为与 ChapterRepository 接口一致，数据库中不区分格式）
+
+        Returns:
+            数据库文件路径
+        """
+        self.store.write_chapter(chapter_number, content)
+        return self.store.db_path
+
+    def delete(self, chapter_number: int) -> List[str]:
+        if self.store.delete_chapter(chapter_number):
+            return [f"{os.path.basename(self.store.db_path)}: 第{chapter_number}章"]
+        return []
+
+
+# ========== 共享实例 ==========
+
+_repositories: Dict[str, ChapterRepository] = {}
+_store_repositories: Dict[str, SqliteChapterRepository] = {}
+_repositories_lock = threading.Lock()
+
+
+def get_chapter_repository(project_path: str):
+    """
+    返回项目共享的章节仓库实例；项目使用单文件存储时返回 SqliteChapterRepository
+
+    Returns:
+        ChapterRepository 或 SqliteChapterRepository
+    """
+    key = os.path.abspath(str(project_path))
+    if uses_sqlite_store(key):
+        with _repositories_lock:
+            repository = _store_repositories.get(key)
+            if repository is None:
+                repository = SqliteChapterRepository(key)
+                _store_repositories[key] = repository
+            return repository
+    with _repositories_lock:
+        repository = _repositories.get(key)
+        if repository is None:
+            repository = ChapterRepository(key)
+            _repositories[key] = repository
+        return repository
@@ -0,0 +1,319 @@
+#novel_generator/character_state_store.py
+# -*- coding: utf-8 -*-
+"""
+结构化角色状态存储（character_state.json）
+
+每个主要角色按“物品 / 能力 / 状态 / 主要角色间关系网 / 触发或加深的事件”分栏，
+每栏是 {条目: 描述}。定稿时只把本章出场角色的状态交给LLM，并按字段打补丁；
+character_state.txt 由存储渲染生成，保持原有的树形文本格式。
+"""
+import os
+import re
+import json
+import logging
+from typing import Dict, List, Optional, Iterable
+from novel_generator.common import invoke_with_cleaning, CancellationToken
+from prompt_definitions import update_character_state_patch_prompt
+from utils import read_file
+
+CHARACTER_STATE_STORE_FILE = "character_state.json"
+CHARACTER_STATE_TEXT_FILE = "character_state.txt"
+
+STATE_SECTIONS = ["物品", "能力", "状态", "主要角色间关系网", "触发或加深的事件"]
+MINOR_CHARACTERS_HEADER = "新出场角色"
+
+_NAME_LINE = re.compile(r"^([^：:├│└\s\-][^：:]*)[：:]\s*$")
+_TREE_PREFIX = re.compile(r"^[├│└─\s]+")
+_NAME_SEPARATORS = re.compile(r"[，,、；;/|\s]+")
+
+
+class CharacterStateStore:
+    """项目的结构化角色状态"""
+
+    def __init__(self):
+        self.characters: Dict[str, Dict[str, Dict[str, str]]] = {}
+        self.minor_characters: Dict[str, str] = {}
+
+    # ========== 持久化 ==========
+
+    @staticmethod
+    def get_store_file(filepath: str) -> str:
+        return os.path.join(filepath, CHARACTER_STATE_STORE_FILE)
+
+    @staticmethod
+    def get_text_file(filepath: str) -> str:
+        return os.path.join(filepath, CHARACTER_STATE_TEXT_FILE)
+
+    @classmethod
+    def load(cls, filepath: str) -> "CharacterStateStore":
+        """
+        读取角色状态存储。
+        没有 JSON 存储，或 character_state.txt 被手动改动过（与存储渲染结果不一致）时，
+        从文本文件重新导入。
+        """
+        store = None
+        store_file = cls.get_store_file(filepath)
+        if os.path.exists(store_file):
+            try:
+                with open(store_file, "r", encoding="utf-8") as f:
+                    store = cls.from_dict(json.load(f))
+            except Exception as e:
+                logging.warning(f"Failed to load {CHARACTER_STATE_STORE_FILE}: {e}")
+
+        text = read_file(cls.get_text_file(filepath)).strip()
+        if text and (store is None or store.render().strip() != text):
+            logging.info("Importing character_state.txt into structured character state store.")
+            return cls.from_text(text)
+        return store or cls()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CharacterStateStore":
+        store = cls()
+        for name, sections in data.get("characters", {}).items():
+            store.characters[name] = {
+                section: dict(entries or {}) for section, entries in (sections or {}).items()
+            }
+        store.minor_characters = dict(data.get("minor_characters", {}))
+        return store
+
+    def to_dict(self) -> dict:
+        return {
+            "characters": self.characters,
+            "minor_characters": self.minor_characters,
+        }
+
+    def dumps(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    @classmethod
+    def from_text(cls, text: str) -> "CharacterStateStore":
+        """从树形格式的角色状态文本导入（用于初始状态和旧项目迁移）"""
+        store = cls()
+        current_name = None
+        current_section = None
+        in_minor = False
+
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
+            if not line:
+                continue
+
+            if line.startswith(MINOR_CHARACTERS_HEADER):
+                in_minor = True
+                continue
+
+            if in_minor:
+                entry = line.lstrip("-•* ").strip()
+                # 跳过模板中的占位说明
+                if entry and not entry.startswith(("(", "（")):
+                    key, value = _split_entry(entry)
+                    store.minor_characters[key] = value
+                continue
+
+            name_match = _NAME_LINE.match(line)
+            if name_match and not raw_line[:1] in ("│", " ", "\t"):
+                candidate = name_match.group(1).strip()
+                if candidate in ("角色名", "角色名称", "角色", "例"):
+                    current_name = None
+                    continue
+                if candidate not in STATE_SECTIONS:
+                    current_name = candidate
+                    current_section = None
+                    store.characters.setdefault(current_name, {})
+                    continue
+
+            if current_name is None:
+                continue
+
+            content = _TREE_PREFIX.sub("", line).strip()
+            if not content.strip(".。…"):
+                continue
+            is_section_line = raw_line.lstrip()[:1] in ("├", "└") and raw_line[:1] not in ("│", " ", "\t")
+            section_name = content.rstrip("：:").strip()
+            if is_section_line or section_name in STATE_SECTIONS:
+                current_section = section_name
+                store.characters[current_name].setdefault(current_section, {})
+                continue
+
+            section = current_section or STATE_SECTIONS[0]
+            key, value = _split_entry(content)
+            store.characters[current_name].setdefault(section, {})[key] = value
+
+        return store
+
+    # ========== 查询 ==========
+
+    def names(self) -> List[str]:
+        return list(self.characters.keys())
+
+    def find_present(self, text: str) -> List[str]:
+        """返回在文本中出现过名字的主要角色"""
+        return [name for name in self.characters if name and name in text]
+
+    def find_present_minor(self, text: str) -> List[str]:
+        return [name for name in self.minor_characters if name and name in text]
+
+    def describe(self, name: str) -> str:
+        """角色状态的纯文本描述（不含树形符号），用于同步到角色管理"""
+        lines = self._render_character(name).splitlines()[1:]
+        return "\n".join(_TREE_PREFIX.sub("", line) for line in lines)
+
+    # ========== 渲染 ==========
+
+    def render(self, names: Optional[Iterable[str]] = None, include_minor: bool = True) -> str:
+        """
+        渲染为原有的树形文本格式。
+
+        Args:
+            names: 只渲染这些角色；为 None 时渲染全部
+            include_minor: 是否附带“新出场角色”列表
+        """
+        selected = self.names() if names is None else [n for n in names if n in self.characters]
+        blocks = [self._render_character(name) for name in selected]
+
+        minor = self.minor_characters
+        if names is not None:
+            minor = {k: v for k, v in minor.items() if k in set(names)}
+        if include_minor and minor:
+            lines = [f"{MINOR_CHARACTERS_HEADER}："]
+            lines.extend(f"- {k}：{v}" if v else f"- {k}" for k, v in minor.items())
+            blocks.append("\n".join(lines))
+
+        return "\n\n".join(blocks)
+
+    def _render_character(self, name: str) -> str:
+        sections = self.characters.get(name, {})
+        ordered = [s for s in STATE_SECTIONS if s in sections] + [s for s in sections if s not in STATE_SECTIONS]
+        lines = [f"{name}："]
+        for i, section in enumerate(ordered):
+            last_section = i == len(ordered) - 1
+            lines.append(f"{'└' if last_section else '├'}──{section}:")
+            entries = list(sections[section].items())
+            indent = "   " if last_section else "│  "
+            for j, (key, value) in enumerate(entries):
+                branch = "└" if j == len(entries) - 1 else "├"
+                lines.append(f"{indent}{branch}──{key}：{value}" if value else f"{indent}{branch}──{key}")
+        return "\n".join(lines)
+
+    # ========== 更新 ==========
+
+    def apply_patch(self, patch: dict) -> int:
+        """
+        按字段应用LLM返回的补丁，返回被修改的角色数。
+
+        补丁格式：
+          {"updates": {角色: {分栏: {条目: 新描述或null}}},
+           "new_characters": {角色: 简述},
+           "removed_minor_characters": [角色]}
+        条目值为 null 表示删除该条目；分栏值为 null 表示清空该分栏。
+        """
+        changed = set()
+        for name, sections in (patch.get("updates") or {}).items():
+            if not isinstance(sections, dict):
+                continue
+            name = name.strip()
+            character = self.characters.setdefault(name, {})
+            self.minor_characters.pop(name, None)
+            for section, entries in sections.items():
+                if entries is None:
+                    character.pop(section, None)
+                    continue
+                if not isinstance(entries, dict):
+                    continue
+                target = character.setdefault(section, {})
+                for key, value in entries.items():
+                    if value is None:
+                        target.pop(key, None)
+                    else:
+                        target[key] = str(value).strip()
+            changed.add(name)
+
+        for name, desc in (patch.get("new_characters") or {}).items():
+            name = name.strip()
+            if name and name not in self.characters:
+                self.minor_characters[name] = str(desc or "").strip()
+                changed.add(name)
+
+        for name in patch.get("removed_minor_characters") or []:
+            if self.minor_characters.pop(name, None) is not None:
+                changed.add(name)
+
+        return len(changed)
+
+
+def _split_entry(text: str):
+    """把“条目：描述”拆成 (条目, 描述)"""
+    parts = re.split(r"[：:]", text, maxsplit=1)
+    key = parts[0].strip()
+    value = parts[1].strip() if len(parts) > 1 else ""
+    return key, value
+
+
+def _parse_json_object(response: str) -> Optional[dict]:
+    try:
+        return json.loads(response)
+    except json.JSONDecodeError:
+        match = re.search(r"\{.*\}", response, re.DOTALL)
+        if match:
+            try:
+                return json.loads(match.group())
+            except json.JSONDecodeError:
+                pass
+    return None
+
+
+def parse_character_names(characters_involved: str) -> List[str]:
+    """把“张三、李四”之类的出场角色字符串拆成名字列表"""
+    return [n.strip() for n in _NAME_SEPARATORS.split(characters_involved or "") if n.strip()]
+
+
+def update_character_state_store(llm_adapter, store: CharacterStateStore, chapter_text: str,
+                                 cancel_token: Optional[CancellationToken] = None) -> CharacterStateStore:
+    """
+    让LLM只针对本章出场的角色返回字段级补丁，并应用到 store（原地修改并返回）。
+    补丁无法解析时保留原状态。
+    """
+    present = store.find_present(chapter_text)
+    present_minor = store.find_present_minor(chapter_text)
+    current_states = store.render(present, include_minor=False) if present else "（本章没有已登记的主要角色出场）"
+    minor_list = "、".join(present_minor) if present_minor else "无"
+
+    response = invoke_with_cleaning(llm_adapter, update_character_state_patch_prompt.format(
+        chapter_text=chapter_text,
+        character_states=current_states,
+        minor_characters=minor_list,
+        sections="、".join(STATE_SECTIONS)
+    ), cancel_token=cancel_token)
+    patch = _parse_json_object(response)
+    if patch is None:
+        logging.warning("Character state patch is not valid JSON, keep previous state.")
+        return store
+
+    changed = store.apply_patch(patch)
+    logging.info(f"Character state patched: {changed} character(s) updated, present in chapter: {present}")
+    return store
+
+
+def load_character_state_view(filepath: str, characters_involved: str = "", context_text: str = "") -> str:
+    """
+    获取用于草稿提示词的角色状态，只包含本章出场的角色。
+
+    Args:
+        filepath: 项目路径
+        characters_involved: 本章出场角色（如“张三、李四”）
+        context_text: 未指定出场角色时，用于识别出场角色的文本（章节标题、简述等）
+
+    Returns:
+        树形格式的角色状态文本；无法确定出场角色时返回全部主要角色
+    """
+    store = CharacterStateStore.load(filepath)
+    if not store.characters and not store.minor_characters:
+        return ""
+
+    known = set(store.characters) | set(store.minor_characters)
+    names = [n for n in parse_character_names(characters_involved) if n in known]
+    if not names and context_text:
+        names = store.find_present(context_text) + store.find_present_minor(context_text)
+    if not names:
+        return store.render(include_minor=False)
+    return store.render(names)
@@ -9,10 +9,11 @@ import re
 import json
 import logging
 import os
-from typing import List, Dict, Tuple, Optional, Any
-from dataclasses import dataclass
+from typing import List, Dict, Tuple, Optional, Any, Iterator
+from dataclasses import dataclass, field
 from llm_adapters import create_llm_adapter
 from novel_generator.chapter import load_character_name_registry
+from novel_generator.common import CancellationToken
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -35,6 +36,38 @@ class CoherenceScore:
     setting_consistency: float  # 设定连贯性分数 (0-100)
     overall_score: float  # 总体分数 (0-100)
 
+# 检查阶段（按执行顺序）
+COHERENCE_STAGES = ('plot', 'character_name', 'character_trait', 'setting')
+STAGE_COMPLETED = 'completed'
+STAGE_LABELS = {
+    'plot': '情节连续性',
+    'character_name': '角色名字一致性',
+    'character_trait': '角色特征一致性',
+    'setting': '设定连贯性',
+}
+
+@dataclass
+class CoherenceProgress:
+    """连贯性检查进度事件，由 iter_coherence_check 逐步产出"""
+    stage: str       # COHERENCE_STAGES 之一，或 STAGE_COMPLETED
+    current: int     # 当前阶段已完成步数
+    total: int       # 当前阶段总步数
+    chapter: Optional[int] = None  # 本步涉及的章节号
+    issues: List[CoherenceIssue] = field(default_factory=list)  # 本步新发现的问题
+    message: str = ""
+    score: Optional[float] = None  # 当前阶段的滚动分数
+    scores: Optional[CoherenceScore] = None  # 仅在 STAGE_COMPLETED 时提供
+    report: str = ""  # 仅在 STAGE_COMPLETED 时提供
+
+    def overall_progress(self) -> Tuple[int, int]:
+        """换算为总体进度 (当前值, 最大值)，每个阶段占100"""
+        maximum = len(COHERENCE_STAGES) * 100
+        if self.stage not in COHERENCE_STAGES:
+            return maximum, maximum
+        stage_index = COHERENCE_STAGES.index(self.stage)
+        stage_progress = int(self.current * 100 / self.total) if self.total else 100
+        return stage_index * 100 + stage_progress, maximum
+
 @dataclass
 class CharacterInfo:
     """角色信息数据结构"""
@@ -62,6 +95,10 @@ class CoherenceChecker:
         self.characters: Dict[str, CharacterInfo] = {}
         self.project_path = project_path
 
+        # 各阶段的滚动分数与已完成阶段，用于取消/出错时生成部分报告
+        self._stage_scores: Dict[str, float] = {}
+        self._completed_stages: List[str] = []
+
         # 加载角色名字注册表（与Story 3.1集成）
         self.character_name_registry = {}
         if project_path:
@@ -443,6 +480,12 @@ class CoherenceChecker:
         Returns:
             Tuple[一致性分数, 问题列表]
         """
+        return self._drain_stage(self._iter_character_trait_consistency(chapters))
+
+    def _iter_character_trait_consistency(self, chapters: List[str],
+                                          cancel_token: Optional[CancellationToken] = None
+                                          ) -> Iterator[CoherenceProgress]:
+        """逐角色检查特征一致性，每检查完一个角色产出一次进度事件"""
         # 首先收集所有角色名字
         all_characters = set()
         for chapter in chapters:
@@ -451,19 +494,23 @@ class CoherenceChecker:
 
         issues = []
         character_consistency_scores = []
+        total = len(all_characters)
 
-        for character in all_characters:
+        for index, character in enumerate(sorted(all_characters), 1):
             character_traits = {}  # {章节号: 特征字典}
+            character_issues = []
 
             # 提取每章中的角色特征
             for i, chapter in enumerate(chapters, 1):
                 if character in [self.normalize_name(name) for name in self.extract_character_names(chapter)]:
+                    _check_cancelled(cancel_token)
                     traits = self.extract_character_traits(chapter, character)
                     if traits:  # 只保存有特征的章节
                         character_traits[i] = traits
 
             # 如果角色在多章节中有特征描述，检查一致性
             if len(character_traits) > 1:
+                _check_cancelled(cancel_token)
                 consistency_score = self._evaluate_trait_consistency(character, character_traits)
                 character_consistency_scores.append(consistency_score)
 
@@ -479,15 +526,20 @@ class CoherenceChecker:
                             suggestion=detail['suggestion'],
                             chapters_involved=list(character_traits.keys())
                         )
-                        issues.append(issue)
+                        character_issues.append(issue)
+                issues.extend(character_issues)
 
-        # 计算总体角色一致性分数
-        if character_consistency_scores:
-            avg_score = sum(character_consistency_scores) / len(character_consistency_scores)
-        else:
-            avg_score = 100.0  # 没有需要检查的角色
+            yield CoherenceProgress(
+                stage='character_trait',
+                current=index,
+                total=total,
+                issues=character_issues,
+                message=f"角色特征一致性: {character} ({index}/{total})",
+                score=_average(character_consistency_scores)
+            )
 
-        return avg_score, issues
+        # 计算总体角色一致性分数（没有需要检查的角色时为100）
+        return _average(character_consistency_scores), issues
 
     def extract_story_setting(self, chapter_text: str) -> Dict[str, str]:
         """
@@ -539,21 +591,37 @@ class CoherenceChecker:
         Returns:
             Tuple[连贯性分数, 问题列表]
         """
+        return self._drain_stage(self._iter_setting_consistency(chapters))
+
+    def _iter_setting_consistency(self, chapters: List[str],
+                                  cancel_token: Optional[CancellationToken] = None
+                                  ) -> Iterator[CoherenceProgress]:
+        """逐章提取设定、逐维度评估一致性，每步产出一次进度事件"""
         settings = {}  # {章节号: 设定字典}
 
+        # 检查各个设定维度的一致性
+        setting_dimensions = ['time_period', 'world_type', 'location', 'technology_level', 'social_structure']
+        total = len(chapters) + len(setting_dimensions)
+
         # 提取每章的设定信息
         for i, chapter in enumerate(chapters, 1):
+            _check_cancelled(cancel_token)
             setting = self.extract_story_setting(chapter)
             if setting:  # 只保存有设定信息的章节
                 settings[i] = setting
+            yield CoherenceProgress(
+                stage='setting',
+                current=i,
+                total=total,
+                chapter=i,
+                message=f"设定连贯性: 提取第{i}章设定"
+            )
 
         issues = []
         consistency_scores = []
 
-        # 检查各个设定维度的一致性
-        setting_dimensions = ['time_period', 'world_type', 'location', 'technology_level', 'social_structure']
-
-        for dimension in setting_dimensions:
+        for dimension_index, dimension in enumerate(setting_dimensions, 1):
+            dimension_issues = []
             dimension_values = {}  # {值: [章节号列表]}
 
             for chapter_num, setting in settings.items():
@@ -583,6 +651,7 @@ class CoherenceChecker:
     "issues": ["问题描述1", "问题描述2"]
 }}"""
 
+                _check_cancelled(cancel_token)
                 try:
                     response = self.llm_adapter.invoke(prompt)
                     result = self._parse_json_response(response)
@@ -600,7 +669,8 @@ class CoherenceChecker:
                                 suggestion="建议统一设定描述，或提供合理的解释",
                                 chapters_involved=list(settings.keys())
                             )
-                            issues.append(issue)
+                            dimension_issues.append(issue)
+                        issues.extend(dimension_issues)
                     else:
                         consistency_scores.append(95)  # 认为一致
 
@@ -608,13 +678,17 @@ class CoherenceChecker:
                     logger.error(f"设定一致性评估失败: {e}")
                     consistency_scores.append(75)
 
-        # 计算总体设定一致性分数
-        if consistency_scores:
-            avg_score = sum(consistency_scores) / len(consistency_scores)
-        else:
-            avg_score = 100.0  # 没有需要检查的设定
+            yield CoherenceProgress(
+                stage='setting',
+                current=len(chapters) + dimension_index,
+                total=total,
+                issues=dimension_issues,
+                message=f"设定连贯性: 评估维度 {dimension}",
+                score=_average(consistency_scores)
+            )
 
-        return avg_score, issues
+        # 计算总体设定一致性分数（没有需要检查的设定时为100）
+        return _average(consistency_scores), issues
 
     def calculate_overall_scores(self, plot_score: float, character_score: float, setting_score: float) -> CoherenceScore:
         """
@@ -732,43 +806,151 @@ class CoherenceChecker:
         Returns:
             Tuple[分数对象, 问题列表, 质量报告]
         """
+        for _ in self.iter_coherence_check(chapters):
+            pass
+        return self.build_result()
+
+    def iter_coherence_check(self, chapters: List[str],
+                             cancel_token: Optional[CancellationToken] = None) -> Iterator[CoherenceProgress]:
+        """
+        以事件流方式运行连贯性检查
+
+        每完成一次LLM调用或一个检查步骤即产出一个 CoherenceProgress 事件，
+        其中携带本步新发现的问题；最后产出 stage 为 STAGE_COMPLETED 的事件，
+        携带总体分数和质量报告。cancel_token 被置位时在下一个安全点抛出
+        OperationCancelled，此时可调用 build_result 获取已完成部分的报告。
+
+        Args:
+            chapters: 所有章节内容列表
+            cancel_token: 协作式取消令牌
+
+        Yields:
+            CoherenceProgress 进度事件
+        """
         logger.info(f"开始对{len(chapters)}个章节进行连贯性检查")
 
-        all_issues = []
+        self.issues = []
+        self._stage_scores = {}
+        self._completed_stages = []
 
         # 1. 检查情节连续性
-        plot_scores = []
-        for i in range(1, len(chapters)):
-            score, issues = self.check_plot_continuity(chapters[i], chapters[i-1], i+1)
-            plot_scores.append(score)
-            all_issues.extend(issues)
-
-        avg_plot_score = sum(plot_scores) / len(plot_scores) if plot_scores else 100.0
+        yield from self._run_stage('plot', self._iter_plot_continuity(chapters, cancel_token))
 
         # 2. 检查角色名字一致性
-        character_name_score, name_issues = self.check_character_name_consistency(chapters)
-        all_issues.extend(name_issues)
+        _check_cancelled(cancel_token)
+        yield from self._run_stage('character_name', self._iter_character_name_consistency(chapters))
 
         # 3. 检查角色特征一致性
-        character_trait_score, trait_issues = self.check_character_trait_consistency(chapters)
-        all_issues.extend(trait_issues)
+        yield from self._run_stage('character_trait',
+                                   self._iter_character_trait_consistency(chapters, cancel_token))
+
+        # 4. 检查设定连贯性
+        yield from self._run_stage('setting', self._iter_setting_consistency(chapters, cancel_token))
 
+        # 5. 计算总体分数并生成质量报告
+        scores, issues, report = self.build_result()
+
+        logger.info(f"连贯性检查完成 - 总体分数: {scores.overall_score:.1f}, 发现问题: {len(issues)}个")
+
+        yield CoherenceProgress(
+            stage=STAGE_COMPLETED,
+            current=1,
+            total=1,
+            message="连贯性检查完成",
+            scores=scores,
+            report=report
+        )
+
+    def build_result(self) -> Tuple[CoherenceScore, List[CoherenceIssue], str]:
+        """
+        根据已完成的检查步骤计算分数并生成报告
+
+        检查被取消或中途出错时同样可用：未开始的阶段按满分计，
+        并在报告开头注明哪些阶段未完成。
+
+        Returns:
+            Tuple[分数对象, 问题列表, 质量报告]
+        """
+        plot_score = self._stage_scores.get('plot', 100.0)
         # 合并角色一致性分数
-        overall_character_score = (character_name_score + character_trait_score) / 2
+        character_score = (self._stage_scores.get('character_name', 100.0) +
+                           self._stage_scores.get('character_trait', 100.0)) / 2
+        setting_score = self._stage_scores.get('setting', 100.0)
 
-        # 4. 检查设定连贯性
-        setting_score, setting_issues = self.check_setting_consistency(chapters)
-        all_issues.extend(setting_issues)
+        scores = self.calculate_overall_scores(plot_score, character_score, setting_score)
+        issues = list(self.issues)
+        report = self.generate_quality_report(scores, issues)
 
-        # 5. 计算总体分数
-        scores = self.calculate_overall_scores(avg_plot_score, overall_character_score, setting_score)
+        pending = [STAGE_LABELS[stage] for stage in COHERENCE_STAGES if stage not in self._completed_stages]
+        if pending:
+            report = (f"> ⚠️ 部分结果：以下检查阶段未完成，对应分数仅供参考：{'、'.join(pending)}\n\n"
+                      + report)
 
-        # 6. 生成质量报告
-        report = self.generate_quality_report(scores, all_issues)
+        return scores, issues, report
 
-        logger.info(f"连贯性检查完成 - 总体分数: {scores.overall_score:.1f}, 发现问题: {len(all_issues)}个")
+    def has_results(self) -> bool:
+        """是否已有至少一个检查步骤产出了结果"""
+        return bool(self._stage_scores)
 
-        return scores, all_issues, report
+    def _iter_plot_continuity(self, chapters: List[str],
+                              cancel_token: Optional[CancellationToken] = None
+                              ) -> Iterator[CoherenceProgress]:
+        """逐对相邻章节检查情节连续性"""
+        plot_scores = []
+        all_issues = []
+        total = max(len(chapters) - 1, 0)
+        for i in range(1, len(chapters)):
+            _check_cancelled(cancel_token)
+            score, issues = self.check_plot_continuity(chapters[i], chapters[i-1], i+1)
+            plot_scores.append(score)
+            all_issues.extend(issues)
+            yield CoherenceProgress(
+                stage='plot',
+                current=i,
+                total=total,
+                chapter=i+1,
+                issues=issues,
+                message=f"情节连续性: 第{i}章 → 第{i+1}章 ({i}/{total})",
+                score=_average(plot_scores)
+            )
+        return _average(plot_scores), all_issues
+
+    def _iter_character_name_consistency(self, chapters: List[str]) -> Iterator[CoherenceProgress]:
+        """角色名字一致性为纯本地计算，作为单步产出"""
+        score, issues = self.check_character_name_consistency(chapters)
+        yield CoherenceProgress(
+            stage='character_name',
+            current=1,
+            total=1,
+            issues=issues,
+            message="角色名字一致性检查完成",
+            score=score
+        )
+        return score, issues
+
+    def _run_stage(self, stage: str, stage_iter: Iterator[CoherenceProgress]) -> Iterator[CoherenceProgress]:
+        """转发阶段事件，同时累计问题和滚动分数"""
+        while True:
+            try:
+                event = next(stage_iter)
+            except StopIteration as stop:
+                score, _ = stop.value
+                self._stage_scores[stage] = score
+                self._completed_stages.append(stage)
+                return
+            self.issues.extend(event.issues)
+            if event.score is not None:
+                self._stage_scores[stage] = event.score
+            yield event
+
+    @staticmethod
+    def _drain_stage(stage_iter: Iterator[CoherenceProgress]) -> Tuple[float, List[CoherenceIssue]]:
+        """同步执行一个阶段生成器，返回其 (分数, 问题列表)"""
+        while True:
+            try:
+                next(stage_iter)
+            except StopIteration as stop:
+                return stop.value
 
     # ============== 辅助方法 ==============
 
@@ -857,6 +1039,15 @@ class CoherenceChecker:
 
 # ============== 便捷函数 ==============
 
+def _check_cancelled(cancel_token: Optional[CancellationToken]):
+    """在安全点检查取消请求"""
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
+
+def _average(values: List[float]) -> float:
+    """求平均分，没有数据时视为满分"""
+    return sum(values) / len(values) if values else 100.0
+
 def run_coherence_check(novel_project_path: str, chapters: List[str], llm_config: Dict[str, Any]) -> Tuple[CoherenceScore, List[CoherenceIssue], str]:
     """
     运行连贯性检查的便捷函数
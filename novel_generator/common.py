@@ -4,9 +4,12 @@
 通用重试、清洗、日志工具
 """
 import logging
+import queue
 import re
+import threading
 import time
 import traceback
+from typing import Callable, Optional
 logging.basicConfig(
     filename='app.log',      # 日志文件名
     filemode='a',            # 追加模式（'w' 会覆盖）
@@ -14,6 +17,68 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
 )
+class OperationCancelled(Exception):
+    """操作已被用户取消"""
+
+
+class CancellationToken:
+    """
+    协作式取消令牌。
+    由UI线程调用 cancel() 置位，工作线程在安全点调用 raise_if_cancelled() 检查，
+    从而在两次LLM调用之间干净地退出，而不是强行终止线程。
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    def cancel(self):
+        """请求取消，并调用已注册的取消回调（在调用 cancel 的线程中执行）"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logging.warning(f"取消回调失败: {e}")
+
+    def add_callback(self, callback) -> Callable[[], None]:
+        """
+        注册取消时调用的回调（如中断进行中的网络请求）；已取消时立即调用
+
+        Returns:
+            注销该回调的函数
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                registered = True
+            else:
+                registered = False
+        if not registered:
+            callback()
+
+        def remove():
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+        return remove
+
+    @property
+    def is_cancelled(self) -> bool:
+        """是否已请求取消"""
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """若已请求取消则抛出 OperationCancelled"""
+        if self._event.is_set():
+            raise OperationCancelled("操作已取消")
+
+
 def call_with_retry(func, max_retries=3, sleep_time=2, fallback_return=None, **kwargs):
     """
     通用的重试机制封装。
@@ -48,8 +113,113 @@ def debug_log(prompt: str, response_content: str):
         f"\n[######################################### Response #########################################]\n{response_content}\n"
     )
 
-def invoke_with_cleaning(llm_adapter, prompt: str, max_retries: int = 3) -> str:
-    """调用 LLM 并清理返回结果"""
+class _RequestWorkers:
+    """
+    复用的 LLM 请求线程：有空闲线程时交给它，否则新建；空闲超过 idle_timeout 秒的线程退出。
+    使用守护线程，退出程序时不等待进行中的请求（取消时由适配器的 abort() 关闭连接）。
+    """
+
+    def __init__(self, idle_timeout: float = 60.0):
+        self.idle_timeout = idle_timeout
+        self._tasks = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._idle = 0
+        self._started = 0
+
+    def submit(self, fn: Callable[[], None]):
+        with self._lock:
+            if self._idle:
+                self._idle -= 1
+            else:
+                self._started += 1
+                threading.Thread(target=self._run, name=f"llm-request-{self._started}", daemon=True).start()
+            # 在锁内入队，空闲线程退出前的检查不会漏掉已分配给它的任务
+            self._tasks.put(fn)
+
+    def _run(self):
+        while True:
+            try:
+                fn = self._tasks.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    if not self._tasks.empty():
+                        continue
+                    self._idle -= 1
+                    return
+            try:
+                fn()
+            except BaseException as e:
+                logging.warning(f"LLM请求线程任务失败: {e}")
+            with self._lock:
+                self._idle += 1
+
+
+_request_workers = _RequestWorkers()
+
+
+def invoke_cancellable(llm_adapter, prompt: str, cancel_token: Optional[CancellationToken] = None) -> str:
+    """
+    可取消地调用 LLM
+
+    请求在复用的辅助线程中以流式方式进行，适配器每收到一块数据检查一次令牌并在取消后关闭流；
+    调用方在取消时立即得到 OperationCancelled，不必等待请求返回，随后适配器的 abort() 关闭底层连接。
+    适配器记录的结束原因会带回调用线程，调用后可通过 llm_adapter.last_finish_reason 读取。
+
+    Args:
+        llm_adapter: LLM 适配器
+        prompt: 提示词
+        cancel_token: 取消令牌，为 None 时直接同步调用
+
+    Returns:
+        LLM 返回的文本
+    """
+    record_finish_reason = getattr(llm_adapter, "_record_finish_reason", None)
+    if record_finish_reason is not None:
+        record_finish_reason(None)
+    if cancel_token is None:
+        return llm_adapter.invoke(prompt)
+    cancel_token.raise_if_cancelled()
+
+    outcome = {}
+    done = threading.Event()
+
+    def request():
+        try:
+            if hasattr(llm_adapter, "stream_invoke"):
+                outcome["result"] = llm_adapter.stream_invoke(prompt, cancel_token)
+            else:
+                outcome["result"] = llm_adapter.invoke(prompt)
+            outcome["finish_reason"] = getattr(llm_adapter, "last_finish_reason", None)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            done.set()
+
+    remove_callback = cancel_token.add_callback(done.set)
+    try:
+        _request_workers.submit(request)
+        done.wait()
+    finally:
+        remove_callback()
+
+    if cancel_token.is_cancelled:
+        abort = getattr(llm_adapter, "abort", None)
+        if abort is not None:
+            try:
+                abort()
+            except Exception as e:
+                logging.warning(f"中断LLM请求失败: {e}")
+        raise OperationCancelled("操作已取消")
+    if "error" in outcome:
+        raise outcome["error"]
+    if record_finish_reason is not None:
+        record_finish_reason(outcome.get("finish_reason"))
+    return outcome["result"]
+
+
+def invoke_with_cleaning(llm_adapter, prompt: str, max_retries: int = 3,
+                         cancel_token: Optional[CancellationToken] = None) -> str:
+    """调用 LLM 并清理返回结果（cancel_token 被置位时立即抛出 OperationCancelled，不再重试）"""
     print("\n" + "="*50)
     print("发送到 LLM 的提示词:")
     print("-"*50)
@@ -61,7 +231,7 @@ def invoke_with_cleaning(llm_adapter, prompt: str, max_retries: int = 3) -> str:
     
     while retry_count < max_retries:
         try:
-            result = llm_adapter.invoke(prompt)
+            result = invoke_cancellable(llm_adapter, prompt, cancel_token)
             print("\n" + "="*50)
             print("LLM 返回的内容:")
             print("-"*50)
@@ -73,6 +243,8 @@ def invoke_with_cleaning(llm_adapter, prompt: str, max_retries: int = 3) -> str:
             if result:
                 return result
             retry_count += 1
+        except OperationCancelled:
+            raise
         except Exception as e:
             print(f"调用失败 ({retry_count + 1}/{max_retries}): {str(e)}")
             retry_count += 1
@@ -80,4 +252,3 @@ def invoke_with_cleaning(llm_adapter, prompt: str, max_retries: int = 3) -> str:
                 raise e
     
     return result
-
@@ -8,22 +8,41 @@
 import os
 import json
 import logging
+from contextlib import contextmanager
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 from datetime import datetime
 
+from storage import atomic_write_text, atomic_write_json, recover_journal
+from .word_count_index import WordCountIndex, count_words_compact
+from .chapter_repository import get_chapter_repository, chapter_filename, FORMAT_MD
+from .backup_store import BackupStore
+from .exporter import export_project_archive, ARCHIVE_EXCLUDED_DIRS
+from .sqlite_store import (
+    SqliteProjectStore, PROJECT_DB_FILE, META_CONFIG,
+    DOC_ARCHITECTURE, DOC_BLUEPRINT, DOC_SUMMARY,
+    get_project_store, uses_sqlite_store, release_project_store
+)
+
 logger = logging.getLogger(__name__)
 
+# 存储后端
+BACKEND_FILES = "files"    # 目录布局（默认）
+BACKEND_SQLITE = "sqlite"  # 单文件 project.db
+
 
 class DataManager:
     """项目数据管理器"""
 
-    def __init__(self, project_path: str):
+    def __init__(self, project_path: str, backend: Optional[str] = None):
         """
         初始化数据管理器
 
         Args:
             project_path: 项目根目录路径
+            backend: 存储后端。项目目录中有 project.db 时总是使用 SQLite，与生成流程的章节读写
+                     （get_chapter_repository）保持一致；指定 BACKEND_SQLITE 而数据库尚不存在时，
+                     先导入现有目录布局，之后该项目的所有读写都走数据库
         """
         self.project_path = Path(project_path)
         self.chapters_dir = self.project_path / "chapters"
@@ -32,10 +51,45 @@ class DataManager:
         self.blueprint_file = self.project_path / "blueprint.md"
         self.summary_file = self.project_path / "summary.txt"
         self.roles_file = self.project_path / "roles.json"
+        self._deferred_config: Optional[Dict[str, Any]] = None  # batch_updates 块内尚未写入的配置
+        self._batch_depth = 0
+        self.db_file = self.project_path / PROJECT_DB_FILE
+        self.store: Optional[SqliteProjectStore] = None
+        self._init_backend(backend)
+
+    def _init_backend(self, backend: Optional[str] = None):
+        """按项目目录中的文件选择并打开存储后端"""
+        self.store = None
+        if backend == BACKEND_SQLITE or uses_sqlite_store(str(self.project_path)):
+            self._open_store()
+            return
+
+        self.chapter_repository = get_chapter_repository(str(self.project_path))
+        self.chapter_repository.invalidate()
+        self.word_index = WordCountIndex(str(self.chapters_dir))
+        if not os.path.exists(self.word_index.index_file):
+            self._calculate_total_words()  # 旧项目首次打开时重建一次索引
+
+        # 补完上次被中断的多文件写入
+        recover_journal(str(self.project_path))
 
         # 确保项目目录结构存在
         self._ensure_project_structure()
 
+    def _open_store(self):
+        """打开（必要时从目录布局导入）单文件存储"""
+        is_new = not self.db_file.exists()
+        self.store = get_project_store(str(self.project_path))
+        if is_new and self.config_file.exists():
+            self.store.import_folder(str(self.project_path))
+        if self.store.get_meta(META_CONFIG) is None:
+            self._create_default_config()
+        logger.info(f"项目使用单文件存储: {self.db_file}")
+
+    @property
+    def backend(self) -> str:
+        return BACKEND_SQLITE if self.store is not None else BACKEND_FILES
+
     def _ensure_project_structure(self):
         """确保项目目录结构存在"""
         try:
@@ -81,6 +135,17 @@ class DataManager:
     def load_project_config(self) -> Dict[str, Any]:
         """加载项目配置"""
         try:
+            if self.store is not None:
+                # 章节列表和字数由章节表实时给出，不随配置存储
+                config = self.store.get_meta(META_CONFIG, {})
+                config["chapters"] = self.store.chapter_index()
+                config["word_count"] = self.store.total_words()
+                return config
+
+            # batch_updates 块内尚未写入的配置优先
+            if self._deferred_config is not None:
+                return self._deferred_config
+
             if not self.config_file.exists():
                 logger.warning(f"项目配置文件不存在: {self.config_file}")
                 return {}
@@ -103,11 +168,19 @@ class DataManager:
             # 更新修改时间
             config["updated"] = datetime.now().isoformat()
 
+            if self.store is not None:
+                stored = {k: v for k, v in config.items() if k not in ("chapters", "word_count")}
+                self.store.set_meta(META_CONFIG, stored)
+                return
+
             # 确保目录存在
             self.config_file.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
+            # 首次创建的配置直接落盘，保证项目目录可被识别
+            if self._batch_depth and self.config_file.exists():
+                self._deferred_config = config
+                return
+            atomic_write_json(str(self.config_file), config)
 
             logger.info(f"项目配置已保存: {self.config_file}")
 
@@ -128,14 +201,18 @@ class DataManager:
             章节内容字符串
         """
         try:
-            chapter_file = self.chapters_dir / f"chapter_{chapter_number:03d}.md"
-
-            if not chapter_file.exists():
-                logger.warning(f"章节文件不存在: {chapter_file}")
+            if self.store is not None:
+                content = self.store.read_chapter(chapter_number)
+                if content is None:
+                    logger.warning(f"章节不存在: {chapter_number}")
+                    return ""
+                return content
+
+            if not self.chapter_repository.exists(chapter_number):
+                logger.warning(f"章节不存在: {chapter_number}")
                 return ""
 
-            with open(chapter_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = self.chapter_repository.read(chapter_number)
 
             logger.debug(f"章节 {chapter_number} 已加载")
             return content
@@ -154,17 +231,17 @@ class DataManager:
             title: 章节标题
         """
         try:
-            # 确保目录存在
-            self.chapters_dir.mkdir(parents=True, exist_ok=True)
-
-            chapter_file = self.chapters_dir / f"chapter_{chapter_number:03d}.md"
-
             # 如果有标题，添加到内容开头
             if title:
                 content = f"# {title}\n\n{content}"
 
-            with open(chapter_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            if self.store is not None:
+                self.store.write_chapter(chapter_number, content, title or f"第{chapter_number}章")
+                logger.info(f"章节 {chapter_number} 已保存到数据库")
+                return
+
+            chapter_file = self.chapter_repository.write(chapter_number, content, FORMAT_MD)
+            self.word_index.update(chapter_filename(chapter_number, FORMAT_MD), count_words_compact(content))
 
             # 更新项目配置中的章节列表
             self._update_chapter_in_config(chapter_number, title)
@@ -183,11 +260,14 @@ class DataManager:
             chapter_number: 章节编号
         """
         try:
-            chapter_file = self.chapters_dir / f"chapter_{chapter_number:03d}.md"
+            if self.store is not None:
+                self.store.delete_chapter(chapter_number)
+                return
 
-            if chapter_file.exists():
-                chapter_file.unlink()
-                logger.info(f"章节文件已删除: {chapter_file}")
+            # 两种格式（生成流程的 .txt 与编辑器的 .md）的章节文件一并删除
+            for filename in self.chapter_repository.delete(chapter_number):
+                logger.info(f"章节文件已删除: {filename}")
+            self.word_index.remove(chapter_filename(chapter_number, FORMAT_MD))
 
             # 从项目配置中移除
             self._remove_chapter_from_config(chapter_number)
@@ -204,17 +284,10 @@ class DataManager:
             章节编号列表
         """
         try:
-            chapters = []
-            for chapter_file in self.chapters_dir.glob("chapter_*.md"):
-                # 提取章节编号
-                filename = chapter_file.stem  # 不含扩展名
-                try:
-                    chapter_num = int(filename.split("_")[1])
-                    chapters.append(chapter_num)
-                except (IndexError, ValueError):
-                    continue
+            if self.store is not None:
+                return self.store.list_chapters()
 
-            chapters.sort()
+            chapters = self.chapter_repository.list_chapters()
             logger.debug(f"发现 {len(chapters)} 个章节")
             return chapters
 
@@ -222,6 +295,43 @@ class DataManager:
             logger.error(f"列出章节失败: {e}")
             return []
 
+    def load_chapters(self, chapter_numbers: List[int]) -> Dict[int, str]:
+        """
+        批量加载章节内容
+
+        Args:
+            chapter_numbers: 章节编号列表
+
+        Returns:
+            {章节编号: 内容}，不存在的章节不出现在结果中
+        """
+        if self.store is not None:
+            return self.store.read_chapters(chapter_numbers)
+        return self.chapter_repository.read_many(chapter_numbers)
+
+    def search_chapters(self, query: str, limit: int = 50) -> List[tuple]:
+        """
+        搜索章节正文
+
+        Args:
+            query: 关键词
+            limit: 最多返回条数
+
+        Returns:
+            [(章节编号, 片段)]；单文件存储使用全文索引，目录布局逐章查找
+        """
+        if self.store is not None:
+            return self.store.search_chapters(query, limit)
+
+        results = []
+        for chapter_number, content in self.load_chapters(self.list_chapters()).items():
+            pos = content.find(query) if query else -1
+            if pos >= 0:
+                results.append((chapter_number, content[max(0, pos - 16):pos + len(query) + 16]))
+                if len(results) >= limit:
+                    break
+        return results
+
     def get_chapter_count(self) -> int:
         """获取章节数量"""
         return len(self.list_chapters())
@@ -236,6 +346,7 @@ class DataManager:
             chapter_info = {
                 "number": chapter_number,
                 "title": title or f"第{chapter_number}章",
+                "word_count": self.word_index.words(f"chapter_{chapter_number:03d}.md"),
                 "updated": datetime.now().isoformat()
             }
 
@@ -252,8 +363,8 @@ class DataManager:
             # 按章节号排序
             chapters.sort(key=lambda x: x["number"])
 
-            # 重新计算总字数
-            total_words = self._calculate_total_words()
+            # 按字数索引增量求和，不再读取所有章节
+            total_words = self.word_index.cached_total(".md")
             config["chapters"] = chapters
             config["word_count"] = total_words
 
@@ -271,8 +382,8 @@ class DataManager:
             # 过滤掉指定章节
             chapters = [c for c in chapters if c["number"] != chapter_number]
 
-            # 重新计算总字数
-            total_words = self._calculate_total_words()
+            # 按字数索引增量求和，不再读取所有章节
+            total_words = self.word_index.cached_total(".md")
             config["chapters"] = chapters
             config["word_count"] = total_words
 
@@ -282,15 +393,11 @@ class DataManager:
             logger.error(f"移除章节配置失败: {e}")
 
     def _calculate_total_words(self) -> int:
-        """计算项目总字数"""
+        """计算项目总字数（校验字数索引，只重新读取有变化的章节）"""
+        if self.store is not None:
+            return self.store.total_words()
         try:
-            total_words = 0
-            for chapter_number in self.list_chapters():
-                content = self.load_chapter(chapter_number)
-                # 简单字数统计（去除空白字符）
-                words = len(content.replace(" ", "").replace("\n", ""))
-                total_words += words
-            return total_words
+            return self.word_index.total(".md", count_words_compact)
         except Exception as e:
             logger.error(f"计算总字数失败: {e}")
             return 0
@@ -300,6 +407,9 @@ class DataManager:
     def load_architecture(self) -> str:
         """加载小说架构"""
         try:
+            if self.store is not None:
+                return self.store.get_document(DOC_ARCHITECTURE) or ""
+
             if not self.architecture_file.exists():
                 logger.warning(f"架构文件不存在: {self.architecture_file}")
                 return ""
@@ -317,11 +427,15 @@ class DataManager:
     def save_architecture(self, content: str):
         """保存小说架构"""
         try:
+            if self.store is not None:
+                self.store.set_document(DOC_ARCHITECTURE, content)
+                logger.info(f"小说架构已保存到数据库")
+                return
+
             # 确保目录存在
             self.architecture_file.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(self.architecture_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            atomic_write_text(str(self.architecture_file), content)
 
             logger.info(f"小说架构已保存: {self.architecture_file}")
 
@@ -334,6 +448,9 @@ class DataManager:
     def load_blueprint(self) -> str:
         """加载章节蓝图"""
         try:
+            if self.store is not None:
+                return self.store.get_document(DOC_BLUEPRINT) or ""
+
             if not self.blueprint_file.exists():
                 logger.warning(f"蓝图文件不存在: {self.blueprint_file}")
                 return ""
@@ -351,11 +468,15 @@ class DataManager:
     def save_blueprint(self, content: str):
         """保存章节蓝图"""
         try:
+            if self.store is not None:
+                self.store.set_document(DOC_BLUEPRINT, content)
+                logger.info(f"章节蓝图已保存到数据库")
+                return
+
             # 确保目录存在
             self.blueprint_file.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(self.blueprint_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            atomic_write_text(str(self.blueprint_file), content)
 
             logger.info(f"章节蓝图已保存: {self.blueprint_file}")
 
@@ -368,6 +489,9 @@ class DataManager:
     def load_summary(self) -> str:
         """加载全局概览"""
         try:
+            if self.store is not None:
+                return self.store.get_document(DOC_SUMMARY) or ""
+
             if not self.summary_file.exists():
                 logger.warning(f"概览文件不存在: {self.summary_file}")
                 return ""
@@ -385,11 +509,15 @@ class DataManager:
     def save_summary(self, content: str):
         """保存全局概览"""
         try:
+            if self.store is not None:
+                self.store.set_document(DOC_SUMMARY, content)
+                logger.info(f"全局概览已保存到数据库")
+                return
+
             # 确保目录存在
             self.summary_file.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(self.summary_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            atomic_write_text(str(self.summary_file), content)
 
             logger.info(f"全局概览已保存: {self.summary_file}")
 
@@ -402,6 +530,9 @@ class DataManager:
     def load_roles(self) -> Dict[str, Any]:
         """加载角色数据"""
         try:
+            if self.store is not None:
+                return self.store.load_roles()
+
             if not self.roles_file.exists():
                 logger.warning(f"角色文件不存在: {self.roles_file}")
                 return {}
@@ -422,11 +553,15 @@ class DataManager:
     def save_roles(self, roles: Dict[str, Any]):
         """保存角色数据"""
         try:
+            if self.store is not None:
+                self.store.save_roles(roles)
+                logger.info(f"角色数据已保存到数据库，共 {len(roles)} 个角色")
+                return
+
             # 确保目录存在
             self.roles_file.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(self.roles_file, 'w', encoding='utf-8') as f:
-                json.dump(roles, f, ensure_ascii=False, indent=2)
+            atomic_write_json(str(self.roles_file), roles)
 
             logger.info(f"角色数据已保存，共 {len(roles)} 个角色")
 
@@ -436,6 +571,22 @@ class DataManager:
 
     # ========== 工具方法 ==========
 
+    @contextmanager
+    def batch_updates(self):
+        """
+        合并 with 块内的项目配置写入：批量保存、删除章节时，块内每次改动只更新内存中的配置，
+        退出时一次性原子写入 project.json。块内抛出异常时同样写入，使配置与已写入的章节文件一致。
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._deferred_config is not None:
+                config, self._deferred_config = self._deferred_config, None
+                atomic_write_json(str(self.config_file), config)
+                logger.info(f"项目配置已保存: {self.config_file}")
+
     def get_project_info(self) -> Dict[str, Any]:
         """获取项目基本信息"""
         try:
@@ -462,50 +613,125 @@ class DataManager:
         导出整个项目
 
         Args:
-            export_path: 导出目标路径
+            export_path: 导出目标路径；以 .zip 结尾时流式打包为单个归档，否则导出为目录
         """
         try:
             import shutil
             export_dir = Path(export_path)
 
+            if export_dir.suffix.lower() == ".zip" and self.store is None:
+                export_project_archive(str(self.project_path), str(export_dir))
+                logger.info(f"项目已导出到: {export_path}")
+                return
+
             if export_dir.exists():
                 shutil.rmtree(export_dir)
 
-            # 复制整个项目目录
-            shutil.copytree(self.project_path, export_dir)
+            if self.store is not None:
+                # 单文件存储导出为目录布局
+                self.store.export_folder(str(export_dir))
+                logger.info(f"项目已导出到: {export_path}")
+                return
+
+            # 复制项目目录（备份和向量库可重建，不随导出复制）
+            shutil.copytree(
+                self.project_path, export_dir,
+                ignore=shutil.ignore_patterns(*ARCHIVE_EXCLUDED_DIRS)
+            )
             logger.info(f"项目已导出到: {export_path}")
 
         except Exception as e:
             logger.error(f"导出项目失败: {e}")
             raise
 
-    def backup_project(self, backup_dir: Optional[str] = None) -> str:
+    def _backup_store(self, backup_dir: Optional[str] = None) -> BackupStore:
+        return BackupStore(str(backup_dir) if backup_dir else str(self.project_path / "backup"))
+
+    def backup_project(self, backup_dir: Optional[str] = None, include_vectorstore: bool = False,
+                       keep: Optional[int] = None) -> str:
         """
-        备份项目
+        增量备份项目（内容寻址，只写入变化的文件）
 
         Args:
             backup_dir: 备份目录，默认在项目目录下创建backup文件夹
+            include_vectorstore: 是否一并备份向量库
+            keep: 备份后只保留最近的若干个快照，None 表示不清理
 
         Returns:
-            备份文件路径
+            快照编号
         """
         try:
-            if backup_dir is None:
-                backup_dir = self.project_path / "backup"
+            store = self._backup_store(backup_dir)
+            if self.store is None:
+                snapshot_id = store.create_snapshot(str(self.project_path), include_vectorstore)
             else:
-                backup_dir = Path(backup_dir)
-
-            # 创建带时间戳的备份文件夹
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = backup_dir / f"backup_{timestamp}"
+                # 数据库先做在线备份，避免读到写了一半的 WAL
+                db_copy = os.path.join(store.backup_dir, f".{PROJECT_DB_FILE}.snapshot")
+                self.store.backup_to(db_copy)
+                try:
+                    snapshot_id = store.create_snapshot(
+                        str(self.project_path), include_vectorstore,
+                        extra_files={PROJECT_DB_FILE: db_copy},
+                        excluded_files=[PROJECT_DB_FILE, f"{PROJECT_DB_FILE}-wal", f"{PROJECT_DB_FILE}-shm"]
+                    )
+                finally:
+                    os.remove(db_copy)
 
-            # 复制项目文件
-            import shutil
-            shutil.copytree(self.project_path, backup_path)
+            if keep is not None:
+                store.prune(keep)
 
-            logger.info(f"项目已备份到: {backup_path}")
-            return str(backup_path)
+            logger.info(f"项目已备份: {snapshot_id}")
+            return snapshot_id
 
         except Exception as e:
             logger.error(f"备份项目失败: {e}")
             raise
+
+    def list_backups(self, backup_dir: Optional[str] = None) -> List[str]:
+        """按时间顺序列出所有备份快照编号"""
+        return self._backup_store(backup_dir).list_snapshots()
+
+    def restore_backup(self, snapshot_id: str, backup_dir: Optional[str] = None,
+                       target_path: Optional[str] = None) -> int:
+        """
+        恢复备份快照；恢复后目标目录与快照一致，快照之后新建的章节和文件会被删除（备份目录和未备份的向量库保留）
+
+        Args:
+            snapshot_id: 快照编号
+            backup_dir: 备份目录
+            target_path: 恢复目标目录，默认恢复到项目目录
+
+        Returns:
+            从备份写入的文件数
+        """
+        try:
+            in_place = target_path is None
+            if in_place:
+                # 覆盖数据库文件前关闭所有线程的数据库连接；旧的 -wal/-shm 不在快照中，恢复时删除
+                release_project_store(str(self.project_path))
+                self.store = None
+
+            restored = self._backup_store(backup_dir).restore_snapshot(
+                snapshot_id, target_path or str(self.project_path)
+            )
+
+            if in_place:
+                # 快照可能来自转换为单文件存储之前（或之后），按恢复后的文件重新选择后端
+                self._init_backend()
+            return restored
+
+        except Exception as e:
+            logger.error(f"恢复备份失败: {e}")
+            if target_path is None:
+                # 恢复失败时项目目录保持原样，重新打开原来的存储
+                self._init_backend()
+            raise
+
+    def prune_backups(self, keep: int, backup_dir: Optional[str] = None) -> int:
+        """
+        只保留最近 keep 个备份快照
+
+        Returns:
+            删除的对象数
+        """
+        return self._backup_store(backup_dir).prune(keep)
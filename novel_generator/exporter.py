@@ -0,0 +1,264 @@
+# novel_generator/exporter.py
+# -*- coding: utf-8 -*-
+"""
+流式导出
+
+按章节顺序逐章读取并直接写入输出文件（单个 TXT / Markdown、每章一个文件的 ZIP、EPUB），
+任一时刻内存中只有一章正文。输出先写入同目录的临时文件，完成后再替换到目标路径，
+中途失败或取消不会留下半个文件。
+"""
+
+import os
+import re
+import html
+import uuid
+import logging
+import zipfile
+import tempfile
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from novel_generator.common import CancellationToken
+from storage import target_file_mode
+
+logger = logging.getLogger(__name__)
+
+FORMAT_TXT = "txt"
+FORMAT_MARKDOWN = "markdown"
+FORMAT_ZIP = "zip"
+FORMAT_EPUB = "epub"
+EXPORT_FORMATS = {
+    FORMAT_TXT: ".txt",
+    FORMAT_MARKDOWN: ".md",
+    FORMAT_ZIP: ".zip",
+    FORMAT_EPUB: ".epub",
+}
+
+# 项目归档时跳过的目录
+ARCHIVE_EXCLUDED_DIRS = {"backup", "backups", "vectorstore", "__pycache__"}
+
+_MD_TITLE = re.compile(r"^#\s*(.+?)\s*\n+")
+
+ProgressCallback = Callable[[int, int, str], None]  # (已完成, 总数, 消息)
+
+
+def split_title(chapter_number: int, content: str) -> Tuple[str, str]:
+    """拆出编辑器写入的“# 标题”，没有标题时使用“第N章”"""
+    match = _MD_TITLE.match(content)
+    if match:
+        return match.group(1), content[match.end():]
+    return f"第{chapter_number}章", content
+
+
+def iter_project_chapters(data_manager) -> Iterator[Tuple[int, str]]:
+    """按章节号顺序逐章读取（不一次性加载全部章节）"""
+    for chapter_number in data_manager.list_chapters():
+        yield chapter_number, data_manager.load_chapter(chapter_number)
+
+
+# ========== 各格式写入器 ==========
+
+class _TextWriter:
+    def __init__(self, path: str, markdown: bool, book_title: str):
+        self.f = open(path, "w", encoding="utf-8", newline="\n")
+        self.markdown = markdown
+        if book_title:
+            self.f.write(f"# {book_title}\n\n" if markdown else f"{book_title}\n\n")
+
+    def add(self, chapter_number: int, title: str, body: str):
+        heading = f"## {title}" if self.markdown else title
+        self.f.write(f"{heading}\n\n{body.strip()}\n\n")
+
+    def close(self):
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        self.f.close()
+
+
+class _ZipWriter:
+    def __init__(self, path: str, book_title: str):
+        self.zf = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def add(self, chapter_number: int, title: str, body: str):
+        with self.zf.open(f"chapters/chapter_{chapter_number:03d}.txt", "w") as entry:
+            entry.write(f"{title}\n\n{body.strip()}\n".encode("utf-8"))
+
+    def close(self):
+        self.zf.close()
+
+
+class _EpubWriter:
+    """最小 EPUB 3 写入器：章节逐个写入，目录和清单在结束时写入"""
+
+    def __init__(self, path: str, book_title: str):
+        self.book_title = book_title or "未命名小说"
+        self.chapters: List[Tuple[str, str]] = []  # (文件名, 标题)
+        self.zf = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        # mimetype 必须是第一个且不压缩
+        self.zf.writestr(zipfile.ZipInfo("mimetype"), "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+        self.zf.writestr("META-INF/container.xml", (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">'
+            '<rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>'
+            '</rootfiles></container>'
+        ))
+
+    def add(self, chapter_number: int, title: str, body: str):
+        name = f"chapter_{chapter_number:03d}.xhtml"
+        with self.zf.open(f"OEBPS/{name}", "w") as entry:
+            entry.write((
+                '<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="zh-CN"><head>'
+                f'<title>{html.escape(title)}</title></head><body>'
+                f'<h2>{html.escape(title)}</h2>'
+            ).encode("utf-8"))
+            for paragraph in body.splitlines():
+                paragraph = paragraph.strip()
+                if paragraph:
+                    entry.write(f"<p>{html.escape(paragraph)}</p>".encode("utf-8"))
+            entry.write(b"</body></html>")
+        self.chapters.append((name, title))
+
+    def close(self):
+        items = "".join(
+            f'<item id="c{i}" href="{name}" media-type="application/xhtml+xml"/>'
+            for i, (name, _) in enumerate(self.chapters)
+        )
+        spine = "".join(f'<itemref idref="c{i}"/>' for i in range(len(self.chapters)))
+        self.zf.writestr("OEBPS/content.opf", (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="book-id">'
+            '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">'
+            f'<dc:identifier id="book-id">urn:uuid:{uuid.uuid4()}</dc:identifier>'
+            f'<dc:title>{html.escape(self.book_title)}</dc:title><dc:language>zh-CN</dc:language>'
+            f'<meta property="dcterms:modified">{datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")}</meta>'
+            '</metadata><manifest>'
+            '<item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>'
+            f'{items}</manifest><spine>{spine}</spine></package>'
+        ))
+        toc = "".join(
+            f'<li><a href="{name}">{html.escape(title)}</a></li>' for name, title in self.chapters
+        )
+        self.zf.writestr("OEBPS/nav.xhtml", (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">'
+            f'<head><title>{html.escape(self.book_title)}</title></head><body>'
+            f'<nav epub:type="toc"><ol>{toc}</ol></nav></body></html>'
+        ))
+        self.zf.close()
+
+
+def _create_writer(fmt: str, path: str, book_title: str):
+    if fmt == FORMAT_TXT:
+        return _TextWriter(path, markdown=False, book_title=book_title)
+    if fmt == FORMAT_MARKDOWN:
+        return _TextWriter(path, markdown=True, book_title=book_title)
+    if fmt == FORMAT_ZIP:
+        return _ZipWriter(path, book_title)
+    if fmt == FORMAT_EPUB:
+        return _EpubWriter(path, book_title)
+    raise ValueError(f"不支持的导出格式: {fmt}")
+
+
+def _temp_path_for(output_path: str) -> str:
+    """在输出文件同目录下创建临时文件，权限与 storage 的原子写入一致（mkstemp 默认为 0600）"""
+    directory = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(output_path)}.", suffix=".tmp")
+    try:
+        if os.name != "nt":
+            os.fchmod(fd, target_file_mode(output_path))
+    finally:
+        os.close(fd)
+    return temp_path
+
+
+# ========== 导出入口 ==========
+
+def export_chapters(chapters: Iterable[Tuple[int, str]], output_path: str, fmt: str,
+                    book_title: str = "", total: int = 0,
+                    progress_callback: Optional[ProgressCallback] = None,
+                    cancel_token: Optional[CancellationToken] = None) -> int:
+    """
+    把章节流式写入导出文件
+
+    Args:
+        chapters: 按顺序产出 (章节号, 正文) 的可迭代对象，建议传入生成器以保持内存平稳
+        output_path: 输出文件路径
+        fmt: 导出格式，见 EXPORT_FORMATS
+        book_title: 书名
+        total: 章节总数（仅用于进度显示）
+        progress_callback: 进度回调 (已完成, 总数, 消息)
+        cancel_token: 取消令牌，取消时抛出 OperationCancelled 且不留下输出文件
+
+    Returns:
+        导出的章节数
+    """
+    temp_path = _temp_path_for(output_path)
+    writer = None
+    count = 0
+    try:
+        writer = _create_writer(fmt, temp_path, book_title)
+        for chapter_number, content in chapters:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            title, body = split_title(chapter_number, content)
+            writer.add(chapter_number, title, body)
+            count += 1
+            if progress_callback:
+                progress_callback(count, total, f"已导出 {title}")
+        writer.close()
+        writer = None
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception:
+                pass
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    logger.info(f"已导出 {count} 章到 {output_path}（{fmt}）")
+    return count
+
+
+def export_project_archive(project_path: str, output_path: str,
+                           progress_callback: Optional[ProgressCallback] = None,
+                           cancel_token: Optional[CancellationToken] = None) -> int:
+    """
+    把整个项目目录流式打包为 ZIP（不复制目录，跳过备份和向量库）
+
+    Returns:
+        打包的文件数
+    """
+    project_path = os.path.abspath(str(project_path))
+    output_abs = os.path.abspath(output_path)
+    files = []
+    for root, dirs, names in os.walk(project_path):
+        dirs[:] = [d for d in dirs if d not in ARCHIVE_EXCLUDED_DIRS]
+        for name in names:
+            path = os.path.join(root, name)
+            if name.endswith(".tmp") or os.path.abspath(path) == output_abs:
+                continue
+            files.append(path)
+
+    temp_path = _temp_path_for(output_path)
+    try:
+        with zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for i, path in enumerate(files, 1):
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                arcname = os.path.relpath(path, project_path).replace(os.sep, "/")
+                zf.write(path, arcname)  # zipfile 分块读取，不整文件载入内存
+                if progress_callback:
+                    progress_callback(i, len(files), f"已打包 {arcname}")
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    logger.info(f"项目已打包到 {output_path}，共 {len(files)} 个文件")
+    return len(files)
@@ -5,12 +5,18 @@
 """
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from llm_adapters import create_llm_adapter
 from embedding_adapters import create_embedding_adapter
-from prompt_definitions import summary_prompt, update_character_state_prompt
-from novel_generator.common import invoke_with_cleaning
-from utils import read_file, clear_file_content, save_string_to_txt
-from novel_generator.vectorstore_utils import update_vector_store
+from typing import Optional
+from novel_generator.common import invoke_with_cleaning, CancellationToken
+from utils import save_strings_to_txt_atomic
+from storage import recover_journal
+from novel_generator.vectorstore_utils import ChapterVectors, prepare_chapter_vectors, write_chapter_vectors
+from novel_generator.summary_store import SummaryStore, update_summary_store
+from novel_generator.character_state_store import CharacterStateStore, update_character_state_store
+from novel_generator.chapter_repository import get_chapter_repository
+from novel_generator.sqlite_store import get_project_store, uses_sqlite_store
 logging.basicConfig(
     filename='app.log',      # 日志文件名
     filemode='a',            # 追加模式（'w' 会覆盖）
@@ -32,23 +38,34 @@ def finalize_chapter(
     embedding_model_name: str,
     interface_format: str,
     max_tokens: int,
-    timeout: int = 600
+    timeout: int = 600,
+    cancel_token: Optional[CancellationToken] = None
 ):
     """
     对指定章节做最终处理：更新前文摘要、更新角色状态、插入向量库等。
     默认无需再做扩写操作，若有需要可在外部调用 enrich_chapter_text 处理后再定稿。
+
+    摘要和角色状态两次LLM调用以及章节向量的计算只依赖章节文本和旧的状态文件，因此三者并发执行；
+    摘要和角色状态都完成后一起原子提交，任一调用失败则文件都保持原样。
+    算好的向量只在提交成功后写入向量库，并按章节号覆盖该章已有的片段，失败后重试不会产生重复向量。
+
+    前文摘要采用分层存储（见 summary_store），每次只摘要本章并刷新所在篇章，
+    global_summary.txt 保存其固定大小的视图。
+    角色状态采用结构化存储（见 character_state_store），LLM只针对本章出场角色返回字段补丁，
+    character_state.txt 保存其渲染结果。
+    cancel_token 被置位时抛出 OperationCancelled，摘要和角色状态文件保持原样。
     """
-    chapters_dir = os.path.join(filepath, "chapters")
-    chapter_file = os.path.join(chapters_dir, f"chapter_{novel_number}.txt")
-    chapter_text = read_file(chapter_file).strip()
+    # 上一次定稿若在提交文件时被中断，先补完
+    recover_journal(filepath)
+
+    chapter_text = get_chapter_repository(filepath).read(novel_number).strip()
     if not chapter_text:
         logging.warning(f"Chapter {novel_number} is empty, cannot finalize.")
         return
 
     global_summary_file = os.path.join(filepath, "global_summary.txt")
-    old_global_summary = read_file(global_summary_file)
-    character_state_file = os.path.join(filepath, "character_state.txt")
-    old_character_state = read_file(character_state_file)
+    summary_store = SummaryStore.load(filepath)
+    character_state_store = CharacterStateStore.load(filepath)
 
     llm_adapter = create_llm_adapter(
         interface_format=interface_format,
@@ -60,43 +77,55 @@ def finalize_chapter(
         timeout=timeout
     )
 
-    prompt_summary = summary_prompt.format(
-        chapter_text=chapter_text,
-        global_summary=old_global_summary
-    )
-    new_global_summary = invoke_with_cleaning(llm_adapter, prompt_summary)
-    if not new_global_summary.strip():
-        new_global_summary = old_global_summary
+    def update_summary() -> SummaryStore:
+        return update_summary_store(llm_adapter, summary_store, novel_number, chapter_text, cancel_token)
+
+    def update_character_state() -> CharacterStateStore:
+        return update_character_state_store(llm_adapter, character_state_store, chapter_text, cancel_token)
 
-    prompt_char_state = update_character_state_prompt.format(
-        chapter_text=chapter_text,
-        old_state=old_character_state
+    embedding_adapter = create_embedding_adapter(
+        embedding_interface_format,
+        embedding_api_key,
+        embedding_url,
+        embedding_model_name
     )
-    new_char_state = invoke_with_cleaning(llm_adapter, prompt_char_state)
-    if not new_char_state.strip():
-        new_char_state = old_character_state
 
-    clear_file_content(global_summary_file)
-    save_string_to_txt(new_global_summary, global_summary_file)
-    clear_file_content(character_state_file)
-    save_string_to_txt(new_char_state, character_state_file)
+    def embed_chapter() -> Optional[ChapterVectors]:
+        # 只计算向量，写入向量库要等摘要和角色状态提交成功之后
+        from .context_retriever import generate_project_id
+        return prepare_chapter_vectors(
+            embedding_adapter,
+            chapter_text,
+            chapter_num=novel_number,
+            project_id=generate_project_id(filepath)
+        )
 
-    # 生成项目ID用于metadata
-    from .context_retriever import generate_project_id
-    project_id = generate_project_id(filepath)
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="finalize") as executor:
+        summary_future = executor.submit(update_summary)
+        char_state_future = executor.submit(update_character_state)
+        embed_future = executor.submit(embed_chapter)
 
-    update_vector_store(
-        embedding_adapter=create_embedding_adapter(
-            embedding_interface_format,
-            embedding_api_key,
-            embedding_url,
-            embedding_model_name
-        ),
-        new_chapter=chapter_text,
-        filepath=filepath,
-        chapter_num=novel_number,
-        project_id=project_id
-    )
+        # result() 会重新抛出任务中的异常；退出 with 前会等待所有任务结束
+        new_summary_store = summary_future.result()
+        new_character_state_store = char_state_future.result()
+
+    if not save_strings_to_txt_atomic({
+        SummaryStore.get_store_file(filepath): new_summary_store.dumps(),
+        global_summary_file: new_summary_store.render_view(),
+        CharacterStateStore.get_store_file(filepath): new_character_state_store.dumps(),
+        CharacterStateStore.get_text_file(filepath): new_character_state_store.render()
+    }):
+        logging.error(f"Failed to save summary/character state for chapter {novel_number}.")
+        return
+    if uses_sqlite_store(filepath):
+        # 单文件存储的项目同时更新数据库中的单章摘要
+        get_project_store(filepath).set_chapter_summary(
+            novel_number, new_summary_store.chapters.get(novel_number, "")
+        )
+
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
+    write_chapter_vectors(embedding_adapter, filepath, embed_future.result(), chapter_num=novel_number)
 
     logging.info(f"Chapter {novel_number} has been finalized.")
 
@@ -7,11 +7,14 @@ import os
 import logging
 import re
 import traceback
-import nltk
 import warnings
 from utils import read_file
+from lazy_import import lazy_module, lazy_attr
 from novel_generator.vectorstore_utils import load_vector_store, init_vector_store
-from langchain.docstore.document import Document
+
+# 导入知识文件时才需要
+nltk = lazy_module("nltk")
+Document = lazy_attr("langchain.docstore.document", "Document")
 
 # 禁用特定的Torch警告
 warnings.filterwarnings('ignore', message='.*Torch was not compiled with flash attention.*')
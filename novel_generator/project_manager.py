@@ -12,6 +12,10 @@ from pathlib import Path
 from datetime import datetime
 
 from .data_manager import DataManager
+from .exporter import EXPORT_FORMATS, ProgressCallback, export_chapters, iter_project_chapters
+from .common import CancellationToken
+from .project_stats import ProjectStatsService
+from storage import atomic_write_text, atomic_write_json
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +33,7 @@ class ProjectManager:
         self.project_path = None
         self.data_manager = None
         self.is_project_loaded = False
+        self.stats_service: Optional[ProjectStatsService] = None
 
         if project_path:
             self.load_project(project_path)
@@ -57,8 +62,7 @@ class ProjectManager:
             config["created"] = datetime.now().isoformat()
             self.data_manager.save_project_config(config)
 
-            self.project_path = str(project_dir)
-            self.is_project_loaded = True
+            self._set_project(str(project_dir))
 
             logger.info(f"项目已创建: {project_path}")
             return True
@@ -89,8 +93,7 @@ class ProjectManager:
 
             # 初始化数据管理器
             self.data_manager = DataManager(str(project_dir))
-            self.project_path = str(project_dir)
-            self.is_project_loaded = True
+            self._set_project(str(project_dir))
 
             logger.info(f"项目已加载: {project_path}")
             return True
@@ -99,6 +102,18 @@ class ProjectManager:
             logger.error(f"加载项目失败: {e}")
             return False
 
+    def attach_project(self, project_path: str, data_manager: DataManager):
+        """
+        切换到已在别处（如后台线程）打开的项目，不再访问磁盘
+
+        Args:
+            project_path: 项目路径
+            data_manager: 该项目的数据管理器
+        """
+        self.data_manager = data_manager
+        self._set_project(str(project_path))
+        logger.info(f"项目已加载: {project_path}")
+
     def save_project(self) -> bool:
         """
         保存当前项目
@@ -119,8 +134,19 @@ class ProjectManager:
             logger.error(f"保存项目失败: {e}")
             return False
 
+    def _set_project(self, project_path: str):
+        """切换到已初始化数据管理器的项目，统计服务在首次读取统计时才扫描目录"""
+        if self.stats_service is not None:
+            self.stats_service.stop()
+        self.project_path = project_path
+        self.is_project_loaded = True
+        self.stats_service = ProjectStatsService(project_path, self.data_manager.get_project_info)
+
     def close_project(self):
         """关闭当前项目"""
+        if self.stats_service is not None:
+            self.stats_service.stop()
+            self.stats_service = None
         self.project_path = None
         self.data_manager = None
         self.is_project_loaded = False
@@ -157,6 +183,18 @@ class ProjectManager:
 
         return self.data_manager.get_project_info()
 
+    def get_all_chapters(self) -> List[str]:
+        """
+        按章节号顺序获取所有章节内容
+
+        Returns:
+            章节内容列表
+        """
+        if not self.is_project_loaded or not self.data_manager:
+            return []
+
+        return list(self.data_manager.load_chapters(self.data_manager.list_chapters()).values())
+
     def create_project_structure(self, project_path: str) -> bool:
         """
         创建标准的项目目录结构
@@ -206,7 +244,7 @@ class ProjectManager:
 
 创建时间: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 """
-            (project_dir / "README.md").write_text(readme_content, encoding='utf-8')
+            atomic_write_text(str(project_dir / "README.md"), readme_content)
 
             # 创建默认项目配置
             default_config = {
@@ -222,10 +260,7 @@ class ProjectManager:
                 }
             }
 
-            config_file = project_dir / "project.json"
-            import json
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(default_config, f, ensure_ascii=False, indent=2)
+            atomic_write_json(str(project_dir / "project.json"), default_config)
 
             logger.info(f"项目结构已创建: {project_path}")
             return True
@@ -288,16 +323,14 @@ class ProjectManager:
             return {}
 
         try:
-            info = self.get_project_info()
-            chapter_count = info.get("chapter_count", 0)
-            word_count = info.get("word_count", 0)
-            role_count = info.get("role_count", 0)
-
-            # 计算项目大小
-            project_size = self.get_directory_size(self.project_path)
-            chapters_size = self.get_directory_size(
-                os.path.join(self.project_path, "chapters")
-            )
+            # 统计服务维护的快照：首次读取时扫描一次，之后随文件变化增量更新
+            stats = self.stats_service.snapshot()
+            info = stats["info"]
+            chapter_count = stats["chapter_count"]
+            word_count = stats["word_count"]
+            role_count = stats["role_count"]
+            project_size = stats["project_size"]
+            chapters_size = stats["chapters_size"]
 
             # 计算平均章节字数
             avg_words = word_count // chapter_count if chapter_count > 0 else 0
@@ -328,10 +361,13 @@ class ProjectManager:
             logger.error(f"获取项目统计失败: {e}")
             return {}
 
-    def auto_save_project(self) -> bool:
+    def auto_save_project(self, max_backups: Optional[int] = None) -> bool:
         """
         自动保存项目
 
+        Args:
+            max_backups: 最多保留的自动备份快照数，None 表示不清理
+
         Returns:
             保存是否成功
         """
@@ -344,8 +380,8 @@ class ProjectManager:
 
             # 创建自动备份
             if self.data_manager:
-                backup_path = self.data_manager.backup_project()
-                logger.debug(f"自动备份已创建: {backup_path}")
+                snapshot_id = self.data_manager.backup_project(keep=max_backups)
+                logger.debug(f"自动备份已创建: {snapshot_id}")
 
             return True
 
@@ -385,7 +421,7 @@ class ProjectManager:
 
         Args:
             export_path: 导出路径
-            format_type: 导出格式（full, chapters, summary）
+            format_type: 导出格式（full, chapters, summary，或 txt/markdown/zip/epub 单文件成书）
 
         Returns:
             导出是否成功
@@ -403,6 +439,9 @@ class ProjectManager:
             elif format_type == "summary":
                 # 导出项目摘要
                 self._export_project_summary(export_path)
+            elif format_type in EXPORT_FORMATS:
+                # 逐章流式写入单个文件
+                self.export_book(export_path, format_type)
             else:
                 logger.error(f"不支持的导出格式: {format_type}")
                 return False
@@ -419,11 +458,31 @@ class ProjectManager:
         chapters_dir = Path(export_path) / "chapters"
         chapters_dir.mkdir(parents=True, exist_ok=True)
 
-        for chapter_num in self.data_manager.list_chapters():
-            content = self.data_manager.load_chapter(chapter_num)
+        for chapter_num, content in iter_project_chapters(self.data_manager):
             chapter_file = chapters_dir / f"chapter_{chapter_num:03d}.md"
-            with open(chapter_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            atomic_write_text(str(chapter_file), content)
+
+    def export_book(self, output_path: str, format_type: str,
+                    progress_callback: Optional[ProgressCallback] = None,
+                    cancel_token: Optional[CancellationToken] = None) -> int:
+        """
+        把全部章节按顺序流式导出为单个文件
+
+        Args:
+            output_path: 输出文件路径
+            format_type: txt / markdown / zip / epub
+            progress_callback: 进度回调 (已完成, 总数, 消息)
+            cancel_token: 取消令牌
+
+        Returns:
+            导出的章节数
+        """
+        name = self.data_manager.load_project_config().get("name", "")
+        return export_chapters(
+            iter_project_chapters(self.data_manager), output_path, format_type,
+            book_title=name, total=self.data_manager.get_chapter_count(),
+            progress_callback=progress_callback, cancel_token=cancel_token
+        )
 
     def _export_project_summary(self, export_path: str):
         """导出项目摘要"""
@@ -459,5 +518,4 @@ class ProjectManager:
 
         # 保存摘要文件
         summary_file = export_dir / "project_summary.md"
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            f.write("\n".join(summary_content))
+        atomic_write_text(str(summary_file), "\n".join(summary_content))
@@ -0,0 +1,189 @@
+# novel_generator/project_stats.py
+# -*- coding: utf-8 -*-
+"""
+项目统计服务
+
+首次访问时遍历一次项目目录，记录每个文件的大小，并读取项目信息（名称、章节数、字数、角色数等）；
+之后由 watchfiles 在后台线程监听项目目录，按变更的文件增量调整目录大小，
+只有章节、项目配置或角色文件变化时才重新读取项目信息。界面读取的是预先算好的快照，耗时 O(1)。
+
+未安装 watchfiles 时退化为：快照超过 FALLBACK_TTL 秒或被标记为过期（mark_dirty）时才整体重算。
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import watchfiles
+except ImportError:  # 可选依赖
+    watchfiles = None
+
+logger = logging.getLogger(__name__)
+
+CHAPTERS_DIR = "chapters"
+FALLBACK_TTL = 5.0
+# 变化后需要重新读取项目信息的文件（相对项目目录）
+_COUNT_FILES = {"project.json", "roles.json", "project.db", "project.db-wal"}
+
+StatsListener = Callable[[Dict[str, Any]], None]
+
+
+class ProjectStatsService:
+    """单个项目的统计缓存"""
+
+    def __init__(self, project_path: str, info_loader: Callable[[], Dict[str, Any]]):
+        """
+        Args:
+            project_path: 项目目录
+            info_loader: 返回项目信息的函数（DataManager.get_project_info），
+                         需包含 chapter_count、word_count、role_count
+        """
+        self.project_path = os.path.abspath(str(project_path))
+        self.chapters_prefix = os.path.join(self.project_path, CHAPTERS_DIR) + os.sep
+        self.info_loader = info_loader
+
+        self._lock = threading.Lock()
+        self._file_sizes: Dict[str, int] = {}
+        self._project_size = 0
+        self._chapters_size = 0
+        self._info: Dict[str, Any] = {}
+        self._ready = False
+        self._dirty = False
+        self._scanned_at = 0.0
+
+        self._listeners: List[StatsListener] = []
+        self._stop_event = threading.Event()
+        self._watch_thread: Optional[threading.Thread] = None
+
+    # ========== 计算 ==========
+
+    def _is_chapter_file(self, path: str) -> bool:
+        return path.startswith(self.chapters_prefix)
+
+    def _full_scan(self):
+        sizes = {}
+        for dirpath, _, filenames in os.walk(self.project_path):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    sizes[path] = os.path.getsize(path)
+                except OSError:
+                    continue
+        info = self.info_loader()
+        with self._lock:
+            self._file_sizes = sizes
+            self._project_size = sum(sizes.values())
+            self._chapters_size = sum(size for path, size in sizes.items() if self._is_chapter_file(path))
+            self._info = info
+            self._ready = True
+            self._dirty = False
+            self._scanned_at = time.monotonic()
+
+    def _apply_changes(self, paths: Iterable[str]):
+        """按变更的文件路径增量更新"""
+        reload_info = False
+        with self._lock:
+            for path in paths:
+                path = os.path.abspath(path)
+                old = self._file_sizes.pop(path, None)
+                try:
+                    new = os.path.getsize(path) if os.path.isfile(path) else None
+                except OSError:
+                    new = None
+                if old is None and new is None:
+                    continue  # 目录事件或未记录过的已删除文件
+                if new is not None:
+                    self._file_sizes[path] = new
+                delta = (new or 0) - (old or 0)
+                self._project_size += delta
+                if self._is_chapter_file(path):
+                    self._chapters_size += delta
+                    reload_info = True
+                elif os.path.relpath(path, self.project_path) in _COUNT_FILES:
+                    reload_info = True
+
+        if reload_info:
+            info = self.info_loader()
+            with self._lock:
+                self._info = info
+        self._notify()
+
+    def mark_dirty(self):
+        """标记统计过期（无文件监听时由调用方在写入后调用）"""
+        with self._lock:
+            self._dirty = True
+
+    def _is_stale(self) -> bool:
+        return self._dirty or time.monotonic() - self._scanned_at > FALLBACK_TTL
+
+    # ========== 读取 ==========
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        返回当前统计
+
+        Returns:
+            {info, chapter_count, word_count, role_count, project_size, chapters_size, watching}
+            （大小为字节；watching 表示快照是否随文件变化自动更新）
+        """
+        if not self._ready or (self._watch_thread is None and self._is_stale()):
+            self._full_scan()
+            self.start()
+        with self._lock:
+            return {
+                "info": dict(self._info),
+                "chapter_count": self._info.get("chapter_count", 0),
+                "word_count": self._info.get("word_count", 0),
+                "role_count": self._info.get("role_count", 0),
+                "project_size": self._project_size,
+                "chapters_size": self._chapters_size,
+                "watching": self._watch_thread is not None,
+            }
+
+    def add_listener(self, listener: StatsListener):
+        """注册统计变化回调（在监听线程中调用，Qt 界面需自行转发到主线程）"""
+        self._listeners.append(listener)
+
+    def _notify(self):
+        if not self._listeners:
+            return
+        stats = self.snapshot()
+        for listener in list(self._listeners):
+            try:
+                listener(stats)
+            except Exception as e:
+                logger.warning(f"统计回调失败: {e}")
+
+    # ========== 文件监听 ==========
+
+    def start(self):
+        """启动后台文件监听（未安装 watchfiles 时不做任何事）"""
+        if watchfiles is None:
+            return
+        with self._lock:
+            # snapshot() 可能同时在多个线程中首次调用
+            if self._watch_thread is not None:
+                return
+            self._stop_event.clear()
+            self._watch_thread = threading.Thread(target=self._watch_loop, name="project-stats-watch", daemon=True)
+        self._watch_thread.start()
+
+    def _watch_loop(self):
+        try:
+            for changes in watchfiles.watch(self.project_path, stop_event=self._stop_event, debounce=500):
+                self._apply_changes(path for _, path in changes)
+        except Exception as e:
+            logger.warning(f"项目目录监听已停止，统计改为按需重算: {e}")
+            with self._lock:
+                self._dirty = True
+            self._watch_thread = None
+
+    def stop(self):
+        """停止文件监听"""
+        self._stop_event.set()
+        thread, self._watch_thread = self._watch_thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2)
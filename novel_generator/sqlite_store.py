@@ -0,0 +1,531 @@
+# novel_generator/sqlite_store.py
+# -*- coding: utf-8 -*-
+"""
+单文件项目存储（SQLite）
+
+大型项目（上千章）按目录存储时，打开、列表、统计、备份、导出都要遍历大量小文件。
+SqliteProjectStore 把章节、蓝图条目、摘要、角色和项目元数据存进一个 project.db：
+- WAL 模式，读写互不阻塞；每个线程使用独立连接；
+- 章节正文按章存为 BLOB，列表和字数统计只查询索引列；
+- FTS5 全文索引（trigram 分词，适合中文）；SQLite 未编译 FTS5 时退化为 LIKE 查询；
+- 可与现有目录布局互相导入导出。
+
+项目目录中存在 project.db 即表示该项目使用单文件存储（uses_sqlite_store）：DataManager 和
+ChapterRepository（生成、定稿流程的章节读写）都通过 get_project_store 共用同一个实例，
+章节、项目配置、角色和 DataManager 的文档只存在数据库中。
+生成流程的工作文件（Novel_architecture.txt、Novel_directory.txt、global_summary.txt、
+summary_store.json、角色状态、向量库等）仍保存在项目目录中，导出时一并复制；
+单章摘要在定稿时同步到 chapter_summaries 表。
+"""
+
+import os
+import re
+import json
+import shutil
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from storage import atomic_write_text, atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+PROJECT_DB_FILE = "project.db"
+
+# 项目元数据与整篇文档的键
+META_CONFIG = "config"
+DOC_ARCHITECTURE = "architecture.md"
+DOC_BLUEPRINT = "blueprint.md"
+DOC_SUMMARY = "summary.txt"
+
+# 存进数据库的整篇文档（DataManager 读写的文件）
+STORE_DOCUMENTS = (DOC_ARCHITECTURE, DOC_BLUEPRINT, DOC_SUMMARY)
+SUMMARY_STORE_FILE = "summary_store.json"
+
+# 导出时从项目目录原样复制的工作文件（章节、角色、配置和数据库中的文档单独处理）
+_SKIPPED_FILES = {"project.json", "roles.json", PROJECT_DB_FILE} | set(STORE_DOCUMENTS)
+_DOCUMENT_SUFFIXES = (".txt", ".md", ".json")
+_CHAPTER_FILE = re.compile(r"^chapter_(\d+)\.(txt|md)$")
+_BLUEPRINT_HEADER = re.compile(r"^\s*第\s*(\d+)\s*章", re.MULTILINE)
+_MD_TITLE = re.compile(r"^#\s*(.+)$", re.MULTILINE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    updated TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chapters (
+    number INTEGER PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    content BLOB NOT NULL,
+    word_count INTEGER NOT NULL DEFAULT 0,
+    updated TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chapter_summaries (
+    number INTEGER PRIMARY KEY,
+    summary TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blueprint_entries (
+    number INTEGER PRIMARY KEY,
+    content TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS roles (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+def count_words(content: str) -> int:
+    """字数统计（去除空格和换行），与 DataManager 的口径一致"""
+    return len(content.replace(" ", "").replace("\n", ""))
+
+
+def split_blueprint_entries(blueprint_text: str) -> Dict[int, str]:
+    """按“第N章”标题把蓝图拆成逐章条目"""
+    entries = {}
+    headers = list(_BLUEPRINT_HEADER.finditer(blueprint_text))
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(blueprint_text)
+        entries[int(header.group(1))] = blueprint_text[header.start():end].strip()
+    return entries
+
+
+class SqliteProjectStore:
+    """单个项目数据库"""
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: 数据库文件路径
+        """
+        self.db_path = str(db_path)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._connections_lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []  # 所有线程的连接，供 close_all 关闭
+        self._generation = 0  # close_all 后递增，各线程据此丢弃已关闭的连接
+        self.fts_enabled = False
+        self._init_schema()
+
+    # ========== 连接与结构 ==========
+
+    def _connect(self) -> sqlite3.Connection:
+        """每个线程一个连接（只在本线程使用；允许跨线程是为了让 close_all 能关闭它）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.generation != self._generation:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            with self._connections_lock:
+                self._connections.append(conn)
+                self._local.generation = self._generation
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        with conn:
+            conn.executescript(_SCHEMA)
+        self.fts_enabled = self._init_fts(conn)
+
+    def _init_fts(self, conn: sqlite3.Connection) -> bool:
+        """创建全文索引；trigram 不可用时退回默认分词，FTS5 不可用时返回 False"""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'chapters_fts'"
+        ).fetchone()
+        if exists:
+            return True
+        for tokenizer in ("tokenize='trigram'", ""):
+            try:
+                with conn:
+                    conn.execute(
+                        "CREATE VIRTUAL TABLE chapters_fts USING fts5("
+                        f"title, content{', ' + tokenizer if tokenizer else ''})"
+                    )
+                    conn.execute(
+                        "INSERT INTO chapters_fts(rowid, title, content) "
+                        "SELECT number, title, CAST(content AS TEXT) FROM chapters"
+                    )
+                return True
+            except sqlite3.OperationalError:
+                continue
+        logger.warning("SQLite 未提供 FTS5，章节搜索将使用 LIKE 查询")
+        return False
+
+    def close(self):
+        """关闭当前线程的连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            with self._connections_lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+            conn.close()
+            self._local.conn = None
+
+    def close_all(self):
+        """
+        关闭所有线程的连接（替换或删除数据库文件前调用）。
+        持有写锁，进行中的写事务先完成；各线程下次访问时重新连接。
+        """
+        with self._write_lock:
+            with self._connections_lock:
+                connections, self._connections = self._connections, []
+                self._generation += 1
+            for conn in connections:
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    logger.warning(f"关闭数据库连接失败: {e}")
+
+    def reopen(self):
+        """数据库文件被替换后重新连接并检查表结构"""
+        self.close_all()
+        self._init_schema()
+
+    # ========== 元数据与文档 ==========
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key: str, value: Any):
+        with self._write_lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)",
+                (key, json.dumps(value, ensure_ascii=False))
+            )
+
+    def get_document(self, name: str) -> Optional[str]:
+        row = self._connect().execute("SELECT content FROM documents WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set_document(self, name: str, content: str):
+        with self._write_lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents(name, content, updated) VALUES (?, ?, ?)",
+                (name, content, datetime.now().isoformat())
+            )
+            if name == DOC_BLUEPRINT:
+                self._replace_blueprint_entries(conn, content)
+
+    def _replace_blueprint_entries(self, conn: sqlite3.Connection, blueprint_text: str):
+        conn.execute("DELETE FROM blueprint_entries")
+        conn.executemany(
+            "INSERT INTO blueprint_entries(number, content) VALUES (?, ?)",
+            split_blueprint_entries(blueprint_text).items()
+        )
+
+    def get_blueprint_entry(self, chapter_number: int) -> str:
+        row = self._connect().execute(
+            "SELECT content FROM blueprint_entries WHERE number = ?", (chapter_number,)
+        ).fetchone()
+        return row[0] if row else ""
+
+    def get_chapter_summary(self, chapter_number: int) -> str:
+        row = self._connect().execute(
+            "SELECT summary FROM chapter_summaries WHERE number = ?", (chapter_number,)
+        ).fetchone()
+        return row[0] if row else ""
+
+    def set_chapter_summary(self, chapter_number: int, summary: str):
+        with self._write_lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO chapter_summaries(number, summary) VALUES (?, ?)",
+                (chapter_number, summary)
+            )
+
+    # ========== 章节 ==========
+
+    def list_chapters(self) -> List[int]:
+        return [row[0] for row in self._connect().execute("SELECT number FROM chapters ORDER BY number")]
+
+    def chapter_index(self) -> List[Dict[str, Any]]:
+        """不读取正文的章节列表（编号、标题、字数、更新时间）"""
+        rows = self._connect().execute(
+            "SELECT number, title, word_count, updated FROM chapters ORDER BY number"
+        )
+        return [
+            {"number": number, "title": title, "word_count": words, "updated": updated}
+            for number, title, words, updated in rows
+        ]
+
+    def total_words(self) -> int:
+        return self._connect().execute("SELECT COALESCE(SUM(word_count), 0) FROM chapters").fetchone()[0]
+
+    def read_chapter(self, chapter_number: int) -> Optional[str]:
+        row = self._connect().execute(
+            "SELECT content FROM chapters WHERE number = ?", (chapter_number,)
+        ).fetchone()
+        return bytes(row[0]).decode("utf-8") if row else None
+
+    def has_chapter(self, chapter_number: int) -> bool:
+        return self._connect().execute(
+            "SELECT 1 FROM chapters WHERE number = ?", (chapter_number,)
+        ).fetchone() is not None
+
+    def read_chapters(self, chapter_numbers: Iterable[int]) -> Dict[int, str]:
+        numbers = list(chapter_numbers)
+        if not numbers:
+            return {}
+        placeholders = ",".join("?" * len(numbers))
+        rows = self._connect().execute(
+            f"SELECT number, content FROM chapters WHERE number IN ({placeholders})", numbers
+        )
+        found = {number: bytes(content).decode("utf-8") for number, content in rows}
+        return {number: found[number] for number in numbers if number in found}
+
+    def write_chapter(self, chapter_number: int, content: str, title: Optional[str] = None):
+        """写入章节；title 为 None 时保留已有标题"""
+        with self._write_lock, self._connect() as conn:
+            if title is None:
+                row = conn.execute("SELECT title FROM chapters WHERE number = ?", (chapter_number,)).fetchone()
+                title = row[0] if row else ""
+            self._write_chapter(conn, chapter_number, content, title)
+
+    def _write_chapter(self, conn: sqlite3.Connection, chapter_number: int, content: str, title: str):
+        conn.execute(
+            "INSERT OR REPLACE INTO chapters(number, title, content, word_count, updated) VALUES (?, ?, ?, ?, ?)",
+            (chapter_number, title, content.encode("utf-8"), count_words(content), datetime.now().isoformat())
+        )
+        if self.fts_enabled:
+            conn.execute("DELETE FROM chapters_fts WHERE rowid = ?", (chapter_number,))
+            conn.execute(
+                "INSERT INTO chapters_fts(rowid, title, content) VALUES (?, ?, ?)",
+                (chapter_number, title, content)
+            )
+
+    def delete_chapter(self, chapter_number: int) -> bool:
+        with self._write_lock, self._connect() as conn:
+            deleted = conn.execute("DELETE FROM chapters WHERE number = ?", (chapter_number,)).rowcount
+            if self.fts_enabled:
+                conn.execute("DELETE FROM chapters_fts WHERE rowid = ?", (chapter_number,))
+        return bool(deleted)
+
+    def search_chapters(self, query: str, limit: int = 50) -> List[Tuple[int, str]]:
+        """
+        全文搜索章节
+
+        Args:
+            query: 关键词
+            limit: 最多返回条数
+
+        Returns:
+            [(章节号, 片段)]，按相关度（FTS）或章节号（LIKE）排序
+        """
+        query = query.strip()
+        if not query:
+            return []
+        conn = self._connect()
+        # trigram 分词要求至少 3 个字符，更短的关键词走 LIKE
+        if self.fts_enabled and len(query) >= 3:
+            try:
+                rows = conn.execute(
+                    "SELECT rowid, snippet(chapters_fts, 1, '[', ']', '…', 16) FROM chapters_fts "
+                    "WHERE chapters_fts MATCH ? ORDER BY rank LIMIT ?",
+                    ('"' + query.replace('"', '""') + '"', limit)
+                ).fetchall()
+                return [(number, snippet) for number, snippet in rows]
+            except sqlite3.OperationalError as e:
+                logger.warning(f"全文检索失败，改用 LIKE 查询: {e}")
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        rows = conn.execute(
+            "SELECT number, CAST(content AS TEXT) FROM chapters "
+            "WHERE CAST(content AS TEXT) LIKE ? ESCAPE '\\' ORDER BY number LIMIT ?",
+            (pattern, limit)
+        ).fetchall()
+        return [(number, _snippet(content, query)) for number, content in rows]
+
+    # ========== 角色 ==========
+
+    def load_roles(self) -> Dict[str, Any]:
+        rows = self._connect().execute("SELECT name, data FROM roles ORDER BY rowid")
+        return {name: json.loads(data) for name, data in rows}
+
+    def save_roles(self, roles: Dict[str, Any]):
+        with self._write_lock, self._connect() as conn:
+            conn.execute("DELETE FROM roles")
+            conn.executemany(
+                "INSERT INTO roles(name, data) VALUES (?, ?)",
+                [(name, json.dumps(data, ensure_ascii=False)) for name, data in roles.items()]
+            )
+
+    # ========== 备份 ==========
+
+    def backup_to(self, target_path: str):
+        """用 SQLite 在线备份接口复制整个数据库（不阻塞写入）"""
+        os.makedirs(os.path.dirname(os.path.abspath(target_path)), exist_ok=True)
+        target = sqlite3.connect(target_path)
+        try:
+            self._connect().backup(target)
+        finally:
+            target.close()
+
+    # ========== 与目录布局互相转换 ==========
+
+    def import_folder(self, project_path: str) -> int:
+        """
+        把目录布局的项目导入数据库（单个事务）。同一章同时存在 .txt 与 .md 时取较新的一份。
+        只导入 STORE_DOCUMENTS 和单章摘要，生成流程的工作文件留在项目目录中。
+
+        Returns:
+            导入的章节数
+        """
+        project_path = str(project_path)
+        chapters: Dict[int, Tuple[int, str]] = {}
+        chapters_dir = os.path.join(project_path, "chapters")
+        if os.path.isdir(chapters_dir):
+            with os.scandir(chapters_dir) as it:
+                for entry in it:
+                    match = _CHAPTER_FILE.match(entry.name)
+                    if not match or not entry.is_file():
+                        continue
+                    number, mtime = int(match.group(1)), entry.stat().st_mtime_ns
+                    if number not in chapters or chapters[number][0] < mtime:
+                        chapters[number] = (mtime, entry.path)
+
+        with self._write_lock, self._connect() as conn:
+            config_file = os.path.join(project_path, "project.json")
+            if os.path.exists(config_file):
+                with open(config_file, "r", encoding="utf-8") as f:
+                    config = json.load(f)
+                config.pop("chapters", None)
+                config.pop("word_count", None)
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)",
+                    (META_CONFIG, json.dumps(config, ensure_ascii=False))
+                )
+
+            roles_file = os.path.join(project_path, "roles.json")
+            if os.path.exists(roles_file):
+                with open(roles_file, "r", encoding="utf-8") as f:
+                    roles = json.load(f)
+                conn.execute("DELETE FROM roles")
+                conn.executemany(
+                    "INSERT INTO roles(name, data) VALUES (?, ?)",
+                    [(name, json.dumps(data, ensure_ascii=False)) for name, data in roles.items()]
+                )
+
+            now = datetime.now().isoformat()
+            for name in STORE_DOCUMENTS:
+                path = os.path.join(project_path, name)
+                if not os.path.isfile(path):
+                    continue
+                with open(path, "r", encoding="utf-8") as f:
+                    content = f.read()
+                conn.execute(
+                    "INSERT OR REPLACE INTO documents(name, content, updated) VALUES (?, ?, ?)",
+                    (name, content, now)
+                )
+                if name == DOC_BLUEPRINT:
+                    self._replace_blueprint_entries(conn, content)
+
+            summary_file = os.path.join(project_path, SUMMARY_STORE_FILE)
+            if os.path.isfile(summary_file):
+                with open(summary_file, "r", encoding="utf-8") as f:
+                    summaries = json.load(f).get("chapters", {})
+                conn.executemany(
+                    "INSERT OR REPLACE INTO chapter_summaries(number, summary) VALUES (?, ?)",
+                    [(int(k), v) for k, v in summaries.items()]
+                )
+
+            for number, (_, path) in sorted(chapters.items()):
+                with open(path, "r", encoding="utf-8") as f:
+                    content = f.read()
+                title_match = _MD_TITLE.match(content) if path.endswith(".md") else None
+                self._write_chapter(conn, number, content, title_match.group(1).strip() if title_match else "")
+
+        logger.info(f"已从目录导入项目: {project_path}，共 {len(chapters)} 章")
+        return len(chapters)
+
+    def export_folder(self, target_path: str):
+        """把数据库导出为目录布局（章节写为 chapter_{n:03d}.md），并复制项目目录中的工作文件"""
+        target_path = str(target_path)
+        source_path = os.path.dirname(os.path.abspath(self.db_path))
+        if os.path.abspath(target_path) != source_path:
+            os.makedirs(target_path, exist_ok=True)
+            for name in sorted(os.listdir(source_path)):
+                path = os.path.join(source_path, name)
+                if name in _SKIPPED_FILES or name.startswith(".") or not name.endswith(_DOCUMENT_SUFFIXES):
+                    continue
+                if os.path.isfile(path):
+                    shutil.copy2(path, os.path.join(target_path, name))
+        chapters_dir = os.path.join(target_path, "chapters")
+        os.makedirs(chapters_dir, exist_ok=True)
+        conn = self._connect()
+
+        config = self.get_meta(META_CONFIG, {})
+        config["chapters"] = self.chapter_index()
+        config["word_count"] = self.total_words()
+        atomic_write_json(os.path.join(target_path, "project.json"), config)
+        atomic_write_json(os.path.join(target_path, "roles.json"), self.load_roles())
+
+        for name, content in conn.execute("SELECT name, content FROM documents"):
+            atomic_write_text(os.path.join(target_path, name), content)
+
+        for number, content in conn.execute("SELECT number, content FROM chapters ORDER BY number"):
+            atomic_write_text(
+                os.path.join(chapters_dir, f"chapter_{number:03d}.md"),
+                bytes(content).decode("utf-8")
+            )
+        logger.info(f"项目已导出为目录: {target_path}")
+
+
+def _snippet(content: str, query: str, radius: int = 16) -> str:
+    pos = content.find(query)
+    if pos < 0:
+        return content[:radius * 2]
+    start = max(0, pos - radius)
+    return content[start:pos] + f"[{query}]" + content[pos + len(query):pos + len(query) + radius]
+
+
+# ========== 共享实例 ==========
+
+_stores: Dict[str, SqliteProjectStore] = {}
+_stores_lock = threading.Lock()
+
+
+def uses_sqlite_store(project_path: str) -> bool:
+    """项目是否使用单文件存储（项目目录中存在 project.db）"""
+    return os.path.isfile(os.path.join(str(project_path), PROJECT_DB_FILE))
+
+
+def get_project_store(project_path: str) -> SqliteProjectStore:
+    """返回项目共享的数据库实例（不存在时创建数据库）"""
+    db_path = os.path.abspath(os.path.join(str(project_path), PROJECT_DB_FILE))
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is None:
+            store = SqliteProjectStore(db_path)
+            _stores[db_path] = store
+        return store
+
+
+def release_project_store(project_path: str):
+    """关闭并移除项目共享的数据库实例（project.db 被删除后调用）"""
+    db_path = os.path.abspath(os.path.join(str(project_path), PROJECT_DB_FILE))
+    with _stores_lock:
+        store = _stores.pop(db_path, None)
+    if store is not None:
+        store.close_all()
+
+
+def convert_folder_to_sqlite(project_path: str) -> str:
+    """
+    把目录布局的项目转换为单文件存储（原文件保留，可随时删除 project.db 回退）
+
+    Returns:
+        数据库文件路径
+    """
+    store = get_project_store(project_path)
+    store.import_folder(project_path)
+    return store.db_path
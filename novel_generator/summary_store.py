@@ -0,0 +1,188 @@
+#novel_generator/summary_store.py
+# -*- coding: utf-8 -*-
+"""
+分层前文摘要（单章摘要 → 篇章汇总 → 全书梗概）
+
+每次定稿只摘要新章节并刷新其所在篇章的汇总，篇章完结时再把篇章汇总融入全书梗概，
+因此定稿和草稿提示词的长度不随小说篇幅增长。
+"""
+import os
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+from novel_generator.common import invoke_with_cleaning, CancellationToken
+from prompt_definitions import chapter_summary_prompt, arc_summary_prompt, synopsis_prompt
+from utils import read_file
+
+SUMMARY_STORE_FILE = "summary_store.json"
+DEFAULT_ARC_SIZE = 10
+
+# 视图各部分的字数上限
+SYNOPSIS_VIEW_CHARS = 1200
+ARC_VIEW_CHARS = 700
+CHAPTER_VIEW_CHARS = 350
+RECENT_ARCS_IN_VIEW = 2
+RECENT_CHAPTERS_IN_VIEW = 3
+
+
+class SummaryStore:
+    """项目的分层摘要存储，持久化为 summary_store.json"""
+
+    def __init__(self, arc_size: int = DEFAULT_ARC_SIZE):
+        self.arc_size = max(1, int(arc_size))
+        self.synopsis = ""
+        self.synopsis_through_arc = 0  # 已融入全书梗概的最后一个篇章
+        self.chapters: Dict[int, str] = {}
+        self.arcs: Dict[int, str] = {}
+
+    # ========== 持久化 ==========
+
+    @staticmethod
+    def get_store_file(filepath: str) -> str:
+        return os.path.join(filepath, SUMMARY_STORE_FILE)
+
+    @classmethod
+    def load(cls, filepath: str, arc_size: int = DEFAULT_ARC_SIZE) -> "SummaryStore":
+        """
+        从 filepath 读取摘要存储。
+        若尚无存储文件，则以旧版 global_summary.txt 的内容作为初始全书梗概。
+        """
+        store_file = cls.get_store_file(filepath)
+        if os.path.exists(store_file):
+            try:
+                with open(store_file, "r", encoding="utf-8") as f:
+                    return cls.from_dict(json.load(f))
+            except Exception as e:
+                logging.warning(f"Failed to load {SUMMARY_STORE_FILE}: {e}")
+
+        store = cls(arc_size)
+        legacy_summary = read_file(os.path.join(filepath, "global_summary.txt")).strip()
+        if legacy_summary:
+            store.synopsis = legacy_summary
+        return store
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SummaryStore":
+        store = cls(data.get("arc_size", DEFAULT_ARC_SIZE))
+        store.synopsis = data.get("synopsis", "")
+        store.synopsis_through_arc = int(data.get("synopsis_through_arc", 0))
+        store.chapters = {int(k): v for k, v in data.get("chapters", {}).items()}
+        store.arcs = {int(k): v for k, v in data.get("arcs", {}).items()}
+        return store
+
+    def to_dict(self) -> dict:
+        return {
+            "arc_size": self.arc_size,
+            "synopsis": self.synopsis,
+            "synopsis_through_arc": self.synopsis_through_arc,
+            "chapters": {str(k): v for k, v in sorted(self.chapters.items())},
+            "arcs": {str(k): v for k, v in sorted(self.arcs.items())},
+        }
+
+    def dumps(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    # ========== 篇章划分 ==========
+
+    def arc_of(self, chapter_number: int) -> int:
+        """章节所在的篇章编号（从1开始）"""
+        return (chapter_number - 1) // self.arc_size + 1
+
+    def arc_range(self, arc: int) -> Tuple[int, int]:
+        """篇章覆盖的章节范围（含首尾）"""
+        start = (arc - 1) * self.arc_size + 1
+        return start, start + self.arc_size - 1
+
+    def arc_chapter_summaries(self, arc: int) -> List[Tuple[int, str]]:
+        start, end = self.arc_range(arc)
+        return [(n, self.chapters[n]) for n in range(start, end + 1) if n in self.chapters]
+
+    def is_arc_complete(self, arc: int) -> bool:
+        return len(self.arc_chapter_summaries(arc)) == self.arc_size
+
+    # ========== 视图 ==========
+
+    def render_view(self, current_chapter: Optional[int] = None) -> str:
+        """
+        生成固定大小的前文摘要视图：全书梗概 + 最近几个篇章汇总 + 最近几章摘要。
+
+        Args:
+            current_chapter: 正在写作的章节号；为 None 时视为最后一个已摘要章节之后
+        """
+        if current_chapter is None:
+            current_chapter = max(self.chapters, default=0) + 1
+
+        sections = []
+        if self.synopsis.strip():
+            sections.append(f"【全书梗概】\n{_clip(self.synopsis, SYNOPSIS_VIEW_CHARS)}")
+
+        current_arc = self.arc_of(current_chapter)
+        recent_arcs = [a for a in sorted(self.arcs) if a <= current_arc][-RECENT_ARCS_IN_VIEW:]
+        for arc in recent_arcs:
+            start, end = self.arc_range(arc)
+            sections.append(f"【第{start}-{end}章】\n{_clip(self.arcs[arc], ARC_VIEW_CHARS)}")
+
+        recent_chapters = [n for n in sorted(self.chapters) if n < current_chapter][-RECENT_CHAPTERS_IN_VIEW:]
+        for n in recent_chapters:
+            sections.append(f"【第{n}章】\n{_clip(self.chapters[n], CHAPTER_VIEW_CHARS)}")
+
+        return "\n\n".join(sections)
+
+
+def _clip(text: str, max_chars: int) -> str:
+    text = text.strip()
+    return text if len(text) <= max_chars else text[:max_chars] + "..."
+
+
+def update_summary_store(llm_adapter, store: SummaryStore, chapter_number: int, chapter_text: str,
+                         cancel_token: Optional[CancellationToken] = None) -> SummaryStore:
+    """
+    将新定稿章节纳入摘要存储（原地修改并返回 store）：
+      1. 摘要本章
+      2. 刷新本章所在篇章的汇总（输入最多 arc_size 条单章摘要）
+      3. 若篇章已完结且尚未融入，则把篇章汇总融入全书梗概
+    每一步的输入长度都与小说总章数无关。
+    """
+    chapter_summary = invoke_with_cleaning(llm_adapter, chapter_summary_prompt.format(
+        novel_number=chapter_number,
+        chapter_text=chapter_text
+    ), cancel_token=cancel_token)
+    if not chapter_summary.strip():
+        logging.warning(f"Chapter summary for chapter {chapter_number} is empty, keep previous store.")
+        return store
+    store.chapters[chapter_number] = chapter_summary.strip()
+
+    arc = store.arc_of(chapter_number)
+    start, end = store.arc_range(arc)
+    summaries_text = "\n".join(f"第{n}章：{text}" for n, text in store.arc_chapter_summaries(arc))
+    arc_summary = invoke_with_cleaning(llm_adapter, arc_summary_prompt.format(
+        start_chapter=start,
+        end_chapter=end,
+        chapter_summaries=summaries_text
+    ), cancel_token=cancel_token)
+    if arc_summary.strip():
+        store.arcs[arc] = arc_summary.strip()
+
+    if store.is_arc_complete(arc) and arc > store.synopsis_through_arc and arc in store.arcs:
+        logging.info(f"Arc {arc} (chapters {start}-{end}) completed, folding into synopsis...")
+        synopsis = invoke_with_cleaning(llm_adapter, synopsis_prompt.format(
+            synopsis=store.synopsis,
+            start_chapter=start,
+            end_chapter=end,
+            arc_summary=store.arcs[arc]
+        ), cancel_token=cancel_token)
+        if synopsis.strip():
+            store.synopsis = synopsis.strip()
+            store.synopsis_through_arc = arc
+
+    return store
+
+
+def load_summary_view(filepath: str, current_chapter: Optional[int] = None) -> str:
+    """
+    获取用于提示词的前文摘要视图。
+    有分层摘要存储时返回固定大小的视图，否则回退到 global_summary.txt。
+    """
+    if os.path.exists(SummaryStore.get_store_file(filepath)):
+        return SummaryStore.load(filepath).render_view(current_chapter)
+    return read_file(os.path.join(filepath, "global_summary.txt"))
@@ -8,11 +8,12 @@ import logging
 import re
 from typing import Dict, List, Optional
 
-try:
-    import tiktoken
-    TIKTOKEN_AVAILABLE = True
-except ImportError:
-    TIKTOKEN_AVAILABLE = False
+from lazy_import import lazy_module, is_available
+
+# tiktoken 导入较慢，只检查是否安装，首次计算 token 时才导入
+TIKTOKEN_AVAILABLE = is_available("tiktoken")
+tiktoken = lazy_module("tiktoken")
+if not TIKTOKEN_AVAILABLE:
     logging.warning("tiktoken not available, using fallback token estimation")
 
 
@@ -57,7 +58,11 @@ def calculate_tokens_openai(text: str, model: str = "gpt-3.5-turbo") -> int:
         return estimate_tokens_chinese(text)
 
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            # 非OpenAI模型（如通过OpenAI兼容接口调用的模型）使用通用编码近似
+            encoding = tiktoken.get_encoding("cl100k_base")
         tokens = encoding.encode(text)
         return len(tokens)
     except Exception as e:
@@ -6,15 +6,18 @@
 import os
 import logging
 import traceback
-import nltk
-import numpy as np
 import re
 import ssl
-import requests
 import warnings
 import hashlib
 from datetime import datetime
-from langchain_chroma import Chroma
+from lazy_import import lazy_module, lazy_attr
+
+# 向量库依赖导入耗时较长，首次使用向量库时才导入
+nltk = lazy_module("nltk")
+np = lazy_module("numpy")
+requests = lazy_module("requests")
+Chroma = lazy_attr("langchain_chroma", "Chroma")
 logging.basicConfig(
     filename='app.log',      # 日志文件名
     filemode='a',            # 追加模式（'w' 会覆盖）
@@ -26,9 +29,9 @@ logging.basicConfig(
 warnings.filterwarnings('ignore', message='.*Torch was not compiled with flash attention.*')
 os.environ["TOKENIZERS_PARALLELISM"] = "false"  # 禁用tokenizer并行警告
 
-from chromadb.config import Settings
-from langchain.docstore.document import Document
-from sklearn.metrics.pairwise import cosine_similarity
+Settings = lazy_attr("chromadb.config", "Settings")
+Document = lazy_attr("langchain.docstore.document", "Document")
+cosine_similarity = lazy_attr("sklearn.metrics.pairwise", "cosine_similarity")
 from .common import call_with_retry
 
 def get_vectorstore_dir(filepath: str) -> str:
@@ -51,16 +54,19 @@ def clear_vector_store(filepath: str) -> bool:
         traceback.print_exc()
         return False
 
-def init_vector_store(embedding_adapter, texts, filepath: str):
+def init_vector_store(embedding_adapter, texts, filepath: str, metadatas=None, ids=None):
     """
     在 filepath 下创建/加载一个 Chroma 向量库并插入 texts。
+    metadatas / ids 可选，与 texts 一一对应。
     如果Embedding失败，则返回 None，不中断任务。
     """
     from langchain.embeddings.base import Embeddings as LCEmbeddings
 
     store_dir = get_vectorstore_dir(filepath)
     os.makedirs(store_dir, exist_ok=True)
-    documents = [Document(page_content=str(t)) for t in texts]
+    if metadatas is None:
+        metadatas = [{} for _ in texts]
+    documents = [Document(page_content=str(t), metadata=m) for t, m in zip(texts, metadatas)]
 
     try:
         class LCEmbeddingWrapper(LCEmbeddings):
@@ -86,7 +92,8 @@ def init_vector_store(embedding_adapter, texts, filepath: str):
             embedding=chroma_embedding,
             persist_directory=store_dir,
             client_settings=Settings(anonymized_telemetry=False),
-            collection_name="novel_collection"
+            collection_name="novel_collection",
+            ids=ids
         )
         return vectorstore
     except Exception as e:
@@ -181,28 +188,117 @@ def split_text_for_vectorstore(chapter_text: str, max_length: int = 500, similar
     
     return final_segments
 
-def update_vector_store(embedding_adapter, new_chapter: str, filepath: str, chapter_num: int = None, project_id: str = None):
+def chapter_segment_id(chapter_num: int, segment_index: int) -> str:
+    """章节片段在向量库中的固定ID，重复定稿同一章时覆盖而不是追加"""
+    return f"chapter_{chapter_num}_{segment_index}"
+
+class ChapterVectors:
     """
-    将最新章节文本插入到向量库中。
-    若库不存在则初始化；若初始化/更新失败，则跳过。
+    一章待写入向量库的片段：文本、metadata、固定ID以及预先算好的向量。
+    embeddings 为 None 表示预计算失败，写入时由向量库重新计算。
+    """
+
+    def __init__(self, texts, metadatas, ids=None, embeddings=None):
+        self.texts = texts
+        self.metadatas = metadatas
+        self.ids = ids
+        self.embeddings = embeddings
+
+
+class _PrecomputedEmbeddingAdapter:
+    """对已预先计算过的文本直接返回缓存向量，其余文本交给原适配器"""
+
+    def __init__(self, embedding_adapter, texts, embeddings):
+        self._adapter = embedding_adapter
+        self._cache = dict(zip(texts, embeddings))
+
+    def embed_documents(self, texts):
+        if all(t in self._cache for t in texts):
+            return [self._cache[t] for t in texts]
+        return self._adapter.embed_documents(texts)
+
+    def embed_query(self, query: str):
+        return self._adapter.embed_query(query)
+
+
+def prepare_chapter_vectors(embedding_adapter, new_chapter: str, chapter_num: int = None,
+                            project_id: str = None):
+    """
+    切分章节文本并计算各片段的向量，不触碰向量库。
+    耗时的 embedding 调用可以与其他定稿任务并发执行，待章节文件提交成功后再调用 write_chapter_vectors 写入。
 
     Args:
         embedding_adapter: 嵌入模型适配器
         new_chapter: 章节文本内容
-        filepath: 项目文件路径
-        chapter_num: 章节编号（用于metadata）
+        chapter_num: 章节编号（用于metadata和片段ID）
         project_id: 项目ID（用于metadata）
+
+    Returns:
+        ChapterVectors；没有可写入的文本时返回 None
     """
-    from utils import read_file, clear_file_content, save_string_to_txt
     splitted_texts = split_text_for_vectorstore(new_chapter)
     if not splitted_texts:
         logging.warning("No valid text to insert into vector store. Skipping.")
+        return None
+
+    # 创建带metadata的文档
+    timestamp = datetime.now().isoformat()
+    metadatas = []
+    for i in range(len(splitted_texts)):
+        metadata = {
+            "content_type": "full",
+            "segment_index": i,
+            "timestamp": timestamp
+        }
+
+        # 添加章节和项目metadata（如果提供）
+        if chapter_num is not None:
+            metadata["chapter_num"] = chapter_num
+        if project_id is not None:
+            metadata["project_id"] = project_id
+        metadatas.append(metadata)
+    ids = None
+    if chapter_num is not None:
+        ids = [chapter_segment_id(chapter_num, i) for i in range(len(splitted_texts))]
+
+    embeddings = call_with_retry(
+        func=embedding_adapter.embed_documents,
+        max_retries=3,
+        fallback_return=None,
+        texts=[str(t) for t in splitted_texts]
+    )
+    if not embeddings or len(embeddings) != len(splitted_texts):
+        logging.warning("Precomputing chapter embeddings failed, will embed again when writing.")
+        embeddings = None
+    return ChapterVectors(splitted_texts, metadatas, ids, embeddings)
+
+
+def write_chapter_vectors(embedding_adapter, filepath: str, vectors, chapter_num: int = None):
+    """
+    将 prepare_chapter_vectors 的结果写入向量库。
+    若库不存在则初始化；若初始化/更新失败，则跳过。
+    提供 chapter_num 时先删除该章已有的片段，再以固定ID写入，重复定稿不会产生重复向量。
+
+    Args:
+        embedding_adapter: 嵌入模型适配器（用于加载向量库及补算缺失的向量）
+        filepath: 项目文件路径
+        vectors: ChapterVectors，为 None 时直接跳过
+        chapter_num: 章节编号
+    """
+    if vectors is None:
         return
+    splitted_texts = vectors.texts
+    metadatas = vectors.metadatas
+    ids = vectors.ids
+    if vectors.embeddings is not None:
+        embedding_adapter = _PrecomputedEmbeddingAdapter(
+            embedding_adapter, [str(t) for t in splitted_texts], vectors.embeddings
+        )
 
     store = load_vector_store(embedding_adapter, filepath)
     if not store:
         logging.info("Vector store does not exist or failed to load. Initializing a new one for new chapter...")
-        store = init_vector_store(embedding_adapter, splitted_texts, filepath)
+        store = init_vector_store(embedding_adapter, splitted_texts, filepath, metadatas=metadatas, ids=ids)
         if not store:
             logging.warning("Init vector store failed, skip embedding.")
         else:
@@ -210,30 +306,32 @@ def update_vector_store(embedding_adapter, new_chapter: str, filepath: str, chap
         return
 
     try:
-        # 创建带metadata的文档
-        docs = []
-        for i, text in enumerate(splitted_texts):
-            metadata = {
-                "content_type": "full",
-                "segment_index": i,
-                "timestamp": datetime.now().isoformat()
-            }
-
-            # 添加章节和项目metadata（如果提供）
-            if chapter_num is not None:
-                metadata["chapter_num"] = chapter_num
-            if project_id is not None:
-                metadata["project_id"] = project_id
-
-            doc = Document(page_content=str(text), metadata=metadata)
-            docs.append(doc)
-
-        store.add_documents(docs)
-        logging.info(f"Vector store updated with {len(docs)} documents. Chapter: {chapter_num}, Project: {project_id}")
+        if chapter_num is not None:
+            # 章节改短后旧的尾部片段也要删掉，因此按章节号删除而不只是按ID覆盖
+            store.delete(where={"chapter_num": chapter_num})
+
+        docs = [Document(page_content=str(text), metadata=metadata)
+                for text, metadata in zip(splitted_texts, metadatas)]
+        store.add_documents(docs, ids=ids)
+        logging.info(f"Vector store updated with {len(docs)} documents. Chapter: {chapter_num}")
     except Exception as e:
         logging.warning(f"Failed to update vector store: {e}")
         traceback.print_exc()
 
+def update_vector_store(embedding_adapter, new_chapter: str, filepath: str, chapter_num: int = None, project_id: str = None):
+    """
+    将最新章节文本插入到向量库中（prepare_chapter_vectors + write_chapter_vectors）。
+
+    Args:
+        embedding_adapter: 嵌入模型适配器
+        new_chapter: 章节文本内容
+        filepath: 项目文件路径
+        chapter_num: 章节编号（用于metadata和片段ID）
+        project_id: 项目ID（用于metadata）
+    """
+    vectors = prepare_chapter_vectors(embedding_adapter, new_chapter, chapter_num, project_id)
+    write_chapter_vectors(embedding_adapter, filepath, vectors, chapter_num)
+
 def get_relevant_context_from_vector_store(embedding_adapter, query: str, filepath: str, k: int = 2,
                                           chapter_num: int = None, project_id: str = None) -> str:
     """
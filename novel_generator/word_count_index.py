@@ -0,0 +1,141 @@
+# novel_generator/word_count_index.py
+# -*- coding: utf-8 -*-
+"""
+章节字数索引
+
+在章节目录的上一级（项目目录）用 .word_counts.json 记录每个章节文件的字数及其 mtime/大小。
+索引不放在章节目录中：每次保存都会重写索引，放在章节目录里会改变其 mtime，使按目录 mtime 缓存的章节列表失效。
+保存、删除章节时按增量更新；统计总字数时只 stat 目录，只有索引缺失或 mtime/大小对不上的文件才重新读取计数。
+"""
+
+import os
+import json
+import logging
+from typing import Callable, Dict, Optional
+
+from storage import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = ".word_counts.json"
+
+
+def count_words_compact(content: str) -> int:
+    """字数统计（去除空格和换行），与 DataManager 原有口径一致"""
+    return len(content.replace(" ", "").replace("\n", ""))
+
+
+class WordCountIndex:
+    """单个章节目录的字数索引"""
+
+    def __init__(self, chapters_dir: str):
+        """
+        Args:
+            chapters_dir: 章节目录
+        """
+        self.chapters_dir = str(chapters_dir)
+        self.index_file = os.path.join(os.path.dirname(os.path.abspath(self.chapters_dir)), INDEX_FILE)
+        self.entries: Dict[str, Dict[str, int]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, int]]:
+        legacy_file = os.path.join(self.chapters_dir, INDEX_FILE)
+        if not os.path.exists(self.index_file) and os.path.exists(legacy_file):
+            # 旧版本把索引放在章节目录中，迁移到项目目录
+            try:
+                os.replace(legacy_file, self.index_file)
+            except OSError as e:
+                logger.warning(f"迁移字数索引失败: {e}")
+                return {}
+        if not os.path.exists(self.index_file):
+            return {}
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                return json.load(f).get("files", {})
+        except Exception as e:
+            logger.warning(f"字数索引损坏，将重建: {e}")
+            return {}
+
+    def _save(self):
+        try:
+            atomic_write_json(self.index_file, {"files": self.entries})
+        except Exception as e:
+            logger.warning(f"保存字数索引失败: {e}")
+
+    def _stat(self, filename: str) -> Optional[os.stat_result]:
+        try:
+            return os.stat(os.path.join(self.chapters_dir, filename))
+        except OSError:
+            return None
+
+    # ========== 增量更新 ==========
+
+    def update(self, filename: str, words: int):
+        """
+        记录刚写入的章节文件的字数（调用方已知内容，无需重新读取）
+
+        Args:
+            filename: 章节文件名（不含目录）
+            words: 字数
+        """
+        stat = self._stat(filename)
+        if stat is None:
+            self.remove(filename)
+            return
+        self.entries[filename] = {"words": words, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        self._save()
+
+    def remove(self, filename: str):
+        """删除章节文件后移除其索引"""
+        if self.entries.pop(filename, None) is not None:
+            self._save()
+
+    def words(self, filename: str) -> int:
+        entry = self.entries.get(filename)
+        return entry["words"] if entry else 0
+
+    def cached_total(self, suffix: str = "") -> int:
+        """只按索引求和，不访问文件系统"""
+        return sum(entry["words"] for name, entry in self.entries.items() if name.endswith(suffix))
+
+    # ========== 校验 ==========
+
+    def total(self, suffix: str, counter: Callable[[str], int], prefix: str = "chapter_") -> int:
+        """
+        校验索引并返回总字数：只 stat 目录中的章节文件，索引缺失或 mtime/大小不一致的文件才重新读取计数。
+
+        Args:
+            suffix: 章节文件后缀（如 ".md"、".txt"）
+            counter: 字数统计函数
+            prefix: 章节文件名前缀
+        """
+        if not os.path.isdir(self.chapters_dir):
+            return 0
+
+        changed = False
+        present = set()
+        with os.scandir(self.chapters_dir) as it:
+            for entry in it:
+                name = entry.name
+                if not (name.startswith(prefix) and name.endswith(suffix)) or not entry.is_file():
+                    continue
+                present.add(name)
+                stat = entry.stat()
+                cached = self.entries.get(name)
+                if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+                    continue
+                try:
+                    with open(entry.path, "r", encoding="utf-8") as f:
+                        words = counter(f.read())
+                except Exception as e:
+                    logger.warning(f"读取章节文件失败 {name}: {e}")
+                    continue
+                self.entries[name] = {"words": words, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+                changed = True
+
+        for name in [n for n in self.entries if n.startswith(prefix) and n.endswith(suffix) and n not in present]:
+            del self.entries[name]
+            changed = True
+
+        if changed:
+            self._save()
+        return self.cached_total(suffix)
@@ -11,6 +11,7 @@ import logging
 from typing import Dict, Any, Optional
 from datetime import datetime
 from utils import save_data_to_json, read_file, load_data_from_json
+from novel_generator.word_count_index import WordCountIndex
 
 logger = logging.getLogger(__name__)
 
@@ -130,6 +131,21 @@ class ProjectManager:
         """
         加载项目
 
+        Args:
+            project_path: 项目路径
+
+        Returns:
+            Optional[Dict]: 项目数据，失败返回None
+        """
+        project_data = self.read_project_data(project_path)
+        if project_data is not None:
+            self.attach_project(project_path, project_data)
+        return project_data
+
+    def read_project_data(self, project_path: str) -> Optional[Dict[str, Any]]:
+        """
+        读取并验证项目配置，不修改当前项目（可在工作线程中调用）
+
         Args:
             project_path: 项目路径
 
@@ -154,16 +170,24 @@ class ProjectManager:
                 logger.error("项目数据验证失败")
                 return None
 
-            self.current_project_path = project_path
-            self.project_data = project_data
-
-            logger.info(f"项目加载成功: {project_path}")
             return project_data
 
         except Exception as e:
             logger.error(f"加载项目时发生错误: {str(e)}", exc_info=True)
             return None
 
+    def attach_project(self, project_path: str, project_data: Dict[str, Any]):
+        """
+        切换到已读取好的项目（在主线程中调用）
+
+        Args:
+            project_path: 项目路径
+            project_data: read_project_data 返回的项目数据
+        """
+        self.current_project_path = project_path
+        self.project_data = project_data
+        logger.info(f"项目加载成功: {project_path}")
+
     def _validate_project_data(self, data: Dict[str, Any]) -> bool:
         """验证项目数据完整性"""
         required_keys = ["project_info", "settings", "generation_status", "files"]
@@ -217,22 +241,13 @@ class ProjectManager:
             return 0
 
         try:
-            total_words = 0
             chapters_dir = os.path.join(
                 self.current_project_path,
                 self.project_data["files"]["chapters_dir"]
             )
 
-            if not os.path.exists(chapters_dir):
-                return 0
-
-            for filename in os.listdir(chapters_dir):
-                if filename.endswith('.txt'):
-                    chapter_path = os.path.join(chapters_dir, filename)
-                    content = read_file(chapter_path)
-                    total_words += len(content)
-
-            return total_words
+            # 按 mtime 校验的字数索引，只重新读取有变化的章节
+            return WordCountIndex(chapters_dir).total(".txt", len, prefix="")
 
         except Exception as e:
             logger.error(f"计算总字数失败: {str(e)}")
@@ -357,6 +357,76 @@ chunked_chapter_blueprint_prompt = """\
 仅给出最终文本，不要解释任何内容。
 """
 
+# 并行分块：先生成篇章大纲，再按篇章并行生成章节目录
+blueprint_arc_outline_prompt = """\
+基于以下元素：
+- 内容指导：{user_guidance}
+- 小说架构：
+{novel_architecture}
+
+需要生成总共{number_of_chapters}章的小说，全书按以下篇章划分：
+{arc_ranges}
+
+请为每个篇章设计粗略大纲，篇章之间要首尾衔接，整体悬念曲线连贯。
+输出格式示例：
+第1-30章 - [篇章名]
+篇章概要：[本篇章的主要情节走向与高潮]
+开篇衔接：[本篇章第一章开始时的局面]
+收尾落点：[本篇章最后一章结束时的局面与留下的悬念]
+
+要求：
+- 严格按照给定的章节范围逐个输出，不要合并或遗漏篇章
+- 每个篇章控制在150字以内
+- 在第{number_of_chapters}章前不要出现结局
+
+仅给出最终文本，不要解释任何内容。
+"""
+
+arc_chapter_blueprint_prompt = """\
+基于以下元素：
+- 内容指导：{user_guidance}
+- 小说架构：
+{novel_architecture}
+
+需要生成总共{number_of_chapters}章的节奏分布，当前篇章（第{arc_start}章到第{arc_end}章）的大纲：
+{arc_outline}
+
+前一段的结尾（第{n}章需要从这里衔接）：
+{previous_boundary}
+
+后一段的开头（第{m}章需要为其铺垫）：
+{next_boundary}
+
+现在请设计第{n}章到第{m}章的节奏分布：
+1. 章节集群划分：
+- 每3-5章构成一个悬念单元，包含完整的小高潮
+- 单元之间设置"认知过山车"（连续2章紧张→1章缓冲）
+- 关键转折章需预留多视角铺垫
+
+2. 每章需明确：
+- 章节定位（角色/事件/主题等）
+- 核心悬念类型（信息差/道德困境/时间压力等）
+- 情感基调迁移（如从怀疑→恐惧→决绝）
+- 伏笔操作（埋设/强化/回收）
+- 认知颠覆强度（1-5级）
+
+输出格式示例：
+第n章 - [标题]
+本章定位：[角色/事件/主题/...]
+核心作用：[推进/转折/揭示/...]
+悬念密度：[紧凑/渐进/爆发/...]
+伏笔操作：埋设(A线索)→强化(B矛盾)...
+认知颠覆：★☆☆☆☆
+本章简述：[一句话概括]
+
+要求：
+- 使用精炼语言描述，每章字数控制在100字以内。
+- 只输出第{n}章到第{m}章，情节不要超出本篇章大纲的范围。
+- 在生成{number_of_chapters}章前不要出现结局章节。
+
+仅给出最终文本，不要解释任何内容。
+"""
+
 # =============== 6. 前文摘要更新 ===================
 summary_prompt = """\
 以下是新完成的章节文本：
@@ -375,6 +445,54 @@ summary_prompt = """\
 仅返回前文摘要文本，不要解释任何内容。
 """
 
+# 分层摘要：单章摘要
+chapter_summary_prompt = """\
+以下是第{novel_number}章的完整文本：
+{chapter_text}
+
+请为本章撰写剧情摘要。
+要求：
+- 只概括本章发生的事件、角色行动与关键转折
+- 保留新出现的人物、道具、地点和伏笔
+- 客观描绘，不展开联想或解释
+- 总字数控制在300字以内
+
+仅返回本章摘要文本，不要解释任何内容。
+"""
+
+# 分层摘要：篇章（每N章）汇总
+arc_summary_prompt = """\
+以下是第{start_chapter}章至第{end_chapter}章的逐章摘要：
+{chapter_summaries}
+
+请将这些章节摘要合并为一段篇章摘要。
+要求：
+- 按时间顺序串联主要情节线，突出因果关系
+- 保留仍未回收的伏笔和角色关系的重要变化
+- 客观描绘，不展开联想或解释
+- 总字数控制在600字以内
+
+仅返回篇章摘要文本，不要解释任何内容。
+"""
+
+# 分层摘要：全书梗概滚动更新
+synopsis_prompt = """\
+这是当前的全书梗概（可为空）：
+{synopsis}
+
+以下是刚刚完结的第{start_chapter}章至第{end_chapter}章的篇章摘要：
+{arc_summary}
+
+请将该篇章的剧情融入全书梗概。
+要求：
+- 保留主线走向、核心人物命运和关键伏笔
+- 早期细节可适度压缩，以便为新剧情留出篇幅
+- 以简洁、连贯的语言描述全书进展
+- 总字数控制在1000字以内
+
+仅返回更新后的全书梗概，不要解释任何内容。
+"""
+
 # =============== 7. 角色状态更新 ===================
 create_character_state_prompt = """\
 依据当前角色动力学设定：{character_dynamics}
@@ -487,6 +605,38 @@ update_character_state_prompt = """\
 仅返回更新后的角色状态文本，不要解释任何内容。
 """
 
+# 结构化角色状态：按字段返回补丁
+update_character_state_patch_prompt = """\
+以下是新完成的章节文本：
+{chapter_text}
+
+这是本章出场的主要角色的当前状态：
+{character_states}
+
+本章出场的次要角色：{minor_characters}
+
+请只针对本章中发生变化的内容，返回角色状态补丁（JSON）。分栏只能是：{sections}。
+格式：
+{{
+  "updates": {{
+    "张三": {{
+      "物品": {{"寒铁长剑": "剑身断裂，已被丢弃在山洞中", "青衫": null}},
+      "状态": {{"心理状态": "对李四产生怀疑"}}
+    }}
+  }},
+  "new_characters": {{"赵六": "镇上的铁匠，向张三透露了符文的来历"}},
+  "removed_minor_characters": ["路人甲"]
+}}
+
+要求：
+- 只写发生变化的角色、分栏和条目，未变化的内容不要出现
+- 条目值为 null 表示删除该条目（如物品遗失、关系终结）
+- 成为主要角色的新人物放入 updates，临时出场人物放入 new_characters，淡出视线的次要角色放入 removed_minor_characters
+- 描述简洁、有条理
+
+仅返回JSON，不要解释任何内容。
+"""
+
 # =============== 8. 章节正文写作 ===================
 
 # 8.1 第一章草稿提示
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时基准
+
+用 `python -X importtime` 在子进程中导入启动路径上的模块，汇总导入耗时：
+总耗时、最慢的顶层包、自身耗时最高的模块，以及是否误导入了本应延迟加载的重量级依赖。
+
+用法:
+    python startup_benchmark.py                      # 分析 ui_qt.main_window 的导入
+    python startup_benchmark.py --module main --top 30
+    python startup_benchmark.py --window             # 额外测量主窗口创建到显示的耗时（离屏）
+    python startup_benchmark.py --theme              # 额外测量主题切换耗时（离屏）
+"""
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+from typing import Dict, List, NamedTuple
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 启动时不应被导入的重量级依赖（应由 lazy_import 延迟到首次使用）
+HEAVY_MODULES = [
+    "torch", "transformers", "sentence_transformers", "chromadb", "langchain",
+    "langchain_openai", "langchain_chroma", "google.generativeai", "azure.ai.inference",
+    "openai", "nltk", "sklearn", "numpy", "tiktoken", "requests",
+]
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+class ImportRecord(NamedTuple):
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def run_importtime(module: str) -> List[ImportRecord]:
+    """在干净的子进程中导入 module，解析 -X importtime 输出"""
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    records = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            records.append(ImportRecord(
+                name=match.group(4),
+                self_us=int(match.group(1)),
+                cumulative_us=int(match.group(2)),
+                depth=len(match.group(3)) // 2,
+            ))
+    if result.returncode != 0:
+        tail = result.stderr.strip().splitlines()[-1:] or ["未知错误"]
+        print(f"[警告] 导入 {module} 失败: {tail[0]}")
+    return records
+
+
+def summarize(records: List[ImportRecord], top: int) -> Dict[str, object]:
+    top_level = [r for r in records if r.depth == 0]
+    imported = {r.name for r in records}
+    heavy = [name for name in HEAVY_MODULES if name in imported]
+    return {
+        "total_ms": sum(r.cumulative_us for r in top_level) / 1000,
+        "module_count": len(records),
+        "slowest_packages": sorted(top_level, key=lambda r: r.cumulative_us, reverse=True)[:top],
+        "slowest_self": sorted(records, key=lambda r: r.self_us, reverse=True)[:top],
+        "heavy_imported": heavy,
+    }
+
+
+def measure_window() -> str:
+    """离屏创建并显示主窗口，返回子进程输出的耗时（毫秒）"""
+    code = (
+        "import time; t0 = time.perf_counter()\n"
+        "from ui_qt import setup_application, MainWindow\n"
+        "t1 = time.perf_counter()\n"
+        "app = setup_application(); w = MainWindow(); w.show(); app.processEvents()\n"
+        "t2 = time.perf_counter()\n"
+        "print(f'{(t1 - t0) * 1000:.0f} {(t2 - t1) * 1000:.0f}')\n"
+    )
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen",
+               PYTHONPATH=PROJECT_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        tail = result.stderr.strip().splitlines()[-1:] or ["未知错误"]
+        return f"失败: {tail[0]}"
+    import_ms, window_ms = result.stdout.strip().splitlines()[-1].split()
+    return f"导入 {import_ms} ms + 创建并显示窗口 {window_ms} ms"
+
+
+def measure_theme_switch() -> str:
+    """离屏创建主窗口后在浅色/暗色之间来回切换，返回每次切换的耗时"""
+    code = (
+        "from ui_qt import setup_application, MainWindow\n"
+        "app = setup_application(); w = MainWindow(); w.show(); app.processEvents()\n"
+        "w.theme_manager.preload_themes(); timings = []\n"
+        "for theme in ['dark', 'light', 'dark', 'light']:\n"
+        "    w.theme_manager.apply_theme(w, theme); app.processEvents()\n"
+        "    timings.append(w.theme_manager.last_switch_ms)\n"
+        "print(' '.join(f'{t:.1f}' for t in timings))\n"
+    )
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen",
+               PYTHONPATH=PROJECT_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        tail = result.stderr.strip().splitlines()[-1:] or ["未知错误"]
+        return f"失败: {tail[0]}"
+    return " / ".join(f"{t} ms" for t in result.stdout.strip().splitlines()[-1].split())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="启动路径导入耗时分析（-X importtime 摘要）")
+    parser.add_argument("--module", default="ui_qt.main_window", help="要分析的模块（默认 ui_qt.main_window）")
+    parser.add_argument("--top", type=int, default=15, help="每个榜单显示的条目数")
+    parser.add_argument("--window", action="store_true", help="额外测量主窗口首次显示耗时")
+    parser.add_argument("--theme", action="store_true", help="额外测量主题切换耗时")
+    args = parser.parse_args()
+
+    records = run_importtime(args.module)
+    if not records:
+        print("没有解析到 importtime 输出")
+        return 1
+    digest = summarize(records, args.top)
+
+    print(f"\n导入 {args.module}: 共 {digest['module_count']} 个模块，累计 {digest['total_ms']:.1f} ms\n")
+    print("最慢的顶层包（累计）:")
+    for r in digest["slowest_packages"]:
+        print(f"  {r.cumulative_us / 1000:9.1f} ms  {r.name}")
+    print("\n自身耗时最高的模块:")
+    for r in digest["slowest_self"]:
+        print(f"  {r.self_us / 1000:9.1f} ms  {r.name}")
+
+    if digest["heavy_imported"]:
+        print(f"\n[警告] 启动路径导入了应延迟加载的依赖: {', '.join(digest['heavy_imported'])}")
+    else:
+        print("\n启动路径未导入任何重量级依赖")
+
+    if args.window:
+        print(f"\n主窗口首次显示: {measure_window()}")
+    if args.theme:
+        print(f"\n主题切换: {measure_theme_switch()}")
+    return 1 if digest["heavy_imported"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
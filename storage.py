@@ -0,0 +1,183 @@
+# storage.py
+# -*- coding: utf-8 -*-
+"""
+项目状态文件的原子写入层
+
+所有写入都走“写临时文件 → fsync → rename”，进程在任何时刻被杀掉，目标文件要么是旧内容、要么是新内容，
+不会出现被截断的文件。多文件提交先写一份日志（journal），重命名中途中断时可在下次打开项目时继续完成；
+同一批次内的目录 fsync 合并为每个目录一次。
+"""
+import os
+import json
+import logging
+import tempfile
+from typing import Dict, Iterable, Union
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE = ".write_journal.json"
+
+Content = Union[str, bytes]
+
+# mkstemp 创建的文件权限为 0600，替换后按普通文件的默认权限恢复
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_DEFAULT_FILE_MODE = 0o666 & ~_UMASK
+
+
+# ========== 基础操作 ==========
+
+def target_file_mode(path: str) -> int:
+    """替换 path 的临时文件应使用的权限：沿用已有文件的权限，否则为普通文件的默认权限"""
+    try:
+        return os.stat(path).st_mode & 0o777
+    except OSError:
+        return _DEFAULT_FILE_MODE
+
+
+def fsync_directory(directory: str):
+    """fsync 目录，使其中的 rename 持久化；不支持的平台（Windows）上静默跳过"""
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(directory or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def fsync_directories(directories: Iterable[str]):
+    """批量 fsync 目录，每个目录只做一次"""
+    for directory in sorted(set(directories)):
+        fsync_directory(directory)
+
+
+def _to_bytes(content: Content, encoding: str) -> bytes:
+    return content if isinstance(content, bytes) else content.encode(encoding)
+
+
+def _write_temp(path: str, data: bytes) -> str:
+    """在目标文件同目录下写临时文件并 fsync，返回临时文件路径"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        if os.name != "nt":
+            os.fchmod(fd, target_file_mode(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        _remove_quietly(temp_path)
+        raise
+    return temp_path
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def atomic_write(path: str, content: Content, encoding: str = "utf-8", sync_directory: bool = True):
+    """
+    原子地覆盖写一个文件。
+
+    Args:
+        path: 目标文件路径
+        content: 文本或字节
+        encoding: 文本编码
+        sync_directory: 是否 fsync 所在目录（批量写入时由调用方统一处理）
+
+    Raises:
+        OSError: 写入失败时抛出，目标文件保持原样
+    """
+    temp_path = _write_temp(path, _to_bytes(content, encoding))
+    try:
+        os.replace(temp_path, path)
+    except BaseException:
+        _remove_quietly(temp_path)
+        raise
+    if sync_directory:
+        fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+def atomic_write_text(path: str, content: str, encoding: str = "utf-8"):
+    atomic_write(path, content, encoding)
+
+
+def atomic_write_json(path: str, data, indent: int = 2):
+    atomic_write(path, json.dumps(data, ensure_ascii=False, indent=indent))
+
+
+def atomic_write_many(file_contents: Dict[str, Content], encoding: str = "utf-8"):
+    """
+    原子地提交一组文件：全部写入临时文件并 fsync 后，先落盘一份日志，再逐个重命名，最后删除日志。
+    重命名中途进程退出时，recover_journal 会按日志把剩余的临时文件替换到位。
+
+    Raises:
+        OSError: 写入临时文件失败时抛出，所有目标文件保持原样
+    """
+    if not file_contents:
+        return
+    if len(file_contents) == 1:
+        (path, content), = file_contents.items()
+        atomic_write(path, content, encoding)
+        return
+
+    temp_files: Dict[str, str] = {}
+    try:
+        for path, content in file_contents.items():
+            temp_files[os.path.abspath(path)] = _write_temp(path, _to_bytes(content, encoding))
+    except BaseException:
+        for temp_path in temp_files.values():
+            _remove_quietly(temp_path)
+        raise
+
+    journal_dir = os.path.dirname(next(iter(temp_files)))
+    journal_path = os.path.join(journal_dir, JOURNAL_FILE)
+    atomic_write_json(journal_path, [[temp, target] for target, temp in temp_files.items()])
+
+    for target, temp_path in temp_files.items():
+        os.replace(temp_path, target)
+    fsync_directories(os.path.dirname(target) for target in temp_files)
+
+    _remove_quietly(journal_path)
+    fsync_directory(journal_dir)
+
+
+def recover_journal(directory: str) -> int:
+    """
+    完成上次被中断的多文件提交（只会向前补完，不会回滚）。
+
+    Returns:
+        补完的文件数
+    """
+    journal_path = os.path.join(directory, JOURNAL_FILE)
+    if not os.path.exists(journal_path):
+        return 0
+    try:
+        with open(journal_path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except Exception as e:
+        logger.warning(f"写入日志损坏，已忽略: {e}")
+        _remove_quietly(journal_path)
+        return 0
+
+    recovered = 0
+    for temp_path, target in entries:
+        if os.path.exists(temp_path):
+            os.replace(temp_path, target)
+            recovered += 1
+    fsync_directories(os.path.dirname(target) for _, target in entries)
+    _remove_quietly(journal_path)
+    if recovered:
+        logger.info(f"已补完上次中断的写入: {recovered} 个文件")
+    return recovered
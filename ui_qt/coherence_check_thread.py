@@ -8,7 +8,8 @@
 import logging
 from PySide6.QtCore import QThread, Signal
 
-from novel_generator.coherence_checker import CoherenceChecker
+from novel_generator.coherence_checker import CoherenceChecker, STAGE_COMPLETED
+from novel_generator.common import CancellationToken, OperationCancelled
 
 
 class CoherenceCheckThread(QThread):
@@ -16,18 +17,28 @@ class CoherenceCheckThread(QThread):
 
     # 信号定义
     progress_updated = Signal(str)  # 进度更新消息
+    progress_changed = Signal(int, int)  # 总体进度 (当前值, 最大值)
+    issues_found = Signal(list)  # 本步新发现的问题
     check_completed = Signal(object, list, str)  # 检查完成 (scores, issues, report_text)
-    check_failed = Signal(str)  # 检查失败
+    check_partial = Signal(object, list, str, str)  # 取消或出错时已完成部分的结果 (scores, issues, report_text, 错误信息；取消时为空)
+    check_failed = Signal(str)  # 检查失败且没有已完成的部分
 
     def __init__(self, project_path: str, chapters: list, llm_config: dict):
         super().__init__()
         self.project_path = project_path
         self.chapters = chapters
         self.llm_config = llm_config
+        self.cancel_token = CancellationToken()
         self.logger = logging.getLogger(__name__)
 
+    def cancel(self):
+        """请求取消检查，当前LLM调用结束后停止"""
+        self.cancel_token.cancel()
+        self.progress_updated.emit("正在取消，等待当前步骤结束...")
+
     def run(self):
         """执行连贯性检查"""
+        checker = None
         try:
             self.progress_updated.emit("正在初始化连贯性检查器...")
 
@@ -36,15 +47,48 @@ class CoherenceCheckThread(QThread):
 
             self.progress_updated.emit(f"正在分析 {len(self.chapters)} 个章节...")
 
-            # 执行连贯性检查
-            scores, issues, report_text = checker.run_coherence_check(self.chapters)
+            # 逐步执行连贯性检查
+            for event in checker.iter_coherence_check(self.chapters, self.cancel_token):
+                self.progress_changed.emit(*event.overall_progress())
+                if event.stage == STAGE_COMPLETED:
+                    self.progress_updated.emit("正在生成检查报告...")
+                    # 发出完成信号
+                    self.check_completed.emit(event.scores, list(checker.issues), event.report)
+                    return
 
-            self.progress_updated.emit("正在生成检查报告...")
+                self.progress_updated.emit(event.message)
+                if event.issues:
+                    self.issues_found.emit(event.issues)
 
-            # 发出完成信号
-            self.check_completed.emit(scores, issues, report_text)
+        except OperationCancelled:
+            self.logger.info("连贯性检查已被用户取消")
+            self.progress_updated.emit("检查已取消，正在整理已完成部分...")
+            self._emit_partial(checker)
 
         except Exception as e:
             error_message = f"连贯性检查失败: {str(e)}"
             self.logger.error(error_message)
-            self.check_failed.emit(error_message)
\ No newline at end of file
+            # 有已完成的部分时随部分结果一起报告错误，只弹出一个窗口
+            if not self._emit_partial(checker, error_message):
+                self.check_failed.emit(error_message)
+
+    def _emit_partial(self, checker, error_message: str = "") -> bool:
+        """
+        发出已完成部分的检查结果
+
+        Args:
+            error_message: 出错时的错误信息，取消时为空
+
+        Returns:
+            是否发出了 check_partial 信号
+        """
+        if checker is None or not checker.has_results():
+            self.progress_updated.emit("检查已停止，尚无已完成的检查步骤")
+            return False
+        try:
+            scores, issues, report_text = checker.build_result()
+        except Exception as e:
+            self.logger.error(f"生成部分检查报告失败: {e}")
+            return False
+        self.check_partial.emit(scores, issues, report_text, error_message)
+        return True
@@ -16,6 +16,7 @@ from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QFont, QTextCursor, QIcon
 
 from novel_generator.coherence_checker import CoherenceIssue, CoherenceScore
+from storage import atomic_write_text
 
 
 class CoherenceReportDialog(QDialog):
@@ -294,8 +295,7 @@ class CoherenceReportDialog(QDialog):
 
         if file_path:
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(self.report_text)
+                atomic_write_text(file_path, self.report_text)
 
                 # 显示成功消息
                 from ui_qt.widgets.status_bar import StatusBar
@@ -316,14 +316,18 @@ class CoherenceReportDialog(QDialog):
 class CoherenceProgressDialog(QDialog):
     """连贯性检查进度对话框"""
 
+    # 信号定义
+    cancel_requested = Signal()  # 用户请求取消
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.issue_count = 0
         self.setup_ui()
 
     def setup_ui(self):
         """设置UI"""
         self.setWindowTitle("连贯性检查")
-        self.setFixedSize(400, 150)
+        self.setFixedSize(420, 190)
         self.setWindowModality(Qt.ApplicationModal)
 
         layout = QVBoxLayout(self)
@@ -335,7 +339,7 @@ class CoherenceProgressDialog(QDialog):
 
         # 进度条
         self.progress_bar = QProgressBar()
-        self.progress_bar.setRange(0, 0)  # 无限进度条
+        self.progress_bar.setRange(0, 0)  # 收到第一个进度事件前为无限进度条
         layout.addWidget(self.progress_bar)
 
         # 状态标签
@@ -343,6 +347,19 @@ class CoherenceProgressDialog(QDialog):
         self.status_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.status_label)
 
+        # 已发现问题计数
+        self.issue_label = QLabel("已发现问题: 0")
+        self.issue_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.issue_label)
+
+        # 取消按钮
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.cancel_btn = QPushButton("取消检查")
+        self.cancel_btn.clicked.connect(self.request_cancel)
+        button_layout.addWidget(self.cancel_btn)
+        layout.addLayout(button_layout)
+
     def update_status(self, message: str):
         """更新状态消息"""
         self.status_label.setText(message)
@@ -350,4 +367,20 @@ class CoherenceProgressDialog(QDialog):
     def set_progress(self, current: int, total: int):
         """设置进度"""
         self.progress_bar.setRange(0, total)
-        self.progress_bar.setValue(current)
\ No newline at end of file
+        self.progress_bar.setValue(current)
+
+    def add_issues(self, issues: list):
+        """累计新发现的问题数量"""
+        self.issue_count += len(issues)
+        self.issue_label.setText(f"已发现问题: {self.issue_count}")
+
+    def request_cancel(self):
+        """请求取消检查（已完成部分的结果会保留）"""
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.setText("正在取消...")
+        self.cancel_requested.emit()
+
+    def reject(self):
+        """按Esc或关闭窗口时同样视为取消请求，由检查线程结束后关闭对话框"""
+        if self.cancel_btn.isEnabled():
+            self.request_cancel()
@@ -3,25 +3,251 @@
 """
 角色导入对话框
 用于从外部文件或资源导入角色信息
+
+文件在后台线程中解析，角色按块送回界面追加到模型，解析过程中可随时取消；
+CSV / TXT 按行流式读取，并根据已读字节数估算总角色数。
 """
 
+import io
 import os
 import json
-from typing import Dict, Any, List, Optional
+import logging
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel,
     QLineEdit, QPushButton, QTextEdit, QGroupBox,
-    QTreeWidget, QTreeWidgetItem, QCheckBox,
+    QTreeView, QCheckBox,
     QFileDialog, QMessageBox, QComboBox, QFormLayout,
     QSplitter, QFrame, QWidget
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QThread, QCoreApplication
 from PySide6.QtGui import QFont
 
 from ..utils.ui_helpers import (
     create_separator, set_font_size, show_info_dialog,
     show_error_dialog, create_label_with_help
 )
+from ..models.import_role_model import ImportRoleModel
+from ..models.role_list_model import RoleFilterProxyModel
+from novel_generator.common import CancellationToken, OperationCancelled
+
+logger = logging.getLogger(__name__)
+
+# 每块送回界面的角色数
+PARSE_CHUNK_SIZE = 500
+# 文件预览的最大字符数
+PREVIEW_LIMIT = 2000
+
+# 仍在运行的解析线程：线程不归对话框所有，对话框关闭后由这里持有，
+# 直到 finished 信号触发再释放，避免线程对象在 run() 返回前被销毁
+_running_workers = set()
+_quit_hooked = False
+
+FORMAT_JSON = "json"
+FORMAT_CSV = "csv"
+FORMAT_TXT = "txt"
+FORMAT_TEXT = "text"
+
+# TXT 字段名 -> 角色字段
+_TXT_KEYS = {
+    '姓名': 'name', '名字': 'name', '角色名': 'name',
+    '类型': 'type', '角色类型': 'type',
+    '性别': 'gender',
+    '年龄': 'age',
+    '外貌': 'appearance', '外貌描述': 'appearance',
+    '性格': 'personality', '性格特征': 'personality',
+    '背景': 'background', '背景故事': 'background',
+}
+
+
+# ========== 解析 ==========
+
+def _truncate_preview(content: str) -> str:
+    if len(content) > PREVIEW_LIMIT:
+        return content[:PREVIEW_LIMIT] + "\n... (截断)"
+    return content
+
+
+def _csv_row_to_role(row: Dict[str, str]) -> Dict[str, Any]:
+    """将CSV行转换为角色字典"""
+    return {
+        'name': row.get('name', row.get('角色名', '')),
+        'type': row.get('type', row.get('类型', '其他')),
+        'gender': row.get('gender', row.get('性别', '')),
+        'age': row.get('age', row.get('年龄', '')),
+        'appearance': row.get('appearance', row.get('外貌', '')),
+        'personality': row.get('personality', row.get('性格', '')),
+        'background': row.get('background', row.get('背景', ''))
+    }
+
+
+def iter_csv_roles(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """逐行解析CSV角色，只产出有名称的角色"""
+    import csv
+    for row in csv.DictReader(lines):
+        role = _csv_row_to_role(row)
+        if role['name']:
+            yield role
+
+
+def iter_txt_roles(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """逐行解析TXT角色（“字段：值”，空行分隔角色）"""
+    current_role = {}
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if current_role:
+                yield current_role
+                current_role = {}
+            continue
+
+        if '：' in line:
+            key, value = line.split('：', 1)
+            field = _TXT_KEYS.get(key.strip())
+            if field:
+                current_role[field] = value.strip()
+
+    # 最后一个角色
+    if current_role:
+        yield current_role
+
+
+def _named_roles(roles: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """{角色名: 角色数据}（角色管理器导出的格式）转换为角色列表，补齐 name 字段"""
+    return [
+        dict(data, name=data.get('name') or name)
+        for name, data in roles.items() if isinstance(data, dict)
+    ]
+
+
+def load_json_roles(file_path: str) -> tuple:
+    """
+    读取JSON角色文件（标准库无法流式解析JSON，整体解析在后台线程中进行）
+
+    支持角色列表、{"roles": [...] / {...}}、{角色名: 角色数据} 以及单个角色。
+
+    Returns:
+        (角色列表, 预览文本)
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if isinstance(data, list):
+        roles = data
+    elif isinstance(data, dict) and 'roles' in data:
+        roles = data['roles']
+        if isinstance(roles, dict):
+            roles = _named_roles(roles)
+    elif isinstance(data, dict) and data and 'name' not in data and all(
+            isinstance(value, dict) for key, value in data.items() if key != 'metadata'):
+        roles = _named_roles({k: v for k, v in data.items() if k != 'metadata'})
+    else:
+        # 单个角色
+        return [data], _truncate_preview(json.dumps(data, ensure_ascii=False, indent=2))
+    return roles, _truncate_preview(json.dumps(roles[:20], ensure_ascii=False, indent=2))
+
+
+class RoleParseWorker(QThread):
+    """角色文件解析线程，按块送回解析结果"""
+
+    # 信号定义
+    preview_ready = Signal(str)  # 文件预览文本
+    chunk_ready = Signal(list)  # 一块角色
+    estimate_updated = Signal(int)  # 预计角色总数
+    completed = Signal(int)  # 完成，传递角色数
+    error = Signal(str)  # 错误信号
+
+    def __init__(self, file_path: str, file_format: str, parent=None):
+        """
+        Args:
+            file_path: 角色文件路径
+            file_format: FORMAT_JSON / FORMAT_CSV / FORMAT_TXT / FORMAT_TEXT
+            parent: 父对象（对话框创建的线程不设父对象，生命周期由 _running_workers 管理）
+        """
+        super().__init__(parent)
+        self.file_path = file_path
+        self.file_format = file_format
+        self.cancel_token = CancellationToken()
+
+    def run(self):
+        try:
+            if self.file_format == FORMAT_JSON:
+                roles, preview = load_json_roles(self.file_path)
+                self.preview_ready.emit(preview)
+                self.estimate_updated.emit(len(roles))
+                self._emit_chunks(iter(roles))
+                count = len(roles)
+            elif self.file_format in (FORMAT_CSV, FORMAT_TXT):
+                count = self._parse_lines()
+            else:
+                with open(self.file_path, 'r', encoding='utf-8') as f:
+                    self.preview_ready.emit(_truncate_preview(f.read(PREVIEW_LIMIT + 1)))
+                count = 0
+            self.completed.emit(count)
+
+        except OperationCancelled:
+            self.error.emit("已取消解析")
+        except json.JSONDecodeError as e:
+            self.error.emit(f"JSON格式错误: {str(e)}")
+        except Exception as e:
+            logger.error(f"解析角色文件失败: {e}", exc_info=True)
+            self.error.emit(f"预览文件失败: {str(e)}")
+
+    def _parse_lines(self) -> int:
+        """CSV / TXT 按行流式解析，按已读字节估算总数"""
+        encoding = 'utf-8-sig' if self.file_format == FORMAT_CSV else 'utf-8'
+        total_bytes = max(os.path.getsize(self.file_path), 1)
+        with open(self.file_path, 'r', encoding=encoding) as f:
+            self.preview_ready.emit(_truncate_preview(f.read(PREVIEW_LIMIT + 1)))
+
+        with open(self.file_path, 'rb') as raw:
+            text = io.TextIOWrapper(raw, encoding=encoding, newline='' if self.file_format == FORMAT_CSV else None)
+            parser = iter_csv_roles if self.file_format == FORMAT_CSV else iter_txt_roles
+            return self._emit_chunks(parser(text), lambda count: count * total_bytes // max(raw.tell(), 1))
+
+    def _emit_chunks(self, roles: Iterator[Dict[str, Any]], estimate=None) -> int:
+        count = 0
+        chunk = []
+        for role in roles:
+            chunk.append(role)
+            if len(chunk) >= PARSE_CHUNK_SIZE:
+                self.cancel_token.raise_if_cancelled()
+                count += len(chunk)
+                self.chunk_ready.emit(chunk)
+                if estimate is not None:
+                    self.estimate_updated.emit(estimate(count))
+                chunk = []
+        self.cancel_token.raise_if_cancelled()
+        if chunk:
+            count += len(chunk)
+            self.chunk_ready.emit(chunk)
+        return count
+
+    def stop(self):
+        """请求停止解析，当前块处理完后退出"""
+        self.cancel_token.cancel()
+
+
+def _start_worker(worker: RoleParseWorker):
+    """启动解析线程，并持有其引用直到线程真正结束"""
+    global _quit_hooked
+    _running_workers.add(worker)
+    # finished 在线程结束时发出，deleteLater 排队到主线程；对象销毁后再释放引用
+    worker.finished.connect(worker.deleteLater)
+    worker.destroyed.connect(lambda: _running_workers.discard(worker))
+    app = QCoreApplication.instance()
+    if app is not None and not _quit_hooked:
+        _quit_hooked = True
+        app.aboutToQuit.connect(wait_for_parse_workers)
+    worker.start()
+
+
+def wait_for_parse_workers():
+    """退出程序前停止并等待所有解析线程结束（不能在线程运行时销毁 QThread）"""
+    for worker in list(_running_workers):
+        worker.stop()
+    for worker in list(_running_workers):
+        worker.wait()
 
 
 class RoleImportDialog(QDialog):
@@ -34,6 +260,12 @@ class RoleImportDialog(QDialog):
         super().__init__(parent)
         self.selected_roles = []
         self.available_roles = []
+        self.parse_worker: Optional[RoleParseWorker] = None
+        self._estimated_total = 0
+        self.role_model = ImportRoleModel(self)
+        self.role_model.checked_count_changed.connect(self.update_statistics)
+        self.role_proxy = RoleFilterProxyModel(self)
+        self.role_proxy.setSourceModel(self.role_model)
         self.setup_ui()
 
     def setup_ui(self):
@@ -148,6 +380,7 @@ class RoleImportDialog(QDialog):
 
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("输入角色名或特征...")
+        self.search_input.returnPressed.connect(self.filter_roles)
         search_layout.addWidget(self.search_input)
 
         self.search_btn = QPushButton("")
@@ -183,10 +416,11 @@ class RoleImportDialog(QDialog):
         control_layout.addStretch()
         list_layout.addLayout(control_layout)
 
-        # 角色树形列表
-        self.role_tree = QTreeWidget()
-        self.role_tree.setHeaderLabels(["选择", "角色名", "类型", "描述"])
-        self.role_tree.itemChanged.connect(self.on_tree_item_changed)
+        # 角色树形列表（模型由解析线程按块填充）
+        self.role_tree = QTreeView()
+        self.role_tree.setModel(self.role_proxy)
+        self.role_tree.setRootIsDecorated(False)
+        self.role_tree.setUniformRowHeights(True)
         list_layout.addWidget(self.role_tree)
 
         layout.addWidget(list_group)
@@ -207,6 +441,17 @@ class RoleImportDialog(QDialog):
         stats_info.addStretch()
         stats_layout.addLayout(stats_info)
 
+        # 解析进度
+        parse_layout = QHBoxLayout()
+        self.parse_status_label = QLabel("")
+        parse_layout.addWidget(self.parse_status_label)
+        parse_layout.addStretch()
+        self.cancel_parse_btn = QPushButton("取消解析")
+        self.cancel_parse_btn.clicked.connect(self.cancel_parsing)
+        self.cancel_parse_btn.setVisible(False)
+        parse_layout.addWidget(self.cancel_parse_btn)
+        stats_layout.addLayout(parse_layout)
+
         layout.addWidget(stats_group)
 
         return widget
@@ -278,243 +523,139 @@ class RoleImportDialog(QDialog):
             self.import_format.setCurrentText(format_map[ext])
 
     def preview_file(self):
-        """预览文件内容"""
+        """预览文件内容（在后台线程中解析）"""
         file_path = self.file_path.text()
         if not file_path or not os.path.exists(file_path):
             show_error_dialog(self, "错误", "请选择有效的文件")
             return
 
-        try:
-            format_name = self.import_format.currentText()
-
-            if "JSON" in format_name:
-                self.preview_json_file(file_path)
-            elif "CSV" in format_name:
-                self.preview_csv_file(file_path)
-            elif "TXT" in format_name:
-                self.preview_txt_file(file_path)
-            else:
-                self.preview_text_file(file_path)
+        format_name = self.import_format.currentText()
+        if "JSON" in format_name:
+            file_format = FORMAT_JSON
+        elif "CSV" in format_name:
+            file_format = FORMAT_CSV
+        elif "TXT" in format_name:
+            file_format = FORMAT_TXT
+        else:
+            file_format = FORMAT_TEXT
+
+        self.cancel_parsing()
+        self.role_model.clear()
+        self.selected_roles = []
+        self.available_roles = []
+        self._estimated_total = 0
+        self.file_preview.clear()
+        self.import_btn.setEnabled(False)
 
-        except Exception as e:
-            show_error_dialog(self, "错误", f"预览文件失败: {str(e)}")
+        worker = RoleParseWorker(file_path, file_format)
+        worker.preview_ready.connect(self.file_preview.setPlainText)
+        worker.chunk_ready.connect(self.on_roles_chunk)
+        worker.estimate_updated.connect(self.on_estimate_updated)
+        worker.completed.connect(self.on_parse_completed)
+        worker.error.connect(self.on_parse_error)
+        self.parse_worker = worker
+        self.cancel_parse_btn.setVisible(True)
+        self.parse_status_label.setText("正在解析...")
+        _start_worker(worker)
+
+    def cancel_parsing(self):
+        """
+        取消正在进行的解析，已解析的角色保留在列表中
+
+        不等待线程结束：断开与对话框的连接后线程由 _running_workers 持有，
+        JSON 整体解析期间无法中断，结束后线程自行释放。
+        """
+        worker, self.parse_worker = self.parse_worker, None
+        if worker is not None:
+            for signal in (worker.preview_ready, worker.chunk_ready, worker.estimate_updated,
+                           worker.completed, worker.error):
+                signal.disconnect()
+            worker.stop()
+            self.parse_status_label.setText(f"已取消，保留 {self.role_model.rowCount()} 个角色")
+        self.cancel_parse_btn.setVisible(False)
+        self.import_btn.setEnabled(self.role_model.rowCount() > 0)
+
+    def on_roles_chunk(self, roles: List[Dict[str, Any]]):
+        """追加一块解析出的角色"""
+        self.role_model.append_roles(roles)
+        self._update_parse_status()
+        self.update_statistics()
 
-    def preview_json_file(self, file_path: str):
-        """预览JSON文件"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            if isinstance(data, list):
-                self.available_roles = data
-                self.display_roles_in_tree(data)
-            elif isinstance(data, dict) and 'roles' in data:
-                self.available_roles = data['roles']
-                self.display_roles_in_tree(data['roles'])
-            else:
-                # 单个角色
-                self.available_roles = [data]
-                self.display_roles_in_tree([data])
+    def on_estimate_updated(self, total: int):
+        self._estimated_total = total
+        self._update_parse_status()
 
-            # 显示预览
-            preview_text = json.dumps(data, ensure_ascii=False, indent=2)
-            if len(preview_text) > 2000:
-                preview_text = preview_text[:2000] + "\n... (截断)"
-            self.file_preview.setPlainText(preview_text)
+    def _update_parse_status(self):
+        loaded = self.role_model.rowCount()
+        total = max(self._estimated_total, loaded)
+        self.parse_status_label.setText(f"正在解析... 已读取 {loaded} / 约 {total} 个角色")
 
-        except json.JSONDecodeError as e:
-            raise ValueError(f"JSON格式错误: {str(e)}")
-
-    def preview_csv_file(self, file_path: str):
-        """预览CSV文件"""
-        import csv
-
-        roles = []
-        with open(file_path, 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # 将CSV行转换为角色字典
-                role = {
-                    'name': row.get('name', row.get('角色名', '')),
-                    'type': row.get('type', row.get('类型', '其他')),
-                    'gender': row.get('gender', row.get('性别', '')),
-                    'age': row.get('age', row.get('年龄', '')),
-                    'appearance': row.get('appearance', row.get('外貌', '')),
-                    'personality': row.get('personality', row.get('性格', '')),
-                    'background': row.get('background', row.get('背景', ''))
-                }
-                if role['name']:  # 只包含有名称的角色
-                    roles.append(role)
-
-        self.available_roles = roles
-        self.display_roles_in_tree(roles)
-
-        # 显示预览
-        with open(file_path, 'r', encoding='utf-8-sig') as f:
-            content = f.read()
-            if len(content) > 2000:
-                content = content[:2000] + "\n... (截断)"
-            self.file_preview.setPlainText(content)
-
-    def preview_txt_file(self, file_path: str):
-        """预览TXT文件"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # 尝试解析TXT格式的角色数据
-        roles = self.parse_txt_roles(content)
-        self.available_roles = roles
-        self.display_roles_in_tree(roles)
-
-        # 显示预览
-        if len(content) > 2000:
-            content = content[:2000] + "\n... (截断)"
-        self.file_preview.setPlainText(content)
-
-    def preview_text_file(self, file_path: str):
-        """预览文本文件"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        if len(content) > 2000:
-            content = content[:2000] + "\n... (截断)"
-        self.file_preview.setPlainText(content)
+    def on_parse_completed(self, count: int):
+        self.parse_worker = None
+        self.cancel_parse_btn.setVisible(False)
+        self.available_roles = self.role_model.roles()
+        self.parse_status_label.setText(f"解析完成，共 {count} 个角色" if count else "")
+        self.filter_roles()
+        self.update_statistics()
+        self.import_btn.setEnabled(count > 0)
+
+    def on_parse_error(self, message: str):
+        self.parse_worker = None
+        self.cancel_parse_btn.setVisible(False)
+        self.parse_status_label.setText("")
+        self.import_btn.setEnabled(self.role_model.rowCount() > 0)
+        show_error_dialog(self, "错误", message)
 
     def parse_txt_roles(self, content: str) -> List[Dict[str, Any]]:
         """解析TXT格式的角色数据"""
-        roles = []
-        lines = content.split('\n')
-        current_role = {}
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                if current_role:
-                    roles.append(current_role)
-                    current_role = {}
-                continue
-
-            if '：' in line:
-                key, value = line.split('：', 1)
-                key = key.strip()
-                value = value.strip()
-
-                if key in ['姓名', '名字', '角色名']:
-                    current_role['name'] = value
-                elif key in ['类型', '角色类型']:
-                    current_role['type'] = value
-                elif key in ['性别']:
-                    current_role['gender'] = value
-                elif key in ['年龄']:
-                    current_role['age'] = value
-                elif key in ['外貌', '外貌描述']:
-                    current_role['appearance'] = value
-                elif key in ['性格', '性格特征']:
-                    current_role['personality'] = value
-                elif key in ['背景', '背景故事']:
-                    current_role['background'] = value
-
-        # 添加最后一个角色
-        if current_role:
-            roles.append(current_role)
-
-        return roles
+        return list(iter_txt_roles(content.split('\n')))
 
     def display_roles_in_tree(self, roles: List[Dict[str, Any]]):
         """在树形控件中显示角色"""
-        self.role_tree.clear()
+        self.role_model.clear()
         self.selected_roles = []
-
-        for i, role in enumerate(roles):
-            name = role.get('name', f'角色{i+1}')
-            role_type = role.get('type', '其他')
-            description = role.get('appearance', role.get('personality', ''))[:50]
-            if len(description) == 50:
-                description += '...'
-
-            # 创建检查项
-            check_item = QTreeWidgetItem(self.role_tree)
-            check_item.setCheckState(0, Qt.Unchecked)
-            check_item.setText(1, name)
-            check_item.setText(2, role_type)
-            check_item.setText(3, description)
-
-            # 存储角色数据
-            check_item.setData(0, Qt.UserRole, role)
-
+        self.role_model.append_roles(roles)
         self.update_statistics()
         self.import_btn.setEnabled(len(roles) > 0)
 
-    def on_tree_item_changed(self, item: QTreeWidgetItem, column: int):
-        """树形项变更处理"""
-        if column == 0:  # 选择列
-            role = item.data(0, Qt.UserRole)
-            if item.checkState(0) == Qt.Checked:
-                if role not in self.selected_roles:
-                    self.selected_roles.append(role)
-            else:
-                if role in self.selected_roles:
-                    self.selected_roles.remove(role)
-
-            self.update_statistics()
-
-    def update_statistics(self):
+    def update_statistics(self, *_):
         """更新统计信息"""
-        total_count = self.role_tree.topLevelItemCount()
-        selected_count = len(self.selected_roles)
-
-        self.total_count_label.setText(str(total_count))
-        self.selected_count_label.setText(str(selected_count))
+        self.total_count_label.setText(str(self.role_model.rowCount()))
+        self.selected_count_label.setText(str(self.role_model.checked_count()))
 
     def filter_roles(self):
         """过滤角色"""
-        filter_text = self.search_input.text().lower()
-        if not filter_text:
-            # 显示所有项
-            for i in range(self.role_tree.topLevelItemCount()):
-                self.role_tree.topLevelItem(i).setHidden(False)
-            return
-
-        # 隐藏不匹配的项
-        for i in range(self.role_tree.topLevelItemCount()):
-            item = self.role_tree.topLevelItem(i)
-            name = item.text(1).lower()
-            role_type = item.text(2).lower()
-            description = item.text(3).lower()
-
-            if filter_text in name or filter_text in role_type or filter_text in description:
-                item.setHidden(False)
-            else:
-                item.setHidden(True)
+        self.role_proxy.set_filter(self.search_input.text())
 
     def clear_filter(self):
         """清除过滤"""
         self.search_input.clear()
         self.filter_roles()
 
+    def _visible_rows(self) -> Optional[List[int]]:
+        """当前过滤后可见的源模型行号，未过滤时返回 None（表示全部）"""
+        if not self.search_input.text().strip():
+            return None
+        return [
+            self.role_proxy.mapToSource(self.role_proxy.index(row, 0)).row()
+            for row in range(self.role_proxy.rowCount())
+        ]
+
     def select_all_roles(self):
-        """全选角色"""
-        for i in range(self.role_tree.topLevelItemCount()):
-            item = self.role_tree.topLevelItem(i)
-            item.setCheckState(0, Qt.Checked)
+        """全选角色（只作用于过滤后可见的角色）"""
+        self.role_model.set_checked(self._visible_rows(), True)
 
     def deselect_all_roles(self):
         """全不选角色"""
-        for i in range(self.role_tree.topLevelItemCount()):
-            item = self.role_tree.topLevelItem(i)
-            item.setCheckState(0, Qt.Unchecked)
+        self.role_model.set_checked(self._visible_rows(), False)
 
     def invert_selection(self):
         """反选"""
-        for i in range(self.role_tree.topLevelItemCount()):
-            item = self.role_tree.topLevelItem(i)
-            if item.checkState(0) == Qt.Checked:
-                item.setCheckState(0, Qt.Unchecked)
-            else:
-                item.setCheckState(0, Qt.Checked)
+        self.role_model.set_checked(self._visible_rows(), None)
 
     def import_selected_roles(self):
         """导入选中的角色"""
+        self.selected_roles = self.role_model.checked_roles()
         if not self.selected_roles:
             show_error_dialog(self, "错误", "请选择要导入的角色")
             return
@@ -526,7 +667,6 @@ class RoleImportDialog(QDialog):
 
         # 发送导入信号
         self.roles_imported.emit(self.selected_roles)
-        show_info_dialog(self, "成功", f"已导入 {len(self.selected_roles)} 个角色")
         self.accept()
 
     def validate_roles_data(self, roles: List[Dict[str, Any]]) -> bool:
@@ -543,4 +683,9 @@ class RoleImportDialog(QDialog):
 
     def get_imported_roles(self) -> List[Dict[str, Any]]:
         """获取导入的角色列表"""
-        return self.selected_roles.copy()
\ No newline at end of file
+        return self.selected_roles.copy()
+
+    def done(self, result: int):
+        """关闭对话框时停止后台解析"""
+        self.cancel_parsing()
+        super().done(result)
@@ -7,7 +7,7 @@
 
 from typing import Dict, Any
 import os
-import requests
+from lazy_import import lazy_module
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QTabWidget,
     QGroupBox, QLabel, QLineEdit, QSpinBox,
@@ -24,6 +24,10 @@ from ..utils.ui_helpers import (
 )
 from ..utils.theme_manager import ThemeManager
 from config_manager import get_user_config_path
+from storage import atomic_write_text
+
+# 只有 WebDAV 备份用到
+requests = lazy_module("requests")
 
 
 class SettingsDialog(QDialog):
@@ -856,8 +860,7 @@ F5: 刷新预览              F11: 全屏模式""")
             # 确保目录存在
             os.makedirs(filepath, exist_ok=True)
 
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(content)
+            atomic_write_text(filename, content)
 
             self.architecture_status.setText(f"已保存: {filename}")
             self.architecture_status.setProperty("status", "success")
@@ -12,21 +12,20 @@ from typing import Optional, Dict, Any
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QTabWidget, QMenuBar, QStatusBar, QSplitter,
-    QMessageBox, QFileDialog
+    QMessageBox, QFileDialog, QInputDialog
 )
 from PySide6.QtCore import Qt, QTimer, Signal, QThread
 from PySide6.QtGui import QIcon, QFont, QAction, QPixmap
 
-from .widgets.config_widget import ConfigWidget
-from .widgets.generation_widget import GenerationWidget
-from .widgets.chapter_editor import ChapterEditor
-from .widgets.role_manager import RoleManager
 from .widgets.status_bar import StatusBar
 from .utils.theme_manager import ThemeManager
 from .dialogs.settings_dialog import SettingsDialog
 from .dialogs.progress_dialog import ProgressDialog
 from .dialogs.coherence_report_dialog import CoherenceReportDialog, CoherenceProgressDialog
 from .coherence_check_thread import CoherenceCheckThread
+from .project_loader import (
+    ProjectLoader, ProjectSnapshot, find_startup_project, load_project_snapshot, run_in_background
+)
 from config_manager import load_config, save_config
 from novel_generator.project_manager import ProjectManager
 
@@ -38,6 +37,7 @@ class MainWindow(QMainWindow):
     config_changed = Signal(dict)
     generation_started = Signal()
     generation_finished = Signal()
+    project_stats_updated = Signal(dict)  # 项目统计变化（由统计服务的监听线程发出，在主线程处理）
 
     def __init__(self):
         super().__init__()
@@ -47,6 +47,12 @@ class MainWindow(QMainWindow):
         self.theme_manager = ThemeManager()
         # 初始化项目管理器
         self.project_manager = ProjectManager()
+        # 项目的磁盘读取在线程池中进行，读完后再交给各标签页
+        self.project_loader = ProjectLoader(self)
+        self.project_loader.loading_started.connect(self._on_project_loading)
+        self.project_loader.project_ready.connect(self._on_project_ready)
+        self.project_loader.load_failed.connect(self._on_project_load_failed)
+        self.project_stats_updated.connect(self._on_project_stats)
 
         # 先应用初始主题（在创建组件之前）
         self.apply_initial_theme()
@@ -65,31 +71,19 @@ class MainWindow(QMainWindow):
         self.logger.info("主窗口初始化完成")
 
     def _auto_load_last_project(self):
-        """自动加载最近打开的项目"""
-        try:
-            # 尝试从配置中获取最近项目路径
-            last_project = self.config.get("last_project_path", "")
-            if last_project and self.project_manager.is_valid_project(last_project):
-                self.logger.info(f"自动加载最近项目: {last_project}")
-                self.load_project(last_project)
-            else:
-                # 如果没有配置的最近项目，尝试查找默认项目路径
-                from pathlib import Path
-                default_project = Path.home() / "InfiniteQuill" / "book"
-                if default_project.exists() and self.project_manager.is_valid_project(str(default_project)):
-                    self.logger.info(f"使用默认项目路径: {default_project}")
-                    self.load_project(str(default_project))
-                # 尝试查找book目录
-                elif Path("book").exists() and any(self.project_manager.is_valid_project(str(p)) 
-                                                  for p in Path("book").iterdir() if p.is_dir()):
-                    # 找到第一个有效项目
-                    for p in Path("book").iterdir():
-                        if p.is_dir() and self.project_manager.is_valid_project(str(p)):
-                            self.logger.info(f"使用找到的项目路径: {p}")
-                            self.load_project(str(p))
-                            break
-        except Exception as e:
-            self.logger.error(f"自动加载项目失败: {e}")
+        """自动加载最近打开的项目（查找项目目录也在后台进行）"""
+        last_project = self.config.get("last_project_path", "")
+
+        def on_found(project_path):
+            if project_path and not self.current_project_path:
+                self.logger.info(f"自动加载项目: {project_path}")
+                self.load_project(project_path)
+
+        run_in_background(
+            find_startup_project, last_project,
+            on_finished=on_found,
+            on_failed=lambda message: self.logger.error(f"自动加载项目失败: {message}"),
+        )
 
     def setup_ui(self):
         """设置用户界面"""
@@ -149,29 +143,140 @@ class MainWindow(QMainWindow):
                 self.setWindowIcon(QIcon(icon_path))
                 break
 
+    # 标签页注册表：(属性名, 标题, 工具提示)，组件由同名的 _create_<属性名> 方法在首次切换到该页时创建
+    TAB_REGISTRY = (
+        ("generation_widget", " 生成操作", "小说架构生成、章节蓝图、内容生成等核心功能"),
+        ("config_widget", " 配置管理", "LLM模型配置、API密钥管理、代理设置"),
+        ("chapter_editor", " 章节编辑", "章节内容编辑、管理、导出"),
+        ("role_manager", " 角色管理", "角色创建、编辑、导入导出"),
+    )
+
     def create_tabs(self):
-        """创建各个功能标签页"""
-        # 生成操作标签页
-        self.generation_widget = GenerationWidget(self.config, self)
-        self.tab_widget.addTab(self.generation_widget, " 生成操作")
+        """创建各个功能标签页（先放占位页，首次切换到该页时才创建真正的组件）"""
+        self._tab_placeholders: Dict[str, QWidget] = {}
+        for name, title, tooltip in self.TAB_REGISTRY:
+            setattr(self, name, None)
+            placeholder = QWidget()
+            self._tab_placeholders[name] = placeholder
+            index = self.tab_widget.addTab(placeholder, title)
+            self.tab_widget.setTabToolTip(index, tooltip)
+
+        # 启动时只创建当前（第一个）标签页
+        self.ensure_tab(self.TAB_REGISTRY[0][0])
+
+    # ========== 标签页延迟创建 ==========
+
+    def _create_generation_widget(self) -> QWidget:
+        from .widgets.generation_widget import GenerationWidget
+        widget = GenerationWidget(self.config, self)
+        widget.generation_started.connect(self.on_generation_started)
+        widget.generation_finished.connect(self.on_generation_finished)
+        return widget
+
+    def _create_config_widget(self) -> QWidget:
+        from .widgets.config_widget import ConfigWidget
+        widget = ConfigWidget(self.config, self)
+        widget.config_changed.connect(self.on_config_changed)
+        return widget
+
+    def _create_chapter_editor(self) -> QWidget:
+        from .widgets.chapter_editor import ChapterEditor
+        widget = ChapterEditor(self.config, self.theme_manager, self)
+        widget.update_theme_styles()
+        return widget
+
+    def _create_role_manager(self) -> QWidget:
+        from .widgets.role_manager import RoleManager
+        return RoleManager(self.config, self)
+
+    def ensure_tab(self, name: str) -> Optional[QWidget]:
+        """
+        确保标签页组件已创建，首次创建时用真实组件替换占位页，并补上已打开项目的初始化
+
+        Args:
+            name: TAB_REGISTRY 中的属性名
+
+        Returns:
+            标签页组件，创建失败时返回 None
+        """
+        widget = getattr(self, name, None)
+        if widget is not None:
+            return widget
 
-        # 配置管理标签页
-        self.config_widget = ConfigWidget(self.config, self)
-        self.tab_widget.addTab(self.config_widget, " 配置管理")
+        placeholder = self._tab_placeholders.get(name)
+        if placeholder is None:
+            return None
+        try:
+            widget = getattr(self, f"_create_{name}")()
+        except Exception as e:
+            self.logger.error(f"创建标签页 {name} 失败: {e}")
+            return None
+
+        # 标签页可拖动，按占位页当前位置替换
+        index = self.tab_widget.indexOf(placeholder)
+        title = self.tab_widget.tabText(index)
+        tooltip = self.tab_widget.tabToolTip(index)
+        was_current = self.tab_widget.currentIndex() == index
+        self.tab_widget.blockSignals(True)
+        try:
+            self.tab_widget.removeTab(index)
+            self.tab_widget.insertTab(index, widget, title)
+            self.tab_widget.setTabToolTip(index, tooltip)
+            if was_current:
+                self.tab_widget.setCurrentIndex(index)
+        finally:
+            self.tab_widget.blockSignals(False)
+        del self._tab_placeholders[name]
+        placeholder.deleteLater()
+        setattr(self, name, widget)
+        self.logger.info(f"标签页已创建: {title.strip()}")
+
+        # 补上创建之前已经打开的项目：项目可能已被生成页等修改，重新在后台读取
+        project_path = getattr(self, "current_project_path", "")
+        if project_path:
+            if hasattr(widget, "apply_project"):
+                self._reload_tab_project(name, widget, project_path)
+            else:
+                self._init_tab_project(name, widget, project_path)
+        return widget
 
-        # 章节编辑标签页
-        self.chapter_editor = ChapterEditor(self.config, self.theme_manager, self)
-        self.tab_widget.addTab(self.chapter_editor, " 章节编辑")
+    def _reload_tab_project(self, name: str, widget: QWidget, project_path: str):
+        """为后创建的标签页在后台重新读取项目，读完后若项目未切换再交给该标签页"""
+        def on_finished(snapshot: ProjectSnapshot):
+            if self.current_project_path != project_path or getattr(self, name, None) is not widget:
+                return
+            self._init_tab_project(name, widget, project_path, snapshot)
+            self._refresh_project_stats()
+
+        run_in_background(
+            load_project_snapshot, project_path,
+            on_finished=on_finished,
+            on_failed=lambda message: self.logger.error(f"标签页 {name} 加载项目失败: {message}"),
+        )
 
-        # 角色管理标签页
-        self.role_manager = RoleManager(self.config, self)
-        self.tab_widget.addTab(self.role_manager, " 角色管理")
+    def _init_tab_project(self, name: str, widget: QWidget, project_path: str,
+                          snapshot: Optional[ProjectSnapshot] = None):
+        """
+        把项目上下文传给单个标签页组件
 
-        # 设置标签页工具提示
-        self.tab_widget.setTabToolTip(0, "小说架构生成、章节蓝图、内容生成等核心功能")
-        self.tab_widget.setTabToolTip(1, "LLM模型配置、API密钥管理、代理设置")
-        self.tab_widget.setTabToolTip(2, "章节内容编辑、管理、导出")
-        self.tab_widget.setTabToolTip(3, "角色创建、编辑、导入导出")
+        Args:
+            snapshot: 刚在后台读取好的项目数据（不跨事件保留，过期的数据会覆盖磁盘上较新的章节）
+        """
+        if snapshot is not None and snapshot.project_path != project_path:
+            snapshot = None
+        try:
+            if snapshot is not None and hasattr(widget, "apply_project"):
+                widget.apply_project(snapshot)
+            elif name == "chapter_editor":
+                widget.load_project(project_path)
+                widget.refresh_chapter_list()
+            elif name == "role_manager":
+                widget.load_project(project_path)
+                widget.refresh_role_list()
+            elif name == "generation_widget" and hasattr(widget, "set_project_path"):
+                widget.set_project_path(project_path)
+        except Exception as e:
+            self.logger.error(f"标签页 {name} 加载项目失败: {e}")
 
     def create_menu_bar(self):
         """创建菜单栏"""
@@ -192,6 +297,11 @@ class MainWindow(QMainWindow):
         open_project_action.triggered.connect(self.open_project)
         file_menu.addAction(open_project_action)
 
+        restore_backup_action = QAction("从备份恢复(&R)...", self)
+        restore_backup_action.setStatusTip("把当前项目恢复到某个备份快照")
+        restore_backup_action.triggered.connect(self.restore_project_backup)
+        file_menu.addAction(restore_backup_action)
+
         file_menu.addSeparator()
 
         save_config_action = QAction("保存配置(&S)", self)
@@ -251,12 +361,7 @@ class MainWindow(QMainWindow):
 
     def setup_connections(self):
         """设置信号连接"""
-        # 配置变更信号
-        self.config_widget.config_changed.connect(self.on_config_changed)
-
-        # 生成状态信号
-        self.generation_widget.generation_started.connect(self.on_generation_started)
-        self.generation_widget.generation_finished.connect(self.on_generation_finished)
+        # 配置变更、生成状态信号在对应标签页创建时连接（见 _create_*）
 
         # 标签页切换信号
         self.tab_widget.currentChanged.connect(self.on_tab_changed)
@@ -273,8 +378,11 @@ class MainWindow(QMainWindow):
 
     def post_theme_init(self):
         """主题应用完成后的初始化"""
+        # 预先生成其余主题的样式，之后切换主题不再生成样式
+        self.theme_manager.preload_themes()
+
         # 更新章节编辑器的主题样式
-        if hasattr(self, 'chapter_editor'):
+        if getattr(self, 'chapter_editor', None) is not None:
             self.chapter_editor.update_theme_styles()
 
         # 更新状态栏的主题显示
@@ -317,6 +425,10 @@ class MainWindow(QMainWindow):
 
     def on_tab_changed(self, index: int):
         """标签页切换处理"""
+        for name, placeholder in list(self._tab_placeholders.items()):
+            if self.tab_widget.widget(index) is placeholder:
+                self.ensure_tab(name)
+                break
         tab_name = self.tab_widget.tabText(index)
         self.status_bar.show_message(f"切换到: {tab_name}", 2000)
 
@@ -367,47 +479,131 @@ class MainWindow(QMainWindow):
             QFileDialog.ShowDirsOnly
         )
         if directory:
-            # 检查是否是有效的项目
-            if not self.project_manager.is_valid_project(directory):
-                QMessageBox.warning(
-                    self, "无效项目",
-                    "选中的文件夹不是有效的项目目录！\n"
-                    "请选择一个包含 project.json 文件的项目目录。"
-                )
-                return
-
-            # 加载项目
+            # 加载项目（是否为有效项目目录在后台检查，失败时提示）
             self.load_project(directory)
 
     def load_project(self, project_path: str):
-        """加载项目"""
-        try:
-            success = self.project_manager.load_project(project_path)
-            if success:
-                self.current_project_path = project_path
-                self.status_bar.set_project_path(project_path)
-
-                # 保存最近项目路径到配置
-                self.config["last_project_path"] = project_path
-                self.save_config()  # 保存配置
-                
-                # 获取项目信息
-                info = self.project_manager.get_project_info()
-                project_name = info.get('name', '未知项目')
+        """加载项目（磁盘读取在后台进行，完成后由 _on_project_ready 更新界面）"""
+        self.project_loader.load(project_path)
 
-                # 初始化子组件
-                self.on_project_loaded(project_path)
+    def _on_project_loading(self, project_path: str):
+        """显示加载中状态"""
+        self.status_bar.set_busy(f"正在加载项目: {os.path.basename(project_path) or project_path}")
+        self.setCursor(Qt.BusyCursor)
 
-                self.status_bar.show_message(f"项目 '{project_name}' 已加载", 3000)
-                self.logger.info(f"项目已加载: {project_path}")
+    def _finish_project_loading(self):
+        self.status_bar.hide_progress()
+        self.unsetCursor()
 
-            else:
-                QMessageBox.critical(self, "错误", "加载项目失败！")
+    def _on_project_ready(self, snapshot: ProjectSnapshot):
+        """后台加载完成：切换项目并初始化各标签页"""
+        self._finish_project_loading()
+        try:
+            project_path = snapshot.project_path
+            self.project_manager.attach_project(project_path, snapshot.data_manager)
+            self._watch_project_stats()
+            self.current_project_path = project_path
+            self.status_bar.set_project_path(project_path)
+
+            # 保存最近项目路径到配置
+            self.config["last_project_path"] = project_path
+            self.save_config()  # 保存配置
+
+            # 初始化已创建组件的项目上下文；尚未打开的标签页在首次创建时重新读取
+            for name, _, _ in self.TAB_REGISTRY:
+                widget = getattr(self, name, None)
+                if widget is not None:
+                    self._init_tab_project(name, widget, project_path, snapshot)
+
+            project_name = snapshot.info.get('name', '未知项目')
+            self.status_bar.show_message(f"项目 '{project_name}' 已加载", 3000)
+            self.logger.info(f"项目已加载: {project_path}")
 
         except Exception as e:
             self.logger.error(f"加载项目失败: {e}")
             QMessageBox.critical(self, "错误", f"加载项目时发生错误:\n{str(e)}")
 
+    def _watch_project_stats(self):
+        """订阅当前项目的统计服务，统计随文件变化更新时转发到主线程"""
+        stats_service = self.project_manager.stats_service
+        if stats_service is None:
+            return
+        stats_service.add_listener(self.project_stats_updated.emit)
+        self._refresh_project_stats()
+
+    def _refresh_project_stats(self):
+        """在后台读取统计快照（首次读取时扫描项目目录并启动文件监听）"""
+        stats_service = self.project_manager.stats_service
+        if stats_service is None:
+            return
+        run_in_background(
+            stats_service.snapshot,
+            on_finished=self._on_project_stats,
+            on_failed=lambda message: self.logger.warning(f"读取项目统计失败: {message}"),
+        )
+
+    def _on_project_stats(self, stats: Dict[str, Any]):
+        """把统计快照交给概览标签页；没有文件监听时快照不会自动更新，标签页继续自行计算"""
+        if not stats.get("watching"):
+            return
+        chapter_editor = getattr(self, "chapter_editor", None)
+        if chapter_editor is not None and hasattr(chapter_editor, "apply_project_stats"):
+            chapter_editor.apply_project_stats(stats)
+
+    def _on_project_load_failed(self, project_path: str, message: str):
+        self._finish_project_loading()
+        self.logger.error(f"加载项目失败: {project_path}: {message}")
+        QMessageBox.critical(self, "错误", f"加载项目时发生错误:\n{message}")
+
+    def restore_project_backup(self):
+        """把当前项目恢复到选定的备份快照，完成后重新加载项目"""
+        data_manager = self.project_manager.data_manager
+        project_path = self.current_project_path
+        if data_manager is None or not project_path:
+            QMessageBox.information(self, "提示", "请先打开项目")
+            return
+        if self.is_generating:
+            QMessageBox.warning(self, "提示", "内容生成正在进行中，请等待完成后再恢复备份")
+            return
+
+        snapshots = data_manager.list_backups()
+        if not snapshots:
+            QMessageBox.information(self, "提示", "当前项目还没有备份")
+            return
+        snapshot_id, ok = QInputDialog.getItem(
+            self, "从备份恢复", "选择要恢复的备份快照（最新的在前）：",
+            list(reversed(snapshots)), 0, False
+        )
+        if not ok:
+            return
+        reply = QMessageBox.question(
+            self, "确认恢复",
+            f"项目将恢复到快照 {snapshot_id}，之后新建或修改的章节和文件会被删除或覆盖。\n"
+            "恢复前会先自动备份当前状态。确定继续吗？",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+
+        def restore():
+            # 先备份当前状态，误操作时可以再恢复回来
+            data_manager.backup_project()
+            return data_manager.restore_backup(snapshot_id)
+
+        def on_finished(restored):
+            self._finish_project_loading()
+            self.logger.info(f"项目已恢复到快照 {snapshot_id}，写入 {restored} 个文件")
+            self.load_project(project_path)
+
+        def on_failed(message):
+            self._finish_project_loading()
+            QMessageBox.critical(self, "错误", f"恢复备份失败:\n{message}")
+
+        self.status_bar.set_busy(f"正在恢复备份: {snapshot_id}")
+        self.setCursor(Qt.BusyCursor)
+        run_in_background(restore, on_finished=on_finished, on_failed=on_failed)
+
     def save_config(self):
         """保存配置到系统用户配置目录"""
         try:
@@ -443,7 +639,7 @@ class MainWindow(QMainWindow):
             self.apply_theme()
 
             # 更新章节编辑器的主题样式
-            if hasattr(self, 'chapter_editor'):
+            if getattr(self, 'chapter_editor', None) is not None:
                 self.chapter_editor.update_theme_styles()
 
             # 更新状态栏的主题显示
@@ -489,9 +685,14 @@ class MainWindow(QMainWindow):
                 self.config.get('llm', {})
             )
             self.coherence_thread.progress_updated.connect(progress_dialog.update_status)
+            self.coherence_thread.progress_changed.connect(progress_dialog.set_progress)
+            self.coherence_thread.issues_found.connect(progress_dialog.add_issues)
+            progress_dialog.cancel_requested.connect(self.coherence_thread.cancel)
             self.coherence_thread.check_completed.connect(self.on_coherence_check_completed)
+            self.coherence_thread.check_partial.connect(self.on_coherence_check_partial)
             self.coherence_thread.check_failed.connect(self.on_coherence_check_failed)
             self.coherence_thread.finished.connect(progress_dialog.accept)
+            self.coherence_thread.finished.connect(self.coherence_thread.deleteLater)
 
             self.coherence_thread.start()
 
@@ -500,10 +701,6 @@ class MainWindow(QMainWindow):
 
     def on_coherence_check_completed(self, scores, issues, report_text):
         """连贯性检查完成回调"""
-        # 关闭进度对话框
-        if hasattr(self, 'coherence_thread'):
-            self.coherence_thread.deleteLater()
-
         # 显示结果报告
         report_dialog = CoherenceReportDialog(scores, issues, report_text, self)
         report_dialog.exec()
@@ -529,11 +726,24 @@ class MainWindow(QMainWindow):
                 5000
             )
 
+    def on_coherence_check_partial(self, scores, issues, report_text, error_message):
+        """连贯性检查被取消或中途出错时，展示已完成部分的报告；出错时错误信息显示在报告开头"""
+        if error_message:
+            report_text = f"> **{error_message}**\n>\n> 以下为出错前已完成部分的检查结果。\n\n{report_text}"
+        report_dialog = CoherenceReportDialog(scores, issues, report_text, self)
+        report_dialog.setWindowTitle(
+            "小说连贯性检查报告（出错，部分结果）" if error_message else "小说连贯性检查报告（部分结果）"
+        )
+        report_dialog.exec()
+
+        status = "连贯性检查出错" if error_message else "连贯性检查已停止"
+        self.status_bar.show_message(
+            f"{status} - 已完成部分发现{len(issues)}个问题",
+            5000
+        )
+
     def on_coherence_check_failed(self, error_message):
         """连贯性检查失败回调"""
-        if hasattr(self, 'coherence_thread'):
-            self.coherence_thread.deleteLater()
-
         QMessageBox.critical(self, "检查失败", f"连贯性检查过程中出错:\n{error_message}")
         self.status_bar.show_message("连贯性检查失败", 3000)
 
@@ -584,22 +794,11 @@ Copyright © 2025 All rights reserved."""
         try:
             self.logger.info(f"项目创建后初始化: {project_path}")
 
-            # 初始化各个组件的项目上下文
-            if hasattr(self, 'chapter_editor') and self.chapter_editor:
-                self.chapter_editor.load_project(project_path)
-
-            if hasattr(self, 'role_manager') and self.role_manager:
-                self.role_manager.load_project(project_path)
-
-            if hasattr(self, 'generation_widget') and self.generation_widget:
-                self.generation_widget.set_project_path(project_path)
-
-            # 刷新所有组件
-            if hasattr(self, 'chapter_editor') and self.chapter_editor:
-                self.chapter_editor.refresh_chapter_list()
-
-            if hasattr(self, 'role_manager') and self.role_manager:
-                self.role_manager.refresh_role_list()
+            # 初始化已创建组件的项目上下文；尚未打开的标签页在首次创建时补上
+            for name, _, _ in self.TAB_REGISTRY:
+                widget = getattr(self, name, None)
+                if widget is not None:
+                    self._init_tab_project(name, widget, project_path)
 
             self.logger.info("项目创建后初始化完成")
 
@@ -607,28 +806,6 @@ Copyright © 2025 All rights reserved."""
             self.logger.error(f"项目创建后初始化失败: {e}")
 
     def on_project_loaded(self, project_path: str):
-        """项目加载后的初始化处理"""
-        try:
-            self.logger.info(f"项目加载后初始化: {project_path}")
-
-            # 初始化各个组件的项目上下文
-            if hasattr(self, 'chapter_editor') and self.chapter_editor:
-                self.chapter_editor.load_project(project_path)
-
-            if hasattr(self, 'role_manager') and self.role_manager:
-                self.role_manager.load_project(project_path)
-
-            if hasattr(self, 'generation_widget') and self.generation_widget:
-                self.generation_widget.set_project_path(project_path)
-
-            # 刷新所有组件
-            if hasattr(self, 'chapter_editor') and self.chapter_editor:
-                self.chapter_editor.refresh_chapter_list()
-
-            if hasattr(self, 'role_manager') and self.role_manager:
-                self.role_manager.refresh_role_list()
-
-            self.logger.info("项目加载后初始化完成")
-
-        except Exception as e:
-            self.logger.error(f"项目加载后初始化失败: {e}")
\ No newline at end of file
+        """其他组件（如生成页）打开了项目：在后台加载后同步到各标签页"""
+        self.logger.info(f"同步打开的项目: {project_path}")
+        self.load_project(project_path)
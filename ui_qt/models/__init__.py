@@ -0,0 +1,17 @@
+# ui_qt/models/__init__.py
+# -*- coding: utf-8 -*-
+"""
+数据模型模块
+为列表、下拉框、树形视图提供共享的 Qt 模型
+"""
+
+from .chapter_list_model import ChapterListModel
+from .role_list_model import RoleListModel, RoleFilterProxyModel
+from .import_role_model import ImportRoleModel
+
+__all__ = [
+    'ChapterListModel',
+    'RoleListModel',
+    'RoleFilterProxyModel',
+    'ImportRoleModel'
+]
@@ -0,0 +1,186 @@
+# ui_qt/models/chapter_list_model.py
+# -*- coding: utf-8 -*-
+"""
+章节列表模型
+以章节索引（章节号列表 + 项目配置中的标题、字数）为数据源，供章节选择器、列表和树形视图共享。
+视图只对可见行调用 data()，索引中没有的章节在首次显示时才读取正文提取标题和字数；
+refresh() 与上次的章节号列表比较，只发出 rowsRemoved / rowsInserted / dataChanged，不整体重建。
+"""
+
+import logging
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+from novel_generator.word_count_index import count_words_compact
+
+logger = logging.getLogger(__name__)
+
+
+def extract_chapter_title(content: str) -> Optional[str]:
+    """取正文中第一行“# 标题”"""
+    for line in content.split('\n'):
+        line = line.strip()
+        if line.startswith('#'):
+            return line.lstrip('#').strip()
+    return None
+
+
+class ChapterListModel(QAbstractListModel):
+    """章节列表模型，每行一个章节"""
+
+    ChapterNumberRole = Qt.UserRole
+    TitleRole = Qt.UserRole + 1
+    WordCountRole = Qt.UserRole + 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.data_manager = None
+        self._chapters: List[int] = []
+        self._index: Dict[int, Dict[str, Any]] = {}  # 项目配置中的章节信息
+        self._fetched: Dict[int, Tuple[str, int]] = {}  # 按需读取的 (标题, 字数)
+        self._total_words = 0
+
+    # ========== 数据源 ==========
+
+    def set_data_manager(self, data_manager, chapters: Optional[List[int]] = None,
+                         config: Optional[Dict[str, Any]] = None):
+        """
+        切换项目：整体重置一次，之后用 refresh() 增量更新
+
+        Args:
+            data_manager: 项目数据管理器
+            chapters: 已在后台读取好的章节号列表（None 表示现在读取）
+            config: 已在后台读取好的项目配置（None 表示现在读取）
+        """
+        self.beginResetModel()
+        self.data_manager = data_manager
+        self._chapters = []
+        self._index = {}
+        self._fetched = {}
+        self._total_words = 0
+        self.endResetModel()
+        self.refresh(chapters, config)
+
+    def refresh(self, chapters: Optional[List[int]] = None, config: Optional[Dict[str, Any]] = None):
+        """重新读取章节索引，按差异增量更新行（可传入已读取好的章节号列表和项目配置）"""
+        if self.data_manager is None:
+            return
+        chapters = sorted(self.data_manager.list_chapters() if chapters is None else chapters)
+        if config is None:
+            try:
+                config = self.data_manager.load_project_config()
+            except Exception as e:
+                logger.warning(f"读取章节索引失败: {e}")
+                config = {}
+        old_index = self._index
+        self._index = {c["number"]: c for c in config.get("chapters", []) if "number" in c}
+        self._total_words = config.get("word_count", 0)
+
+        self._remove_missing(set(chapters))
+        self._insert_new(chapters)
+
+        # 索引信息有变化、或按需读取过的章节（正文可能已被改写）发出 dataChanged
+        for row, number in enumerate(self._chapters):
+            if old_index.get(number) != self._index.get(number) or number in self._fetched:
+                self._fetched.pop(number, None)
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+    def _remove_missing(self, keep: set):
+        row = len(self._chapters) - 1
+        while row >= 0:
+            if self._chapters[row] in keep:
+                row -= 1
+                continue
+            end = row
+            while row > 0 and self._chapters[row - 1] not in keep:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row, end)
+            for number in self._chapters[row:end + 1]:
+                self._fetched.pop(number, None)
+            del self._chapters[row:end + 1]
+            self.endRemoveRows()
+            row -= 1
+
+    def _insert_new(self, chapters: List[int]):
+        # 删除后现有行是 chapters 的有序子集，连续的新章节合并为一次插入
+        row = 0
+        k = 0
+        while k < len(chapters):
+            if row < len(self._chapters) and self._chapters[row] == chapters[k]:
+                row += 1
+                k += 1
+                continue
+            start = k
+            while k < len(chapters) and (row >= len(self._chapters) or chapters[k] != self._chapters[row]):
+                k += 1
+            run = chapters[start:k]
+            self.beginInsertRows(QModelIndex(), row, row + len(run) - 1)
+            self._chapters[row:row] = run
+            self.endInsertRows()
+            row += len(run)
+
+    def chapter_changed(self, chapter_number: int):
+        """单个章节内容变化（如保存后），只刷新这一行"""
+        self._fetched.pop(chapter_number, None)
+        row = self.row_of(chapter_number)
+        if row >= 0:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    # ========== 查询 ==========
+
+    def chapter_at(self, row: int) -> Optional[int]:
+        return self._chapters[row] if 0 <= row < len(self._chapters) else None
+
+    def row_of(self, chapter_number: int) -> int:
+        """章节所在行，不存在返回 -1"""
+        row = bisect_left(self._chapters, chapter_number)
+        return row if row < len(self._chapters) and self._chapters[row] == chapter_number else -1
+
+    def chapters(self) -> List[int]:
+        return list(self._chapters)
+
+    def total_words(self) -> int:
+        return self._total_words
+
+    def chapter_meta(self, chapter_number: int) -> Tuple[str, int]:
+        """(标题, 字数)：优先取索引，否则读取一次正文并缓存"""
+        entry = self._index.get(chapter_number)
+        if entry and entry.get("title"):
+            return entry["title"], entry.get("word_count", 0)
+        if chapter_number not in self._fetched:
+            title, words = f"第{chapter_number}章", 0
+            try:
+                content = self.data_manager.load_chapter(chapter_number)
+                title = extract_chapter_title(content) or title
+                words = count_words_compact(content)
+            except Exception as e:
+                logger.warning(f"读取第{chapter_number}章信息失败: {e}")
+            self._fetched[chapter_number] = (title, words)
+        return self._fetched[chapter_number]
+
+    # ========== QAbstractListModel ==========
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._chapters)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        number = self.chapter_at(index.row()) if index.isValid() else None
+        if number is None:
+            return None
+        if role == self.ChapterNumberRole:
+            return number
+        if role in (Qt.DisplayRole, Qt.ToolTipRole, self.TitleRole, self.WordCountRole):
+            title, words = self.chapter_meta(number)
+            if role == self.TitleRole:
+                return title
+            if role == self.WordCountRole:
+                return words
+            label = f"第{number}章"
+            if role == Qt.DisplayRole:
+                return label if title == label else f"{label} {title}"
+            return f"{title}\n{words} 字"
+        return None
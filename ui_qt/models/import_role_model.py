@@ -0,0 +1,144 @@
+# ui_qt/models/import_role_model.py
+# -*- coding: utf-8 -*-
+"""
+待导入角色模型
+解析线程按块追加角色，每块只发出一次 rowsInserted；勾选状态保存在模型中，
+全选 / 全不选 / 反选只发出一次 dataChanged，不再逐项遍历树控件。
+过滤使用 RoleFilterProxyModel（按预先生成的小写搜索键匹配）。
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, Signal
+
+COLUMNS = ["选择", "角色名", "类型", "描述"]
+DESCRIPTION_LENGTH = 50
+
+
+def _description(role: Dict[str, Any]) -> str:
+    description = str(role.get('appearance', role.get('personality', '')) or '')[:DESCRIPTION_LENGTH]
+    if len(description) == DESCRIPTION_LENGTH:
+        description += '...'
+    return description
+
+
+class ImportRoleModel(QAbstractTableModel):
+    """待导入角色表格，第 0 列为勾选框"""
+
+    RoleDataRole = Qt.UserRole
+
+    # 勾选数量变化
+    checked_count_changed = Signal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._roles: List[Dict[str, Any]] = []
+        self._checked = bytearray()
+        self._search_keys: List[str] = []
+        self._checked_count = 0
+
+    # ========== 修改 ==========
+
+    def clear(self):
+        self.beginResetModel()
+        self._roles = []
+        self._checked = bytearray()
+        self._search_keys = []
+        self.endResetModel()
+        self._set_checked_count(0)
+
+    def append_roles(self, roles: List[Dict[str, Any]]):
+        """追加一块角色（一次行插入）"""
+        if not roles:
+            return
+        start = len(self._roles)
+        self.beginInsertRows(QModelIndex(), start, start + len(roles) - 1)
+        for i, role in enumerate(roles, start + 1):
+            name = role.get('name') or f'角色{i}'
+            role_type = role.get('type', '其他')
+            self._search_keys.append(f"{name}\n{role_type}\n{_description(role)}".lower())
+        self._roles.extend(roles)
+        self._checked.extend(b"\0" * len(roles))
+        self.endInsertRows()
+
+    def set_checked(self, rows: Optional[Iterable[int]], checked: Optional[bool]):
+        """
+        批量设置勾选状态
+
+        Args:
+            rows: 源模型行号，None 表示全部行
+            checked: True 勾选、False 取消，None 表示反选
+        """
+        rows = range(len(self._roles)) if rows is None else rows
+        first, last = None, None
+        for row in rows:
+            value = (not self._checked[row]) if checked is None else bool(checked)
+            if self._checked[row] != value:
+                self._checked[row] = value
+                first = row if first is None else min(first, row)
+                last = row if last is None else max(last, row)
+        if first is not None:
+            self.dataChanged.emit(self.index(first, 0), self.index(last, 0), [Qt.CheckStateRole])
+        self._set_checked_count(self._checked.count(1))
+
+    def _set_checked_count(self, count: int):
+        if count != self._checked_count:
+            self._checked_count = count
+            self.checked_count_changed.emit(count)
+
+    # ========== 查询 ==========
+
+    def search_key(self, row: int) -> str:
+        return self._search_keys[row]
+
+    def checked_roles(self) -> List[Dict[str, Any]]:
+        return [role for role, checked in zip(self._roles, self._checked) if checked]
+
+    def checked_count(self) -> int:
+        return self._checked_count
+
+    def roles(self) -> List[Dict[str, Any]]:
+        return list(self._roles)
+
+    # ========== QAbstractTableModel ==========
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._roles)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section: int, orientation, role: int = Qt.DisplayRole) -> Any:
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def flags(self, index: QModelIndex):
+        flags = super().flags(index)
+        if index.isValid() and index.column() == 0:
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        item = self._roles[row]
+        if role == Qt.CheckStateRole and column == 0:
+            return Qt.Checked if self._checked[row] else Qt.Unchecked
+        if role == self.RoleDataRole:
+            return item
+        if role == Qt.DisplayRole:
+            if column == 1:
+                return item.get('name') or f'角色{row + 1}'
+            if column == 2:
+                return item.get('type', '其他')
+            if column == 3:
+                return _description(item)
+        return None
+
+    def setData(self, index: QModelIndex, value: Any, role: int = Qt.EditRole) -> bool:
+        if index.isValid() and index.column() == 0 and role == Qt.CheckStateRole:
+            self.set_checked([index.row()], Qt.CheckState(value) == Qt.Checked)
+            return True
+        return False
@@ -0,0 +1,163 @@
+# ui_qt/models/role_list_model.py
+# -*- coding: utf-8 -*-
+"""
+角色列表模型
+RoleListModel 直接包装 RoleManager 的角色字典，每个角色在写入时预先生成一条小写搜索键
+（角色名、分类、描述等字段拼接）；RoleFilterProxyModel 过滤时只做一次子串查找，
+不再为每次按键重新拼接、转换所有角色的字段，也不重建列表项。
+"""
+
+from typing import Any, Dict, List, Optional
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QSize, QSortFilterProxyModel, Qt
+
+# 参与搜索的字段
+SEARCH_FIELDS = (
+    "name", "category", "description", "type", "gender",
+    "personality_description", "background_story", "appearance",
+)
+ALL_CATEGORIES = "全部"
+ROLE_ITEM_HEIGHT = 70
+
+
+def build_search_key(role_data: Dict[str, Any]) -> str:
+    """角色的小写搜索键（字段之间用换行分隔，避免跨字段误匹配）"""
+    return "\n".join(str(role_data.get(field) or "") for field in SEARCH_FIELDS).lower()
+
+
+class RoleListModel(QAbstractListModel):
+    """角色列表模型，行顺序与角色字典的插入顺序一致"""
+
+    NameRole = Qt.UserRole
+    CategoryRole = Qt.UserRole + 1
+    SearchKeyRole = Qt.UserRole + 2
+
+    def __init__(self, roles: Optional[Dict[str, Dict[str, Any]]] = None, parent=None):
+        """
+        Args:
+            roles: 角色字典 {角色名: 数据}，模型就地修改它
+        """
+        super().__init__(parent)
+        self.roles = roles if roles is not None else {}
+        self._names: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._search_keys: Dict[str, str] = {}
+        self._rebuild()
+
+    def _rebuild(self):
+        self._names = list(self.roles)
+        self._rows = {name: row for row, name in enumerate(self._names)}
+        self._search_keys = {name: build_search_key(data) for name, data in self.roles.items()}
+
+    # ========== 修改 ==========
+
+    def set_roles(self, roles: Dict[str, Dict[str, Any]]):
+        """整体替换角色（加载项目、批量导入时只重置一次）"""
+        self.beginResetModel()
+        self.roles.clear()
+        self.roles.update(roles)
+        self._rebuild()
+        self.endResetModel()
+
+    def add_roles(self, roles: Dict[str, Dict[str, Any]]):
+        """批量新增或更新角色，新角色合并为一次行插入"""
+        new_names = [name for name in roles if name not in self._rows]
+        for name, data in roles.items():
+            if name in self._rows:
+                self.upsert_role(name, data)
+        if not new_names:
+            return
+        start = len(self._names)
+        self.beginInsertRows(QModelIndex(), start, start + len(new_names) - 1)
+        for name in new_names:
+            self.roles[name] = roles[name]
+            self._rows[name] = len(self._names)
+            self._names.append(name)
+            self._search_keys[name] = build_search_key(roles[name])
+        self.endInsertRows()
+
+    def upsert_role(self, name: str, role_data: Dict[str, Any]):
+        """新增或更新单个角色"""
+        self.roles[name] = role_data
+        self._search_keys[name] = build_search_key(role_data)
+        row = self._rows.get(name)
+        if row is None:
+            row = len(self._names)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._names.append(name)
+            self._rows[name] = row
+            self.endInsertRows()
+        else:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def remove_role(self, name: str):
+        row = self._rows.get(name)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._names[row]
+        del self.roles[name]
+        del self._search_keys[name]
+        self._rows = {n: r for r, n in enumerate(self._names)}
+        self.endRemoveRows()
+
+    def clear(self):
+        self.set_roles({})
+
+    # ========== 查询 ==========
+
+    def name_at(self, row: int) -> Optional[str]:
+        return self._names[row] if 0 <= row < len(self._names) else None
+
+    def row_of(self, name: str) -> int:
+        return self._rows.get(name, -1)
+
+    def search_key(self, row: int) -> str:
+        return self._search_keys[self._names[row]]
+
+    def category_at(self, row: int) -> str:
+        return self.roles[self._names[row]].get("category", "未分类")
+
+    # ========== QAbstractListModel ==========
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._names)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        name = self.name_at(index.row()) if index.isValid() else None
+        if name is None:
+            return None
+        if role in (Qt.DisplayRole, self.NameRole):
+            return name
+        if role == self.CategoryRole:
+            return self.category_at(index.row())
+        if role == self.SearchKeyRole:
+            return self._search_keys[name]
+        if role == Qt.SizeHintRole:
+            return QSize(0, ROLE_ITEM_HEIGHT)
+        return None
+
+
+class RoleFilterProxyModel(QSortFilterProxyModel):
+    """按搜索文本和分类过滤角色"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._text = ""
+        self._category = ALL_CATEGORIES
+
+    def set_filter(self, text: str, category: str = ALL_CATEGORIES):
+        text = text.strip().lower()
+        category = category or ALL_CATEGORIES
+        if text == self._text and category == self._category:
+            return
+        self._text = text
+        self._category = category
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        model = self.sourceModel()
+        if self._category != ALL_CATEGORIES and model.category_at(source_row) != self._category:
+            return False
+        return not self._text or self._text in model.search_key(source_row)
@@ -0,0 +1,196 @@
+# ui_qt/project_loader.py
+# -*- coding: utf-8 -*-
+"""
+后台项目加载
+打开项目时的磁盘读取（创建 DataManager、读取项目配置、章节列表、首个章节和角色数据）
+在线程池中进行，读完后通过信号把结果送回主线程，网络盘或慢速磁盘上打开项目时界面不会卡住。
+"""
+
+import os
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from novel_generator.data_manager import DataManager
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectSnapshot(NamedTuple):
+    """后台读取好的项目数据，界面组件直接使用，不再访问磁盘"""
+    project_path: str
+    data_manager: DataManager
+    info: Dict[str, Any]
+    config: Dict[str, Any]
+    chapters: List[int]
+    first_chapter: Optional[int]
+    first_chapter_content: str
+    roles: Dict[str, Any]
+
+
+def is_project_dir(project_path: str) -> bool:
+    """是否为有效项目目录（包含 project.json）"""
+    return os.path.isfile(os.path.join(project_path, "project.json"))
+
+
+def load_project_snapshot(project_path: str) -> ProjectSnapshot:
+    """
+    读取项目（在工作线程中调用）
+
+    Args:
+        project_path: 项目路径
+
+    Returns:
+        ProjectSnapshot
+    """
+    if not is_project_dir(project_path):
+        raise FileNotFoundError(f"不是有效的项目目录: {project_path}")
+
+    data_manager = DataManager(project_path)
+    config = data_manager.load_project_config()
+    chapters = sorted(data_manager.list_chapters())
+    roles = data_manager.load_roles() or {}
+    first_chapter = chapters[0] if chapters else None
+    content = data_manager.load_chapter(first_chapter) if first_chapter is not None else ""
+
+    info = {
+        "name": config.get("name", "未命名项目"),
+        "created": config.get("created", ""),
+        "updated": config.get("updated", ""),
+        "chapter_count": len(chapters),
+        "word_count": config.get("word_count", 0),
+        "role_count": len(roles),
+        "project_path": str(project_path),
+    }
+    return ProjectSnapshot(project_path, data_manager, info, config, chapters, first_chapter, content, roles)
+
+
+def find_startup_project(last_project: str) -> Optional[str]:
+    """
+    查找启动时自动打开的项目：最近项目、~/InfiniteQuill/book、./book 下第一个有效项目
+
+    Returns:
+        项目路径，没有找到返回 None
+    """
+    if last_project and is_project_dir(last_project):
+        return last_project
+
+    default_project = Path.home() / "InfiniteQuill" / "book"
+    if is_project_dir(str(default_project)):
+        return str(default_project)
+
+    book_dir = Path("book")
+    if book_dir.is_dir():
+        for path in book_dir.iterdir():
+            if path.is_dir() and is_project_dir(str(path)):
+                return str(path)
+    return None
+
+
+# ========== 线程池任务 ==========
+
+class _TaskSignals(QObject):
+    """任务信号（在主线程中创建，回调因此在主线程中执行）"""
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class BackgroundTask(QRunnable):
+    """在线程池中执行一个函数"""
+
+    def __init__(self, fn: Callable[..., Any], *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = _TaskSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            logger.error(f"后台任务失败: {e}", exc_info=True)
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
+
+
+# 运行中的任务，保留引用直到结果送回主线程
+_pending_tasks: Set[BackgroundTask] = set()
+
+
+def run_in_background(fn: Callable[..., Any], *args,
+                      on_finished: Optional[Callable[[Any], None]] = None,
+                      on_failed: Optional[Callable[[str], None]] = None) -> BackgroundTask:
+    """
+    在全局线程池中执行 fn(*args)，结果通过回调在主线程中返回
+
+    Args:
+        fn: 要执行的函数（不得访问界面对象）
+        on_finished: 成功回调，参数为 fn 的返回值
+        on_failed: 失败回调，参数为错误信息
+
+    Returns:
+        BackgroundTask
+    """
+    task = BackgroundTask(fn, *args)
+    _pending_tasks.add(task)
+
+    def finished(result):
+        _pending_tasks.discard(task)
+        if on_finished is not None:
+            on_finished(result)
+
+    def failed(message):
+        _pending_tasks.discard(task)
+        if on_failed is not None:
+            on_failed(message)
+
+    task.signals.finished.connect(finished)
+    task.signals.failed.connect(failed)
+    QThreadPool.globalInstance().start(task)
+    return task
+
+
+class ProjectLoader(QObject):
+    """项目加载服务：同一时间只采用最后一次请求的结果"""
+
+    # 信号定义
+    loading_started = Signal(str)  # 开始加载，传递项目路径
+    project_ready = Signal(object)  # 加载完成，传递 ProjectSnapshot
+    load_failed = Signal(str, str)  # 加载失败 (项目路径, 错误信息)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._generation = 0
+        self._loading_path = ""
+
+    @property
+    def is_loading(self) -> bool:
+        return bool(self._loading_path)
+
+    def load(self, project_path: str):
+        """请求加载项目；加载中再次请求时，前一次的结果被丢弃"""
+        self._generation += 1
+        generation = self._generation
+        self._loading_path = project_path
+        self.loading_started.emit(project_path)
+        run_in_background(
+            load_project_snapshot, project_path,
+            on_finished=lambda snapshot: self._on_finished(generation, snapshot),
+            on_failed=lambda message: self._on_failed(generation, project_path, message),
+        )
+
+    def _on_finished(self, generation: int, snapshot: ProjectSnapshot):
+        if generation != self._generation:
+            logger.info(f"丢弃过期的项目加载结果: {snapshot.project_path}")
+            return
+        self._loading_path = ""
+        self.project_ready.emit(snapshot)
+
+    def _on_failed(self, generation: int, project_path: str, message: str):
+        if generation != self._generation:
+            return
+        self._loading_path = ""
+        self.load_failed.emit(project_path, message)
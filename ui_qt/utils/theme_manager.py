@@ -3,33 +3,114 @@
 """
 主题管理器
 负责应用程序的主题切换和样式管理
+
+每个主题的 QSS 只生成一次：内存中按主题缓存，磁盘上按“主题名 + 版本哈希”缓存在用户配置目录，
+版本哈希由本文件和样式文件的大小、修改时间得出，样式源码变化后自动失效。
+切换主题只调用一次 app.setStyleSheet()，由 Qt 自身把样式传播到所有控件；
+依赖动态属性选择器、需要额外 polish 的控件通过 register_polish_widget() 显式登记。
 """
 
 import os
+import time
+import hashlib
 import logging
+import weakref
 from typing import Optional
-from PySide6.QtWidgets import QApplication
+from PySide6.QtWidgets import QApplication, QWidget
 from PySide6.QtCore import QObject
 
+# 修改缓存格式时递增
+THEME_CACHE_VERSION = 1
+THEME_CACHE_DIR = "theme_cache"
+# 主题切换耗时预算（毫秒），超出时记录警告
+THEME_SWITCH_BUDGET_MS = 100
+
+_STYLE_DIR = os.path.join(os.path.dirname(__file__), "..", "styles")
+
+# 主题切换后需要显式重新 polish 的控件
+_polish_widgets = weakref.WeakSet()
+
+
+def register_polish_widget(widget: QWidget):
+    """登记主题切换后需要重新 polish 的控件（如按动态属性选择样式的状态标签）"""
+    _polish_widgets.add(widget)
+    widget.destroyed.connect(lambda *_: _polish_widgets.discard(widget))
+
+
+def _theme_version(theme_name: str) -> str:
+    """主题样式的版本哈希：样式源码（本文件、QSS 文件）任一变化都会改变"""
+    parts = [str(THEME_CACHE_VERSION), theme_name]
+    for path in (os.path.abspath(__file__), os.path.join(_STYLE_DIR, f"{theme_name}.qss")):
+        try:
+            stat = os.stat(path)
+            parts.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+        except OSError:
+            parts.append("-")
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+def _theme_cache_dir() -> str:
+    from config_manager import get_config_directory
+    return os.path.join(str(get_config_directory()), THEME_CACHE_DIR)
+
 
 class ThemeManager(QObject):
     """主题管理器类"""
 
+    # 所有实例共享的已生成样式 {主题名: QSS}
+    _compiled_themes = {}
+
     def __init__(self):
         super().__init__()
         self.current_theme = "light"
-        self.theme_cache = {}
+        self.theme_cache = self._compiled_themes
+        self.last_switch_ms = 0.0
         self.logger = logging.getLogger(__name__)
 
-    def load_qss_file(self, theme_name: str) -> str:
-        """加载QSS样式文件"""
+    # ========== 样式缓存 ==========
+
+    def get_stylesheet(self, theme_name: str) -> str:
+        """获取主题样式：内存缓存 -> 磁盘缓存 -> 重新生成并写入磁盘缓存"""
         if theme_name in self.theme_cache:
-            self.logger.debug(f"从缓存加载主题: {theme_name}")
             return self.theme_cache[theme_name]
 
+        version = _theme_version(theme_name)
+        cache_file = os.path.join(_theme_cache_dir(), f"{theme_name}.{version}.qss")
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                qss_content = f.read()
+            self.logger.debug(f"从磁盘缓存加载主题: {theme_name}")
+        except OSError:
+            qss_content = self.load_qss_file(theme_name)
+            if qss_content:
+                self._write_disk_cache(theme_name, cache_file, qss_content)
+
+        if qss_content:
+            self.theme_cache[theme_name] = qss_content
+        return qss_content
+
+    def _write_disk_cache(self, theme_name: str, cache_file: str, qss_content: str):
+        """写入磁盘缓存，并删除该主题的旧版本缓存"""
+        from storage import atomic_write_text
+        try:
+            atomic_write_text(cache_file, qss_content)
+            cache_dir = os.path.dirname(cache_file)
+            for name in os.listdir(cache_dir):
+                if name.startswith(f"{theme_name}.") and name != os.path.basename(cache_file):
+                    os.remove(os.path.join(cache_dir, name))
+        except OSError as e:
+            self.logger.warning(f"写入主题缓存失败: {e}")
+
+    def preload_themes(self):
+        """预先生成所有主题的样式，之后的切换不再读取或拼接样式"""
+        for theme_name in self.get_available_themes():
+            self.get_stylesheet(theme_name)
+
+    def load_qss_file(self, theme_name: str) -> str:
+        """加载QSS样式文件"""
+
         # 样式文件路径
-        style_dir = os.path.join(os.path.dirname(__file__), "..", "styles")
-        qss_file = os.path.join(style_dir, f"{theme_name}.qss")
+        qss_file = os.path.join(_STYLE_DIR, f"{theme_name}.qss")
 
         self.logger.info(f"尝试加载QSS文件: {qss_file}")
 
@@ -37,7 +118,6 @@ class ThemeManager(QObject):
             try:
                 with open(qss_file, 'r', encoding='utf-8') as f:
                     qss_content = f.read()
-                    self.theme_cache[theme_name] = qss_content
                     self.logger.info(f"成功加载主题文件: {theme_name}")
                     return qss_content
             except Exception as e:
@@ -424,24 +504,24 @@ class ThemeManager(QObject):
         }
 
         /* ================ 角色列表样式 - 浅色主题 ================ */
-        QListWidget#RoleListWidget {
+        QListView#RoleListWidget {
             border: none;
             background-color: transparent;
             outline: none;
         }
 
-        QListWidget#RoleListWidget::item {
+        QListView#RoleListWidget::item {
             padding: 12px;
             border-bottom: 1px solid #e0e0e0;
             margin: 0px;
             color: #333333;
         }
 
-        QListWidget#RoleListWidget::item:hover {
+        QListView#RoleListWidget::item:hover {
             background-color: #f5f5f5;
         }
 
-        QListWidget#RoleListWidget::item:selected {
+        QListView#RoleListWidget::item:selected {
             background-color: #e3f2fd;
             border-left: 4px solid #1976d2;
         }
@@ -944,24 +1024,24 @@ class ThemeManager(QObject):
         }
 
         /* ================ 角色列表样式 - 暗色主题 ================ */
-        QListWidget#RoleListWidget {
+        QListView#RoleListWidget {
             border: none;
             background-color: transparent;
             outline: none;
         }
 
-        QListWidget#RoleListWidget::item {
+        QListView#RoleListWidget::item {
             padding: 12px;
             border-bottom: 1px solid #555555;
             margin: 0px;
             color: #ffffff;
         }
 
-        QListWidget#RoleListWidget::item:hover {
+        QListView#RoleListWidget::item:hover {
             background-color: #4a4a4a;
         }
 
-        QListWidget#RoleListWidget::item:selected {
+        QListView#RoleListWidget::item:selected {
             background-color: #1e88e5;
             border-left: 4px solid #1976d2;
         }
@@ -1088,33 +1168,24 @@ class ThemeManager(QObject):
     def apply_theme(self, window, theme_name: str):
         """应用主题到指定窗口"""
         try:
-            self.logger.info(f"开始应用主题: {theme_name}")
+            started = time.perf_counter()
             app = QApplication.instance()
             if app:
-                qss_content = self.load_qss_file(theme_name)
+                qss_content = self.get_stylesheet(theme_name)
                 if qss_content:
-                    app.setStyleSheet(qss_content)
+                    # 样式表设置到 QApplication 后由 Qt 传播到所有控件，不再逐个 polish
+                    if app.styleSheet() != qss_content:
+                        app.setStyleSheet(qss_content)
                     self.current_theme = theme_name
                     window.current_theme = theme_name
-                    self.logger.info(f"主题样式已应用到应用程序: {theme_name}")
-
-                    # 重新polish所有widget以确保主题正确应用
-                    widgets_polished = 0
-                    for widget in app.allWidgets():
-                        try:
-                            widget.style().unpolish(widget)
-                            widget.style().polish(widget)
-                            # 安全地调用update方法
-                            try:
-                                widget.update()
-                            except TypeError:
-                                # 如果update方法需要参数，跳过调用
-                                pass
-                            widgets_polished += 1
-                        except Exception as e:
-                            self.logger.warning(f"polish widget失败: {e}")
-
-                    self.logger.info(f"完成主题切换，已polish {widgets_polished} 个widget")
+
+                    polished = self._polish_registered_widgets()
+                    self.last_switch_ms = (time.perf_counter() - started) * 1000
+                    message = f"主题已应用: {theme_name}，耗时 {self.last_switch_ms:.1f} ms（额外 polish {polished} 个控件）"
+                    if self.last_switch_ms > THEME_SWITCH_BUDGET_MS:
+                        self.logger.warning(f"{message}，超出 {THEME_SWITCH_BUDGET_MS} ms 预算")
+                    else:
+                        self.logger.info(message)
                 else:
                     self.logger.error(f"无法加载主题内容: {theme_name}")
             else:
@@ -1124,6 +1195,20 @@ class ThemeManager(QObject):
             import traceback
             self.logger.error(traceback.format_exc())
 
+    def _polish_registered_widgets(self) -> int:
+        """只重新 polish 通过 register_polish_widget() 登记的控件"""
+        polished = 0
+        for widget in list(_polish_widgets):
+            try:
+                widget.style().unpolish(widget)
+                widget.style().polish(widget)
+                widget.update()
+                polished += 1
+            except RuntimeError:
+                # 底层 C++ 对象已销毁
+                _polish_widgets.discard(widget)
+        return polished
+
     def get_available_themes(self) -> list:
         """获取可用主题列表"""
         return ["light", "dark"]
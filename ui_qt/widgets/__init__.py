@@ -3,18 +3,27 @@
 """
 自定义UI组件模块
 提供可复用的界面组件
+
+组件在首次访问时才导入，主窗口只为实际打开的标签页付出导入代价
 """
 
-from .config_widget import ConfigWidget
-from .generation_widget import GenerationWidget
-from .chapter_editor import ChapterEditor
-from .role_manager import RoleManager
-from .status_bar import StatusBar
+import importlib
+
+_EXPORTS = {
+    'ConfigWidget': '.config_widget',
+    'GenerationWidget': '.generation_widget',
+    'ChapterEditor': '.chapter_editor',
+    'RoleManager': '.role_manager',
+    'StatusBar': '.status_bar',
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    'ConfigWidget',
-    'GenerationWidget',
-    'ChapterEditor',
-    'RoleManager',
-    'StatusBar'
-]
\ No newline at end of file
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -5,16 +5,17 @@
 提供章节内容的查看、编辑、管理等功能的现代化界面
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, NamedTuple
 import os
+import logging
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QSplitter,
     QGroupBox, QLabel, QLineEdit, QTextEdit, QSpinBox,
     QPushButton, QComboBox, QFormLayout, QGridLayout,
-    QMessageBox, QCheckBox, QFrame, QTreeWidget, QTreeWidgetItem,
+    QMessageBox, QCheckBox, QFrame, QTreeView, QListView,
     QListWidget, QListWidgetItem, QTabWidget, QProgressBar, QMenu
 )
-from PySide6.QtCore import Signal, Qt, QTimer
+from PySide6.QtCore import Signal, Qt, QTimer, QModelIndex
 from PySide6.QtGui import QFont, QTextCursor, QAction, QTextDocument
 
 from ..utils.ui_helpers import (
@@ -22,15 +23,28 @@ from ..utils.ui_helpers import (
     show_error_dialog, create_label_with_help
 )
 from ..utils.theme_manager import ThemeManager
+from ..models.chapter_list_model import ChapterListModel
 from novel_generator.data_manager import DataManager
 
+logger = logging.getLogger(__name__)
+
+# 停止输入多久后精确重算统计（毫秒）
+STATS_RECOUNT_DELAY_MS = 400
+
+
+class ContentChange(NamedTuple):
+    """一次编辑的位置和长度（来自 QTextDocument.contentsChange）"""
+    position: int
+    removed: int
+    added: int
+
 
 class ChapterEditor(QWidget):
     """章节编辑器组件"""
 
     # 信号定义
     chapter_selected = Signal(int)
-    content_changed = Signal(int, str)
+    content_changed = Signal(int, object)  # (章节号, ContentChange)
     chapter_saved = Signal(int)
 
     def __init__(self, config: Dict[str, Any], theme_manager: ThemeManager = None, parent=None):
@@ -41,6 +55,11 @@ class ChapterEditor(QWidget):
         self.current_project_path = ""
         self.is_modified = False
         self.data_manager = None
+        self._status_style = None
+        self._word_count = 0
+        self._project_stats: Optional[Dict[str, Any]] = None  # 项目统计服务的最新快照
+        # 选择器、列表、树形视图共享同一个章节模型
+        self.chapter_model = ChapterListModel(self)
         self.setup_ui()
         self.setup_editor_actions()
         self.setup_context_menus()
@@ -144,6 +163,10 @@ class ChapterEditor(QWidget):
         selector_layout = QHBoxLayout()
         selector_layout.addWidget(QLabel("当前章节:"))
         self.chapter_selector = QComboBox()
+        self.chapter_selector.setModel(self.chapter_model)
+        # 不按全部条目计算宽度，避免为每个章节取数据
+        self.chapter_selector.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
+        self.chapter_selector.setMinimumContentsLength(12)
         self.chapter_selector.currentIndexChanged.connect(self.on_chapter_selected)
         selector_layout.addWidget(self.chapter_selector)
         nav_layout.addLayout(selector_layout)
@@ -184,13 +207,18 @@ class ChapterEditor(QWidget):
         list_layout.addLayout(view_layout)
 
         # 章节列表控件
-        self.chapter_list = QListWidget()
-        self.chapter_list.itemClicked.connect(self.on_list_item_clicked)
+        self.chapter_list = QListView()
+        self.chapter_list.setModel(self.chapter_model)
+        self.chapter_list.setUniformItemSizes(True)
+        self.chapter_list.clicked.connect(self.on_list_item_clicked)
         list_layout.addWidget(self.chapter_list)
 
-        self.chapter_tree = QTreeWidget()
+        self.chapter_tree = QTreeView()
+        self.chapter_tree.setModel(self.chapter_model)
         self.chapter_tree.setHeaderHidden(True)
-        self.chapter_tree.itemClicked.connect(self.on_tree_item_clicked)
+        self.chapter_tree.setRootIsDecorated(False)
+        self.chapter_tree.setUniformRowHeights(True)
+        self.chapter_tree.clicked.connect(self.on_tree_item_clicked)
         self.chapter_tree.hide()
         list_layout.addWidget(self.chapter_tree)
 
@@ -293,9 +321,15 @@ class ChapterEditor(QWidget):
         # 主编辑器
         self.chapter_editor = QTextEdit()
         self.chapter_editor.setPlaceholderText("在这里开始写作你的章节内容...\n\n提示: 可以使用工具栏中的格式化工具来美化文本。")
-        self.chapter_editor.textChanged.connect(self.on_content_changed)
+        # 按编辑增量更新统计，不在每次按键时读取全文
+        self.chapter_editor.document().contentsChange.connect(self.on_content_changed)
         layout.addWidget(self.chapter_editor)
 
+        self._stats_timer = QTimer(self)
+        self._stats_timer.setSingleShot(True)
+        self._stats_timer.setInterval(STATS_RECOUNT_DELAY_MS)
+        self._stats_timer.timeout.connect(self.update_statistics)
+
         self.editor_tabs.addTab(edit_widget, " 编辑")
 
     def create_preview_tab(self):
@@ -575,53 +609,82 @@ class ChapterEditor(QWidget):
 
     def on_chapter_selected(self, index: int):
         """章节选择变更处理"""
-        if index >= 0:
-            self.current_chapter = index + 1
+        chapter_number = self.chapter_model.chapter_at(index)
+        if chapter_number is not None:
+            self.current_chapter = chapter_number
             self.load_chapter(self.current_chapter)
             self.chapter_selected.emit(self.current_chapter)
+            # 列表、树形视图跟随选择器
+            model_index = self.chapter_model.index(index)
+            self.chapter_list.setCurrentIndex(model_index)
+            self.chapter_tree.setCurrentIndex(model_index)
 
-    def on_list_item_clicked(self, item: QListWidgetItem):
+    def on_list_item_clicked(self, index: QModelIndex):
         """列表项点击处理"""
-        index = self.chapter_list.row(item)
-        self.chapter_selector.setCurrentIndex(index)
+        self.chapter_selector.setCurrentIndex(index.row())
 
-    def on_tree_item_clicked(self, item: QTreeWidgetItem, column: int):
+    def on_tree_item_clicked(self, index: QModelIndex):
         """树形项点击处理"""
-        # 处理树形视图点击
-        pass
+        self.chapter_selector.setCurrentIndex(index.row())
 
-    def on_content_changed(self):
-        """内容变更处理"""
-        self.is_modified = True
-        self.update_word_count()
-        self.update_statistics()
-        self.status_label.setText(" 编辑中")
-        self.update_status_style("warning")
-        self.content_changed.emit(self.current_chapter, self.chapter_editor.toPlainText())
+    def _select_chapter(self, chapter_number: int):
+        """在选择器中选中指定章节"""
+        row = self.chapter_model.row_of(chapter_number)
+        if row >= 0:
+            self.chapter_selector.setCurrentIndex(row)
 
-    def update_word_count(self):
-        """更新字数统计"""
-        text = self.chapter_editor.toPlainText()
-        word_count = len(text.replace(" ", ""))  # 中文字数统计
+    def on_content_changed(self, position: int, removed: int, added: int):
+        """内容变更处理：只读取新插入的文本，精确统计在停止输入后重算"""
+        if not removed and not added:
+            return
+        if not self.is_modified:
+            self.is_modified = True
+            self.status_label.setText(" 编辑中")
+            self.update_status_style("warning")
+
+        # 删除的文本已不可取回，先按非空白字符估算，定时重算时校正
+        cursor = QTextCursor(self.chapter_editor.document())
+        cursor.setPosition(position)
+        cursor.setPosition(position + added, QTextCursor.KeepAnchor)
+        inserted = cursor.selectedText()
+        inserted_words = added - inserted.count(" ")
+        char_count = self.chapter_editor.document().characterCount() - 1
+        self._word_count = min(char_count, max(0, self._word_count + inserted_words - removed))
+        self._show_counts(self._word_count, char_count)
+
+        self._stats_timer.start()
+        self.content_changed.emit(self.current_chapter, ContentChange(position, removed, added))
+
+    def update_status_style(self, status: str):
+        """按状态（success / warning / default）设置编辑状态标签颜色"""
+        if status == self._status_style:
+            return
+        self._status_style = status
+        color_type = {"success": "success_text", "warning": "warning_text"}.get(status, "info_text")
+        self.status_label.setStyleSheet(f"color: {self.get_theme_color(color_type)};")
+
+    def _show_counts(self, word_count: int, char_count: int):
         self.word_count_label.setText(str(word_count))
         self.current_words_label.setText(str(word_count))
+        self.character_count_label.setText(str(char_count))
+        # 预估阅读时间（假设每分钟200字）
+        self.reading_time_label.setText(f"{max(1, char_count // 200)} 分钟")
+
+    def update_word_count(self):
+        """更新字数统计"""
+        self.update_statistics()
 
     def update_statistics(self):
-        """更新统计信息"""
+        """精确重算统计信息（全文只读取一次）"""
+        self._stats_timer.stop()
         text = self.chapter_editor.toPlainText()
-
-        # 字符数
-        char_count = len(text)
-        self.character_count_label.setText(str(char_count))
+        self._word_count = len(text) - text.count(" ")  # 中文字数统计
+        self._show_counts(self._word_count, len(text))
 
         # 段落数
-        paragraph_count = len([p for p in text.split('\n') if p.strip()])
+        paragraph_count = sum(1 for p in text.split('\n') if p.strip())
         self.paragraph_count_label.setText(str(paragraph_count))
 
-        # 预估阅读时间（假设每分钟200字）
-        reading_time = max(1, char_count // 200)
-        self.reading_time_label.setText(f"{reading_time} 分钟")
-
     def switch_view(self, view_type: str):
         """切换视图"""
         if view_type == "list":
@@ -635,8 +698,14 @@ class ChapterEditor(QWidget):
             self.list_view_btn.setChecked(False)
             self.tree_view_btn.setChecked(True)
 
-    def load_chapter(self, chapter_number: int):
-        """加载章节"""
+    def load_chapter(self, chapter_number: int, content: Optional[str] = None):
+        """
+        加载章节
+
+        Args:
+            chapter_number: 章节号
+            content: 已读取好的章节正文（None 表示从磁盘读取）
+        """
         if not self.data_manager:
             show_error_dialog(self, "错误", "请先创建或加载项目")
             return
@@ -647,7 +716,8 @@ class ChapterEditor(QWidget):
                 self.save_current_chapter()
 
             # 加载指定章节
-            content = self.data_manager.load_chapter(chapter_number)
+            if content is None:
+                content = self.data_manager.load_chapter(chapter_number)
 
             # 如果内容为空，创建一个基本结构
             if not content.strip():
@@ -774,7 +844,7 @@ class ChapterEditor(QWidget):
                 self.load_chapter(next_chapter_num)
 
                 # 更新选择器
-                self.chapter_selector.setCurrentIndex(next_chapter_num - 1)
+                self._select_chapter(next_chapter_num)
 
                 show_info_dialog(self, "成功", f"章节 '{chapter_title}' 已添加")
 
@@ -813,7 +883,7 @@ class ChapterEditor(QWidget):
                     next_chapter = min(remaining_chapters, key=lambda x: abs(x - self.current_chapter))
                     self.load_chapter(next_chapter)
                     # 更新选择器
-                    self.chapter_selector.setCurrentIndex(next_chapter - 1)
+                    self._select_chapter(next_chapter)
                 else:
                     # 如果没有章节了，清空编辑器
                     self.chapter_editor.clear()
@@ -866,12 +936,11 @@ class ChapterEditor(QWidget):
 
         layout.addLayout(button_layout)
 
-        # 加载章节列表
-        chapters = self.data_manager.list_chapters()
-        for i, chapter_num in enumerate(chapters):
-            # 尝试获取章节标题
-            content = self.data_manager.load_chapter(chapter_num)
-            title = self._extract_title_from_content(content) or f"第{chapter_num}章"
+        # 加载章节列表（标题取自章节模型，不读取全部正文）
+        chapter_list.setUniformItemSizes(True)
+        chapters = self.chapter_model.chapters()
+        for chapter_num in chapters:
+            title, _ = self.chapter_model.chapter_meta(chapter_num)
             item = QListWidgetItem(f"{title} (编号: {chapter_num})")
             item.setData(Qt.UserRole, chapter_num)  # 存储章节号
             chapter_list.addItem(item)
@@ -924,29 +993,30 @@ class ChapterEditor(QWidget):
                     show_error_dialog(self, "错误", f"调整章节顺序失败:\n{str(e)}")
 
     def _reorder_chapters_in_files(self, new_order: List[int]):
-        """重新编号章节文件"""
+        """重新编号章节文件：只改写编号发生变化的章节"""
         if not self.data_manager:
             return
 
-        # 获取所有章节内容
-        chapter_contents = {}
-        for chapter_num in new_order:
-            content = self.data_manager.load_chapter(chapter_num)
-            title = self._extract_title_from_content(content) or f"第{chapter_num}章"
-            chapter_contents[chapter_num] = (content, title)
-
-        # 删除所有现有章节
-        for chapter_num in new_order:
-            try:
-                self.data_manager.delete_chapter(chapter_num)
-            except:
-                pass  # 忽略删除失败
-
-        # 按新顺序重新保存
-        for i, chapter_num in enumerate(new_order, 1):
-            if chapter_num in chapter_contents:
-                content, title = chapter_contents[chapter_num]
-                self.data_manager.save_chapter(i, content, title)
+        # 新编号 -> 原编号，编号不变的章节不读不写
+        moves = {new_num: old_num for new_num, old_num in enumerate(new_order, 1) if new_num != old_num}
+        if not moves:
+            return
+        chapter_texts = self.data_manager.load_chapters(list(moves.values()))
+
+        # 项目配置只在全部改完后写入一次
+        with self.data_manager.batch_updates():
+            # 先按新编号写入，再删除不再使用的原编号
+            for new_num, old_num in moves.items():
+                content = chapter_texts.get(old_num, "")
+                title = self._extract_title_from_content(content) or f"第{new_num}章"
+                self.data_manager.save_chapter(new_num, content, title)
+                self.chapter_model.chapter_changed(new_num)
+
+            for old_num in set(moves.values()) - set(moves):
+                try:
+                    self.data_manager.delete_chapter(old_num)
+                except Exception as e:
+                    logger.warning(f"删除原第{old_num}章失败: {e}")
 
     def apply_format(self, format_type: str):
         """应用文本格式
@@ -1133,6 +1203,7 @@ class ChapterEditor(QWidget):
         """加载项目"""
         try:
             self.current_project_path = project_path
+            self._project_stats = None
             # 初始化数据管理器
             self.data_manager = DataManager(project_path)
 
@@ -1149,12 +1220,65 @@ class ChapterEditor(QWidget):
         except Exception as e:
             show_error_dialog(self, "错误", f"加载项目失败:\n{str(e)}")
 
-    def refresh_chapter_list(self):
-        """刷新章节列表"""
-        # 清空现有列表
-        self.chapter_selector.clear()
-        self.chapter_list.clear()
+    def apply_project(self, snapshot):
+        """
+        使用后台读取好的项目数据，不在主线程访问磁盘
+
+        Args:
+            snapshot: ProjectSnapshot（见 ui_qt.project_loader）
+        """
+        # 上一个项目未保存的修改先写回原项目
+        if self.is_modified and self.current_chapter > 0 and self.data_manager:
+            self.save_current_chapter()
+        self.current_chapter = 0
+        self.is_modified = False
+        self._project_stats = None
 
+        self.current_project_path = snapshot.project_path
+        self.data_manager = snapshot.data_manager
+
+        # 模型重置后选择器会自动选中第一行，屏蔽信号以免再次从磁盘读取首个章节
+        self.chapter_selector.blockSignals(True)
+        try:
+            self.chapter_model.set_data_manager(self.data_manager, snapshot.chapters, snapshot.config)
+            if snapshot.first_chapter is not None:
+                self._select_chapter(snapshot.first_chapter)
+        finally:
+            self.chapter_selector.blockSignals(False)
+        self._update_chapter_totals()
+
+        if snapshot.first_chapter is not None:
+            self.load_chapter(snapshot.first_chapter, snapshot.first_chapter_content)
+            model_index = self.chapter_model.index(self.chapter_model.row_of(snapshot.first_chapter))
+            self.chapter_list.setCurrentIndex(model_index)
+            self.chapter_tree.setCurrentIndex(model_index)
+
+    def _update_chapter_totals(self):
+        # 有项目统计服务的快照时使用它，否则按章节列表模型计算
+        stats = self._project_stats
+        if stats is not None:
+            chapter_count, word_count = stats.get("chapter_count", 0), stats.get("word_count", 0)
+        else:
+            chapter_count, word_count = self.chapter_model.rowCount(), self.chapter_model.total_words()
+        self.total_chapters_label.setText(str(chapter_count))
+        self.completed_chapters_label.setText(str(chapter_count))  # 假设所有显示的章节都已完成
+        self.total_words_label.setText(str(word_count))
+
+    def apply_project_stats(self, stats: Dict[str, Any]):
+        """
+        显示项目统计服务维护的统计（由主窗口在主线程中调用）
+
+        Args:
+            stats: ProjectStatsService.snapshot() 的结果
+        """
+        stats_path = stats.get("info", {}).get("project_path", "")
+        if not self.current_project_path or os.path.normpath(stats_path) != os.path.normpath(self.current_project_path):
+            return
+        self._project_stats = stats
+        self._update_chapter_totals()
+
+    def refresh_chapter_list(self):
+        """刷新章节列表（与上次的章节列表比较，增量更新）"""
         # 如果没有数据管理器，则只显示默认内容
         if not self.data_manager:
             self.total_chapters_label.setText("0")
@@ -1163,20 +1287,13 @@ class ChapterEditor(QWidget):
             return
 
         try:
-            # 从数据管理器获取章节列表
-            chapters = self.data_manager.list_chapters()
-
-            # 添加章节到列表
-            for chapter_num in chapters:
-                chapter_title = f"第{chapter_num}章"
-                self.chapter_selector.addItem(chapter_title)
-                item = QListWidgetItem(chapter_title)
-                self.chapter_list.addItem(item)
+            if self.chapter_model.data_manager is not self.data_manager:
+                self.chapter_model.set_data_manager(self.data_manager)
+            else:
+                self.chapter_model.refresh()
 
             # 更新统计信息
-            self.total_chapters_label.setText(str(len(chapters)))
-            self.completed_chapters_label.setText(str(len(chapters)))  # 假设所有显示的章节都已完成
-            self.total_words_label.setText(str(self.data_manager.load_project_config().get("word_count", 0)))
+            self._update_chapter_totals()
 
         except Exception as e:
             show_error_dialog(self, "错误", f"刷新章节列表失败:\n{str(e)}")
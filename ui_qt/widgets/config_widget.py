@@ -428,6 +428,16 @@ class ConfigWidget(QWidget):
         self.max_workers.setValue(4)
         perf_layout.addRow("最大工作线程:", self.max_workers)
 
+        self.blueprint_workers = QSpinBox()
+        self.blueprint_workers.setRange(1, 16)
+        self.blueprint_workers.setValue(1)
+        self.blueprint_workers.setToolTip(
+            "章节蓝图分块生成时同时生成的篇章数。\n"
+            "1：按顺序逐块生成（默认）；\n"
+            "大于1：先生成篇章大纲，再并行生成各篇章的蓝图"
+        )
+        perf_layout.addRow("蓝图并行篇章数:", self.blueprint_workers)
+
         self.request_timeout = QSpinBox()
         self.request_timeout.setRange(5, 300)
         self.request_timeout.setValue(30)
@@ -606,6 +616,7 @@ class ConfigWidget(QWidget):
 
         # 加载性能设置
         self.max_workers.setValue(int(self.config.get("max_workers", 4)))
+        self.blueprint_workers.setValue(int(self.config.get("blueprint_workers", 1)))
         self.request_timeout.setValue(int(self.config.get("request_timeout", 30)))
         self.retry_count.setValue(int(self.config.get("retry_count", 3)))
 
@@ -909,6 +920,7 @@ class ConfigWidget(QWidget):
             "log_level": self.log_level.currentText(),
             "log_file": self.log_file.text(),
             "max_workers": self.max_workers.value(),
+            "blueprint_workers": self.blueprint_workers.value(),
             "request_timeout": self.request_timeout.value(),
             "retry_count": self.retry_count.value(),
             "auto_save": self.auto_save.isChecked(),
@@ -986,6 +998,7 @@ class ConfigWidget(QWidget):
         self.log_level.currentTextChanged.connect(self.on_config_changed)
         self.log_file.textChanged.connect(self.on_config_changed)
         self.max_workers.valueChanged.connect(self.on_config_changed)
+        self.blueprint_workers.valueChanged.connect(self.on_config_changed)
         self.request_timeout.valueChanged.connect(self.on_config_changed)
         self.retry_count.valueChanged.connect(self.on_config_changed)
         self.auto_save.stateChanged.connect(self.on_config_changed)
@@ -5,7 +5,7 @@
 包含小说架构生成、章节蓝图、内容生成等核心功能
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QTabWidget,
@@ -21,21 +21,39 @@ from ..utils.ui_helpers import (
     show_error_dialog, create_label_with_help, validate_required
 )
 from ..utils.tooltip_manager import tooltip_manager
+from ..project_loader import run_in_background
 
 # 导入后端生成器
 import sys
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from novel_generator.architecture import Novel_architecture_generate
 from novel_generator.blueprint import Chapter_blueprint_generate
 from novel_generator.chapter import generate_chapter_draft
 from novel_generator.data_manager import DataManager
+from novel_generator.word_count_index import WordCountIndex
+from novel_generator.chapter_repository import get_chapter_repository
+from novel_generator.sqlite_store import get_project_store, uses_sqlite_store
+from novel_generator.common import CancellationToken, OperationCancelled
+from novel_generator.exporter import (
+    EXPORT_FORMATS, FORMAT_TXT, FORMAT_MARKDOWN, FORMAT_EPUB, FORMAT_ZIP, export_chapters
+)
+from novel_generator.character_state_store import CharacterStateStore
 from llm_adapters import create_llm_adapter
 from project_manager import ProjectManager
 
 logger = logging.getLogger(__name__)
 
+# 导出格式下拉框选项 (显示名称, 格式)
+EXPORT_FORMAT_CHOICES = [
+    ("TXT", FORMAT_TXT),
+    ("Markdown", FORMAT_MARKDOWN),
+    ("EPUB", FORMAT_EPUB),
+    ("ZIP（每章一个文件）", FORMAT_ZIP),
+]
+
 
 class ArchitectureGenerationWorker(QThread):
     """架构生成工作线程"""
@@ -58,7 +76,7 @@ class ArchitectureGenerationWorker(QThread):
         self.config = config
         self.novel_settings = novel_settings
         self.save_path = save_path
-        self._is_running = True
+        self.cancel_token = CancellationToken()
 
     def run(self):
         """在线程中执行架构生成"""
@@ -95,7 +113,8 @@ class ArchitectureGenerationWorker(QThread):
                 user_guidance=self.novel_settings.get('worldview', ''),
                 temperature=temperature,
                 max_tokens=max_tokens,
-                timeout=timeout
+                timeout=timeout,
+                cancel_token=self.cancel_token
             )
 
             self.progress.emit(90, "正在保存结果...")
@@ -110,15 +129,16 @@ class ArchitectureGenerationWorker(QThread):
             else:
                 raise FileNotFoundError("生成的文件未找到")
 
+        except OperationCancelled:
+            self.error.emit("生成已取消")
         except Exception as e:
             error_msg = f"生成失败: {str(e)}"
             logger.error(error_msg, exc_info=True)
             self.error.emit(error_msg)
 
     def stop(self):
-        """停止线程"""
-        self._is_running = False
-        self.terminate()
+        """请求停止生成：进行中的LLM请求立即中断，已保存的检查点保留"""
+        self.cancel_token.cancel()
 
 
 class BlueprintGenerationWorker(QThread):
@@ -144,7 +164,7 @@ class BlueprintGenerationWorker(QThread):
         self.save_path = save_path
         self.number_of_chapters = number_of_chapters
         self.user_guidance = user_guidance
-        self._is_running = True
+        self.cancel_token = CancellationToken()
 
     def run(self):
         """在线程中执行章节蓝图生成"""
@@ -178,7 +198,9 @@ class BlueprintGenerationWorker(QThread):
                 user_guidance=self.user_guidance,
                 temperature=temperature,
                 max_tokens=max_tokens,
-                timeout=timeout
+                timeout=timeout,
+                max_workers=int(self.config.get("blueprint_workers", 1)),
+                cancel_token=self.cancel_token
             )
 
             self.progress.emit(90, "正在读取生成结果...")
@@ -193,15 +215,16 @@ class BlueprintGenerationWorker(QThread):
             else:
                 raise FileNotFoundError("生成的文件未找到")
 
+        except OperationCancelled:
+            self.error.emit("生成已取消")
         except Exception as e:
             error_msg = f"生成失败: {str(e)}"
             logger.error(error_msg, exc_info=True)
             self.error.emit(error_msg)
 
     def stop(self):
-        """停止线程"""
-        self._is_running = False
-        self.terminate()
+        """请求停止生成：进行中的LLM请求立即中断，已保存的检查点保留"""
+        self.cancel_token.cancel()
 
 
 class ChapterGenerationWorker(QThread):
@@ -229,7 +252,7 @@ class ChapterGenerationWorker(QThread):
         self.chapter_num = chapter_num
         self.word_count = word_count
         self.user_guidance = user_guidance
-        self._is_running = True
+        self.cancel_token = CancellationToken()
 
     def run(self):
         """在线程中执行章节内容生成"""
@@ -284,34 +307,42 @@ class ChapterGenerationWorker(QThread):
                 embedding_retrieval_k=embedding_retrieval_k,
                 interface_format=interface_format,
                 max_tokens=max_tokens,
-                timeout=timeout
+                timeout=timeout,
+                cancel_token=self.cancel_token
             )
 
             self.progress.emit(90, "正在保存结果...")
 
             # 读取生成的文件
-            chapter_file = os.path.join(self.save_path, "chapters", f"chapter_{self.chapter_num}.txt")
-            if os.path.exists(chapter_file):
-                with open(chapter_file, 'r', encoding='utf-8') as f:
-                    result = f.read()
+            chapters = get_chapter_repository(self.save_path)
+            if chapters.exists(self.chapter_num):
+                result = chapters.read(self.chapter_num)
                 self.completed.emit(result)
                 self.progress.emit(100, f"第{self.chapter_num}章生成完成！")
             else:
                 raise FileNotFoundError("生成的文件未找到")
 
+        except OperationCancelled:
+            self.error.emit("生成已取消")
         except Exception as e:
             error_msg = f"生成失败: {str(e)}"
             logger.error(error_msg, exc_info=True)
             self.error.emit(error_msg)
 
     def stop(self):
-        """停止线程"""
-        self._is_running = False
-        self.terminate()
+        """请求停止生成：进行中的LLM请求立即中断，已保存的检查点保留"""
+        self.cancel_token.cancel()
 
 
 class BatchChapterGenerationWorker(QThread):
-    """批量章节生成工作线程"""
+    """
+    批量章节生成工作线程
+
+    concurrency 为 1 时逐章生成，每章以前一章草稿为前文；
+    大于 1 时并发起草，各章只以蓝图和本批次之前的已定稿章节为上下文。
+    finalize 为 True 时按章节顺序逐章定稿（更新摘要、角色状态和向量库），两种模式相同：
+    逐章模式下每章起草后立即定稿，并发模式下全部起草后再定稿；定稿遇到缺失的草稿或失败即停止。
+    """
 
     # 信号定义
     progress = Signal(int, str)  # 进度更新
@@ -320,7 +351,11 @@ class BatchChapterGenerationWorker(QThread):
     completed = Signal()  # 所有章节完成
     error = Signal(str)  # 总体错误
 
-    def __init__(self, config: Dict[str, Any], save_path: str, start_chapter: int, end_chapter: int, word_count: int):
+    # 并发模式下起草阶段占总进度的比例
+    DRAFT_PROGRESS_SHARE = 70
+
+    def __init__(self, config: Dict[str, Any], save_path: str, start_chapter: int, end_chapter: int, word_count: int,
+                 concurrency: int = 1, finalize: bool = False):
         """
         初始化批量生成工作线程
 
@@ -330,6 +365,8 @@ class BatchChapterGenerationWorker(QThread):
             start_chapter: 起始章节
             end_chapter: 结束章节
             word_count: 目标字数
+            concurrency: 同时起草的章节数（受服务商速率限制约束）
+            finalize: 是否在起草后按顺序定稿
         """
         super().__init__()
         self.config = config
@@ -337,13 +374,14 @@ class BatchChapterGenerationWorker(QThread):
         self.start_chapter = start_chapter
         self.end_chapter = end_chapter
         self.word_count = word_count
-        self._is_running = True
+        self.concurrency = max(1, int(concurrency))
+        self.finalize = finalize
+        self.cancel_token = CancellationToken()
 
     def run(self):
         """在线程中执行批量章节生成"""
         try:
             total_chapters = self.end_chapter - self.start_chapter + 1
-            completed_chapters = 0
 
             # 检查是否配置了LLM
             llm_configs = self.config.get("llm_configs", {})
@@ -362,93 +400,237 @@ class BatchChapterGenerationWorker(QThread):
             if not selected_config.get('api_key'):
                 raise ValueError(f"配置 '{selected_config_name}' 缺少API密钥，请检查配置管理")
 
-            # 获取LLM参数
-            interface_format = selected_config.get('interface_format', 'OpenAI')
-            api_key = selected_config.get('api_key', '')
-            base_url = selected_config.get('base_url', '')
-            model = selected_config.get('model_name', 'gpt-3.5-turbo')
-            temperature = selected_config.get('temperature', 0.7)
-            max_tokens = selected_config.get('max_tokens', 2048)
-            timeout = selected_config.get('timeout', 600)
-
             # 获取嵌入配置
             embedding_configs = self.config.get("embedding_configs", {})
             selected_embedding_name = list(embedding_configs.keys())[0] if embedding_configs else "OpenAI"
             embedding_config = embedding_configs.get(selected_embedding_name, {})
 
-            embedding_api_key = embedding_config.get('api_key', '')
-            embedding_base_url = embedding_config.get('base_url', '')
-            embedding_interface_format = embedding_config.get('interface_format', 'openai')
-            embedding_model = embedding_config.get('model_name', 'text-embedding-ada-002')
-            embedding_retrieval_k = embedding_config.get('retrieval_k', 2)
+            # 起草与定稿共用的LLM和嵌入参数
+            llm_params = {
+                "interface_format": selected_config.get('interface_format', 'OpenAI'),
+                "api_key": selected_config.get('api_key', ''),
+                "base_url": selected_config.get('base_url', ''),
+                "model_name": selected_config.get('model_name', 'gpt-3.5-turbo'),
+                "temperature": selected_config.get('temperature', 0.7),
+                "max_tokens": selected_config.get('max_tokens', 2048),
+                "timeout": selected_config.get('timeout', 600),
+                "embedding_api_key": embedding_config.get('api_key', ''),
+                "embedding_url": embedding_config.get('base_url', ''),
+                "embedding_interface_format": embedding_config.get('interface_format', 'openai'),
+                "embedding_model_name": embedding_config.get('model_name', 'text-embedding-ada-002'),
+                "filepath": self.save_path,
+                "word_number": self.word_count,
+                "cancel_token": self.cancel_token,
+            }
+            draft_params = dict(
+                llm_params,
+                user_guidance="",
+                characters_involved="",
+                key_items="",
+                scene_location="",
+                time_constraint="",
+                embedding_retrieval_k=embedding_config.get('retrieval_k', 2),
+            )
 
-            # 逐个生成章节
-            for chapter_num in range(self.start_chapter, self.end_chapter + 1):
-                if not self._is_running:
-                    self.error.emit("用户取消了批量生成")
-                    return
+            if self.concurrency > 1:
+                drafted = self._draft_concurrently(draft_params, total_chapters)
+                finalized = self._finalize_in_order(llm_params, drafted, total_chapters) if self.finalize else 0
+            else:
+                drafted, finalized = self._draft_serially(draft_params, llm_params, total_chapters)
+            if self.finalize:
+                message = f"批量生成完成！起草{len(drafted)}章，定稿{finalized}章（共{total_chapters}章）"
+            else:
+                message = f"批量生成完成！起草{len(drafted)}章（共{total_chapters}章，未定稿）"
+            self.progress.emit(100, message)
+            self.completed.emit()
+
+        except OperationCancelled:
+            self.error.emit("用户取消了生成")
+        except Exception as e:
+            error_msg = f"批量生成失败: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            self.error.emit(error_msg)
 
-                self.progress.emit(
-                    int((completed_chapters / total_chapters) * 100),
-                    f"正在生成第{chapter_num}章... ({completed_chapters}/{total_chapters})"
-                )
+    def _draft_serially(self, draft_params: Dict[str, Any], llm_params: Dict[str, Any],
+                        total_chapters: int) -> Tuple[List[int], int]:
+        """
+        逐章生成，每章以前一章草稿为前文；finalize 时每章起草后立即定稿
 
-                try:
-                    from novel_generator.chapter import generate_chapter_draft
-
-                    # 调用章节生成器
-                    generate_chapter_draft(
-                        api_key=api_key,
-                        base_url=base_url,
-                        model_name=model,
-                        filepath=self.save_path,
-                        novel_number=chapter_num,
-                        word_number=self.word_count,
-                        temperature=temperature,
-                        user_guidance="",
-                        characters_involved="",
-                        key_items="",
-                        scene_location="",
-                        time_constraint="",
-                        embedding_api_key=embedding_api_key,
-                        embedding_url=embedding_base_url,
-                        embedding_interface_format=embedding_interface_format,
-                        embedding_model_name=embedding_model,
-                        embedding_retrieval_k=embedding_retrieval_k,
-                        interface_format=interface_format,
-                        max_tokens=max_tokens,
-                        timeout=timeout
+        Returns:
+            (起草成功的章节号, 定稿的章节数)
+        """
+        drafted = []
+        finalized = 0
+        finalizing = self.finalize
+        for chapter_num in range(self.start_chapter, self.end_chapter + 1):
+            self.cancel_token.raise_if_cancelled()
+
+            self.progress.emit(
+                int((len(drafted) / total_chapters) * 100),
+                f"正在生成第{chapter_num}章... ({len(drafted)}/{total_chapters})"
+            )
+
+            try:
+                # 调用章节生成器
+                result = generate_chapter_draft(novel_number=chapter_num, **draft_params)
+            except OperationCancelled:
+                raise
+            except Exception as e:
+                error_msg = f"第{chapter_num}章生成失败: {str(e)}"
+                logger.error(error_msg, exc_info=True)
+                self.chapter_error.emit(chapter_num, error_msg)
+                if finalizing:
+                    logger.warning(f"第{chapter_num}章没有草稿，其后的章节保留为草稿，未定稿")
+                    finalizing = False
+                continue
+            drafted.append(chapter_num)
+            self.chapter_completed.emit(chapter_num, result)
+
+            if finalizing:
+                finalizing = self._finalize_chapter(llm_params, chapter_num)
+                if finalizing:
+                    finalized += 1
+        return drafted, finalized
+
+    def _draft_concurrently(self, draft_params: Dict[str, Any], total_chapters: int) -> List[int]:
+        """
+        最多 concurrency 章同时起草，前文上下文限定为本批次之前的已定稿章节
+
+        Returns:
+            起草成功的章节号（升序）
+        """
+        drafted = []
+        self.progress.emit(0, f"正在并发起草{total_chapters}章（同时{self.concurrency}章）...")
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch-draft") as executor:
+            futures = {
+                executor.submit(
+                    generate_chapter_draft, novel_number=chapter_num,
+                    context_limit=self.start_chapter, **draft_params
+                ): chapter_num
+                for chapter_num in range(self.start_chapter, self.end_chapter + 1)
+            }
+            try:
+                for future in as_completed(futures):
+                    chapter_num = futures[future]
+                    try:
+                        result = future.result()
+                    except OperationCancelled:
+                        raise
+                    except Exception as e:
+                        error_msg = f"第{chapter_num}章起草失败: {str(e)}"
+                        logger.error(error_msg, exc_info=True)
+                        self.chapter_error.emit(chapter_num, error_msg)
+                        continue
+                    drafted.append(chapter_num)
+                    self.chapter_completed.emit(chapter_num, result)
+                    self.progress.emit(
+                        int(len(drafted) * self.DRAFT_PROGRESS_SHARE / total_chapters),
+                        f"第{chapter_num}章起草完成 ({len(drafted)}/{total_chapters})"
                     )
+            except OperationCancelled:
+                # 尚未开始的章节不再启动，进行中的请求已随令牌中断
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+        return sorted(drafted)
 
-                    # 读取生成的文件
-                    chapter_file = os.path.join(self.save_path, "chapters", f"chapter_{chapter_num}.txt")
-                    if os.path.exists(chapter_file):
-                        with open(chapter_file, 'r', encoding='utf-8') as f:
-                            result = f.read()
-                        self.chapter_completed.emit(chapter_num, result)
-                    else:
-                        raise FileNotFoundError(f"第{chapter_num}章生成文件未找到")
+    def _finalize_in_order(self, llm_params: Dict[str, Any], drafted: List[int], total_chapters: int) -> int:
+        """
+        按章节顺序逐章定稿，只定稿从起始章开始连续起草成功的部分
 
-                    completed_chapters += 1
+        Returns:
+            定稿的章节数
+        """
+        finalized = 0
+        drafted_set = set(drafted)
+        for chapter_num in range(self.start_chapter, self.end_chapter + 1):
+            self.cancel_token.raise_if_cancelled()
+            if chapter_num not in drafted_set:
+                logger.warning(f"第{chapter_num}章没有草稿，其后的章节保留为草稿，未定稿")
+                break
 
-                except Exception as e:
-                    error_msg = f"第{chapter_num}章生成失败: {str(e)}"
-                    logger.error(error_msg, exc_info=True)
-                    self.chapter_error.emit(chapter_num, error_msg)
+            self.progress.emit(
+                self.DRAFT_PROGRESS_SHARE + int(finalized * (100 - self.DRAFT_PROGRESS_SHARE) / total_chapters),
+                f"正在定稿第{chapter_num}章... ({finalized}/{total_chapters})"
+            )
+            if not self._finalize_chapter(llm_params, chapter_num):
+                break
+            finalized += 1
+        return finalized
 
-            # 所有章节完成
-            self.progress.emit(100, f"批量生成完成！共生成{total_chapters}章")
-            self.completed.emit()
+    def _finalize_chapter(self, llm_params: Dict[str, Any], chapter_num: int) -> bool:
+        """定稿一章（更新摘要、角色状态和向量库），返回是否成功"""
+        from novel_generator.finalization import finalize_chapter
 
+        try:
+            finalize_chapter(novel_number=chapter_num, **llm_params)
+        except OperationCancelled:
+            raise
         except Exception as e:
-            error_msg = f"批量生成失败: {str(e)}"
+            error_msg = f"第{chapter_num}章定稿失败: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            self.chapter_error.emit(chapter_num, error_msg)
+            return False
+        return True
+
+    def stop(self):
+        """请求停止批量生成：进行中的请求立即中断，已完成的章节保留，未完成的章节不写入"""
+        self.cancel_token.cancel()
+
+
+class NovelExportWorker(QThread):
+    """小说导出工作线程，逐章流式写入导出文件"""
+
+    # 信号定义
+    progress = Signal(int, str)  # 进度更新
+    completed = Signal(str)  # 完成信号，传递输出路径
+    error = Signal(str)  # 错误信号
+
+    def __init__(self, save_path: str, output_path: str, export_format: str, book_title: str = ""):
+        """
+        初始化导出线程
+
+        Args:
+            save_path: 项目路径
+            output_path: 输出文件路径
+            export_format: 导出格式（txt / markdown / zip / epub）
+            book_title: 书名
+        """
+        super().__init__()
+        self.save_path = save_path
+        self.output_path = output_path
+        self.export_format = export_format
+        self.book_title = book_title
+        self.cancel_token = CancellationToken()
+
+    def run(self):
+        """在线程中执行导出"""
+        try:
+            repository = get_chapter_repository(self.save_path)
+            chapters = repository.list_chapters()
+            if not chapters:
+                raise FileNotFoundError("项目中没有可导出的章节")
+
+            def on_progress(done: int, total: int, message: str):
+                self.progress.emit(int(done * 100 / max(total, 1)), message)
+
+            export_chapters(
+                ((n, repository.read(n)) for n in chapters),
+                self.output_path, self.export_format,
+                book_title=self.book_title, total=len(chapters),
+                progress_callback=on_progress, cancel_token=self.cancel_token
+            )
+            self.completed.emit(self.output_path)
+
+        except OperationCancelled:
+            self.error.emit("导出已取消")
+        except Exception as e:
+            error_msg = f"导出失败: {str(e)}"
             logger.error(error_msg, exc_info=True)
             self.error.emit(error_msg)
 
     def stop(self):
-        """停止线程"""
-        self._is_running = False
-        self.terminate()
+        """请求停止导出，当前章节写完后退出"""
+        self.cancel_token.cancel()
 
 
 class GenerationWidget(QWidget):
@@ -847,6 +1029,27 @@ class GenerationWidget(QWidget):
         self.consistency_check.setChecked(True)
         params_layout.addRow("", self.consistency_check)
 
+        self.batch_concurrency = QSpinBox()
+        self.batch_concurrency.setRange(1, 16)
+        self.batch_concurrency.setValue(1)
+        self.batch_concurrency.setToolTip(
+            "批量生成时同时起草的章节数。\n"
+            "1：逐章生成，每章参考前一章草稿；\n"
+            "大于1：各章只参考蓝图和已定稿章节并发起草。\n"
+            "是否定稿由“批量生成后定稿”决定，与并发数无关。\n"
+            "请按服务商的速率限制设置"
+        )
+        params_layout.addRow("并发起草:", self.batch_concurrency)
+
+        self.batch_finalize = QCheckBox("批量生成后定稿")
+        self.batch_finalize.setChecked(False)
+        self.batch_finalize.setToolTip(
+            "按章节顺序定稿每章（更新前文摘要、角色状态和向量库）。\n"
+            "逐章模式下每章起草后立即定稿，并发模式下全部起草后再定稿；\n"
+            "不勾选时只生成草稿，不修改项目状态"
+        )
+        params_layout.addRow("", self.batch_finalize)
+
         layout.addWidget(params_group)
 
         # 生成控制
@@ -928,7 +1131,8 @@ class GenerationWidget(QWidget):
         export_layout = QFormLayout(export_group)
 
         self.export_format = QComboBox()
-        self.export_format.addItems(["Word文档", "PDF", "TXT", "Markdown"])
+        for label, export_format in EXPORT_FORMAT_CHOICES:
+            self.export_format.addItem(label, export_format)
         export_layout.addRow("导出格式:", self.export_format)
 
         self.export_data_btn = QPushButton(" 导出小说")
@@ -1054,71 +1258,20 @@ class GenerationWidget(QWidget):
             self.progress_label.setText(message)
         self.progress_updated.emit(value, message)
 
-    def _parse_character_state(self, content: str) -> List[tuple]:
-        """从角色状态文本中解析角色名和简要描述"""
-        import re
-
-        characters = []
-        current_name = None
-        buffer: List[str] = []
-
-        for raw_line in content.splitlines():
-            line = raw_line.strip()
-            if not line:
-                continue
-
-            # “新出场角色”后面的内容通常不是核心角色
-            if line.startswith("新出场角色"):
-                break
-
-            name_match = re.match(r"^([^：:├│└\s][^：:]*)[：:]\s*$", line)
-            if name_match:
-                candidate = name_match.group(1).strip()
-                # 跳过通用标题
-                if candidate and candidate not in ("角色名", "角色名称", "角色"):
-                    if current_name:
-                        characters.append((current_name, "\n".join(buffer).strip()))
-                    current_name = candidate
-                    buffer = []
-                continue
-
-            # 如果没有匹配到角色名但有内容，且当前有角色名，则添加到缓冲区
-            if current_name and line:
-                cleaned_line = re.sub(r'^[├│└─\s]+', '', line)  # 移除树形结构字符
-                buffer.append(cleaned_line)
-
-        if current_name:
-            characters.append((current_name, "\n".join(buffer).strip()))
-
-        # 去重，保持顺序
-        unique = []
-        seen = set()
-        for name, desc in characters:
-            if name in seen:
-                continue
-            seen.add(name)
-            unique.append((name, desc))
-        return unique
-
     def _sync_roles_from_character_state(self, project_path: str) -> int:
         """将角色状态文件中的角色同步到角色管理的数据源"""
         if not project_path:
             return 0
 
-        state_file = os.path.join(project_path, "character_state.txt")
-        if not os.path.exists(state_file):
-            return 0
-
         try:
-            with open(state_file, "r", encoding="utf-8") as f:
-                content = f.read()
+            state_store = CharacterStateStore.load(project_path)
         except Exception as e:
-            logger.warning(f"读取角色状态文件失败: {e}")
+            logger.warning(f"读取角色状态失败: {e}")
             return 0
 
-        characters = self._parse_character_state(content)
+        characters = [(name, state_store.describe(name)) for name in state_store.names()]
         if not characters:
-            logger.info("角色状态文件中未解析到角色信息")
+            logger.info("角色状态中没有角色信息")
             return 0
 
         try:
@@ -1617,7 +1770,9 @@ class GenerationWidget(QWidget):
             save_path=save_path,
             start_chapter=start_chapter,
             end_chapter=end_chapter,
-            word_count=word_count
+            word_count=word_count,
+            concurrency=self.batch_concurrency.value(),
+            finalize=self.batch_finalize.isChecked()
         )
 
         # 连接信号
@@ -1634,6 +1789,12 @@ class GenerationWidget(QWidget):
         self.generate_single_btn.setEnabled(False)
         self.cancel_batch_btn.setEnabled(True)
         self.log_message(f"开始批量生成第{start_chapter}章到第{end_chapter}章...")
+        if self.batch_worker.concurrency > 1:
+            self.log_message(f"并发起草模式：同时起草{self.batch_worker.concurrency}章")
+        if self.batch_worker.finalize:
+            self.log_message("将按章节顺序定稿（更新摘要、角色状态和向量库）")
+        else:
+            self.log_message("只生成草稿，不定稿（摘要、角色状态和向量库保持不变）")
         self.update_progress(0, "准备批量生成...")
 
         # 启动线程
@@ -1652,11 +1813,10 @@ class GenerationWidget(QWidget):
             )
 
             if reply == QMessageBox.StandardButton.Yes:
-                self.log_message("用户取消了批量生成")
+                self.log_message("正在取消批量生成...")
+                self.cancel_batch_btn.setEnabled(False)
+                # 协作式取消：线程中断进行中的请求后通过 error 信号结束（on_batch_error）
                 self.batch_worker.stop()
-                # 等待线程结束
-                self.batch_worker.wait(3000)  # 等待3秒
-                self.on_batch_error("用户取消了生成")
 
     def update_batch_progress(self, value: int, message: str):
         """更新批量生成进度"""
@@ -1725,9 +1885,48 @@ class GenerationWidget(QWidget):
         # 实现内容优化逻辑
 
     def export_novel(self):
-        """导出小说"""
-        self.log_message("导出小说中...")
-        # 实现小说导出逻辑
+        """导出小说（后台线程逐章写入）"""
+        from PySide6.QtWidgets import QFileDialog
+
+        if hasattr(self, 'export_worker') and self.export_worker.isRunning():
+            show_error_dialog(self, "错误", "正在导出中，请等待完成")
+            return
+
+        save_path = self.save_path.text().strip()
+        if not save_path:
+            show_error_dialog(self, "验证失败", "请先打开或创建项目")
+            return
+
+        export_format = self.export_format.currentData()
+        book_title = self.novel_title.text().strip() or os.path.basename(save_path)
+        output_path, _ = QFileDialog.getSaveFileName(
+            self, "导出小说",
+            os.path.join(save_path, f"{book_title}{EXPORT_FORMATS[export_format]}"),
+            f"{self.export_format.currentText()} (*{EXPORT_FORMATS[export_format]})"
+        )
+        if not output_path:
+            return
+
+        self.export_worker = NovelExportWorker(save_path, output_path, export_format, book_title)
+        self.export_worker.progress.connect(self.update_progress)
+        self.export_worker.completed.connect(self.on_export_completed)
+        self.export_worker.error.connect(self.on_export_error)
+        self.export_data_btn.setEnabled(False)
+        self.log_message(f"导出小说中: {output_path}")
+        self.export_worker.start()
+
+    def on_export_completed(self, output_path: str):
+        """导出完成"""
+        self.export_data_btn.setEnabled(True)
+        self.update_progress(100, "导出完成")
+        self.log_message(f"小说已导出: {output_path}")
+        show_info_dialog(self, "成功", f"小说已导出到:\n{output_path}")
+
+    def on_export_error(self, error_msg: str):
+        """导出失败"""
+        self.export_data_btn.setEnabled(True)
+        self.log_message(error_msg)
+        show_error_dialog(self, "导出失败", error_msg)
 
     def clear_log(self):
         """清空日志"""
@@ -1802,17 +2001,29 @@ class GenerationWidget(QWidget):
         if not project_path:
             return
 
-        # 验证是否为有效项目
+        # 验证和读取项目配置在后台进行，完成后回到主线程更新界面
+        self.log_message(f"正在加载项目: {project_path}")
+        run_in_background(
+            self._read_project, project_path,
+            on_finished=lambda project_data: self._on_project_opened(project_path, project_data),
+            on_failed=lambda message: show_error_dialog(self, "错误", f"项目加载失败！\n{message}"),
+        )
+
+    def _read_project(self, project_path: str) -> Optional[Dict[str, Any]]:
+        """读取项目配置（在工作线程中执行，不访问界面，也不修改 project_manager 的状态）"""
         if not self.project_manager.is_valid_project(project_path):
-            show_error_dialog(self, "错误", "所选文件夹不是有效的项目！")
-            return
+            raise ValueError("所选文件夹不是有效的项目！")
+        return self.project_manager.read_project_data(project_path)
 
-        # 加载项目
-        project_data = self.project_manager.load_project(project_path)
+    def _on_project_opened(self, project_path: str, project_data: Optional[Dict[str, Any]]):
+        """项目配置读取完成"""
         if project_data is None:
             show_error_dialog(self, "错误", "项目加载失败！")
             return
 
+        # 在主线程中切换当前项目
+        self.project_manager.attach_project(project_path, project_data)
+
         # 恢复UI设置
         self._restore_ui_from_project_data(project_data)
 
@@ -1837,6 +2048,7 @@ class GenerationWidget(QWidget):
 
     def _collect_ui_data(self) -> Dict[str, Any]:
         """收集当前UI数据为项目数据"""
+        generated_chapters = self._get_generated_chapters()
         return {
             "project_info": {
                 "name": self.novel_title.text().strip() or "未命名项目",
@@ -1858,9 +2070,9 @@ class GenerationWidget(QWidget):
             "generation_status": {
                 "architecture_generated": os.path.exists(os.path.join(self.save_path.text(), "Novel_architecture.txt")),
                 "blueprint_generated": os.path.exists(os.path.join(self.save_path.text(), "Novel_directory.txt")),
-                "generated_chapters": self._get_generated_chapters(),
+                "generated_chapters": generated_chapters,
                 "total_words": self._calculate_total_words(),
-                "last_chapter": max(self._get_generated_chapters()) if self._get_generated_chapters() else 0
+                "last_chapter": max(generated_chapters) if generated_chapters else 0
             },
             "files": {
                 "architecture_file": "Novel_architecture.txt",
@@ -1910,18 +2122,8 @@ class GenerationWidget(QWidget):
         if not project_path:
             return chapters
 
-        chapters_dir = os.path.join(project_path, "chapters")
-        if not os.path.exists(chapters_dir):
-            return chapters
-
         try:
-            for filename in os.listdir(chapters_dir):
-                if filename.startswith("chapter_") and filename.endswith(".txt"):
-                    # 提取章节号
-                    chapter_num = filename.replace("chapter_", "").replace(".txt", "")
-                    if chapter_num.isdigit():
-                        chapters.append(int(chapter_num))
-            chapters.sort()
+            chapters = get_chapter_repository(project_path).list_chapters()
         except Exception as e:
             logger.error(f"获取已生成章节列表失败: {str(e)}")
 
@@ -1933,21 +2135,19 @@ class GenerationWidget(QWidget):
         if not project_path:
             return 0
 
+        if uses_sqlite_store(project_path):
+            return get_project_store(project_path).total_words()
+
         chapters_dir = os.path.join(project_path, "chapters")
         if not os.path.exists(chapters_dir):
             return 0
 
-        total_words = 0
         try:
-            for filename in os.listdir(chapters_dir):
-                if filename.startswith("chapter_") and filename.endswith(".txt"):
-                    chapter_path = os.path.join(chapters_dir, filename)
-                    content = read_file(chapter_path)
-                    total_words += len(content)
+            # 按 mtime 校验的字数索引，只重新读取有变化的章节
+            return WordCountIndex(chapters_dir).total(".txt", len)
         except Exception as e:
             logger.error(f"计算总字数失败: {str(e)}")
-
-        return total_words
+            return 0
 
     def _check_file_exists(self, filename: str) -> bool:
         """检查项目目录中是否存在指定文件"""
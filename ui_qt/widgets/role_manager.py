@@ -14,9 +14,9 @@ from PySide6.QtWidgets import (
     QPushButton, QComboBox, QFormLayout, QGridLayout,
     QMessageBox, QCheckBox, QFrame, QTreeWidget, QTreeWidgetItem,
     QListWidget, QListWidgetItem, QTabWidget, QProgressBar, QProgressDialog,
-    QScrollArea, QSizePolicy, QDialog, QInputDialog
+    QScrollArea, QSizePolicy, QDialog, QInputDialog, QListView
 )
-from PySide6.QtCore import Signal, Qt, QTimer
+from PySide6.QtCore import Signal, Qt, QTimer, QModelIndex
 from PySide6.QtGui import QFont, QPixmap, QIcon
 
 from ..utils.ui_helpers import (
@@ -24,11 +24,16 @@ from ..utils.ui_helpers import (
     show_error_dialog, create_label_with_help, validate_required
 )
 from ..utils.tooltip_manager import tooltip_manager
+from ..models.role_list_model import RoleListModel, RoleFilterProxyModel
 from novel_generator.data_manager import DataManager
+from storage import atomic_write_json
 
 # 设置日志记录器
 logger = logging.getLogger(__name__)
 
+# 搜索框停止输入多久后再过滤（毫秒）
+FILTER_DEBOUNCE_MS = 150
+
 
 class RoleManager(QWidget):
     """角色管理组件"""
@@ -47,7 +52,10 @@ class RoleManager(QWidget):
         self.current_project_path = ""
         self.pending_role_data = None  # 存储待处理的角色数据
         self.pending_role_data_lock = threading.Lock()  # 线程安全锁
-        self.all_roles = {}  # 存储所有角色的数据 {name: {data}}
+        self.all_roles = {}  # 存储所有角色的数据 {name: {data}}，由 role_model 维护
+        self.role_model = RoleListModel(self.all_roles, self)
+        self.role_proxy = RoleFilterProxyModel(self)
+        self.role_proxy.setSourceModel(self.role_model)
         self.current_filter = ""  # 当前过滤文本
         self.current_category = "全部"  # 当前分类过滤
         self.data_manager = None  # 初始化数据管理器为None
@@ -166,7 +174,12 @@ class RoleManager(QWidget):
 
         self.role_search = QLineEdit()
         self.role_search.setPlaceholderText("输入角色名、标签或特征...")
-        self.role_search.textChanged.connect(self.filter_roles)
+        # 输入时防抖过滤，回车/搜索按钮立即过滤
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self._filter_timer.timeout.connect(self.search_roles)
+        self.role_search.textChanged.connect(self._filter_timer.start)
         self.role_search.returnPressed.connect(self.search_roles)  # 回车搜索
         search_layout.addWidget(self.role_search)
 
@@ -214,10 +227,12 @@ class RoleManager(QWidget):
         list_layout = QVBoxLayout(list_group)
 
         # 角色列表视图（显示详细信息）
-        self.role_list = QListWidget()
+        self.role_list = QListView()
         self.role_list.setObjectName("RoleListWidget")
-        self.role_list.setSelectionMode(QListWidget.SingleSelection)
-        self.role_list.itemClicked.connect(self.on_role_item_clicked)
+        self.role_list.setModel(self.role_proxy)
+        self.role_list.setUniformItemSizes(True)
+        self.role_list.setSelectionMode(QListView.SingleSelection)
+        self.role_list.clicked.connect(self.on_role_item_clicked)
         # 移除内联样式，使用外部QSS文件
         list_layout.addWidget(self.role_list)
 
@@ -589,64 +604,21 @@ class RoleManager(QWidget):
         ]
 
         # 添加角色到存储和UI
-        for role in sample_roles:
-            self.add_role(role["name"], role["category"], role)
+        self.role_model.add_roles({role["name"]: role for role in sample_roles})
 
     def add_role(self, name: str, category: str, role_data: Dict[str, Any] = None):
         """添加角色到存储和UI"""
         if role_data is None:
             role_data = {"name": name, "category": category}
 
-        # 存储到角色列表
-        self.all_roles[name] = role_data
-
-        # 检查是否符合当前过滤条件
-        if self._role_matches_filter(role_data):
-            item = self.create_role_list_item(name, role_data)
-            self.role_list.addItem(item)
+        # 存储到角色模型，过滤由代理模型处理
+        self.role_model.upsert_role(name, role_data)
 
     def filter_roles(self, text: str):
         """过滤角色（仅支持列表视图）"""
+        self._filter_timer.stop()
         self.current_filter = text.strip().lower()
-
-        # 刷新列表视图
-        self.refresh_role_list()
-
-    def _role_matches_filter(self, role_data: Dict[str, Any]) -> bool:
-        """检查角色是否匹配当前过滤条件"""
-        # 如果没有过滤文本，默认显示
-        if not self.current_filter:
-            return self._role_matches_category(role_data)
-
-        # 搜索文本
-        search_text = self.current_filter
-
-        # 搜索范围：角色名、描述、类型、性别等
-        searchable_fields = [
-            role_data.get("name", ""),
-            role_data.get("description", ""),
-            role_data.get("type", ""),
-            role_data.get("gender", ""),
-            role_data.get("category", ""),
-            role_data.get("personality_description", ""),
-            role_data.get("background_story", ""),
-            role_data.get("appearance", "")
-        ]
-
-        # 检查是否匹配搜索文本
-        for field in searchable_fields:
-            if search_text in field.lower():
-                return self._role_matches_category(role_data)
-
-        return False
-
-    def _role_matches_category(self, role_data: Dict[str, Any]) -> bool:
-        """检查角色是否匹配当前分类过滤"""
-        if self.current_category == "全部":
-            return True
-
-        role_category = role_data.get("category", "未分类")
-        return role_category == self.current_category
+        self.role_proxy.set_filter(self.current_filter, self.current_category)
 
     def search_roles(self):
         """搜索角色（响应搜索按钮点击或回车键）"""
@@ -658,18 +630,18 @@ class RoleManager(QWidget):
         self.current_category = category
 
         # 重新应用过滤
-        self.filter_roles(self.current_filter)
+        self.filter_roles(self.role_search.text())
 
     def on_category_selected(self, item, column):
         """分类选择处理"""
         category_name = item.text(0)
         self.filter_by_category(category_name)
 
-    def on_role_item_clicked(self, item):
+    def on_role_item_clicked(self, index: QModelIndex):
         """列表项点击处理"""
-        role_name = item.data(Qt.UserRole)
+        role_name = index.data(RoleListModel.NameRole)
         if not role_name:
-            role_name = item.text()
+            return
 
         self.load_role_details(role_name)
         self.current_role = role_name
@@ -767,30 +739,7 @@ class RoleManager(QWidget):
 
     def clear_role_list(self):
         """清除角色列表中的所有角色项"""
-        self.role_list.clear()
-
-    def refresh_role_list(self):
-        """刷新角色列表视图"""
-        self.clear_role_list()
-
-        # 添加符合当前过滤条件的角色到列表
-        for role_name, role_data in self.all_roles.items():
-            if self._role_matches_filter(role_data):
-                item = self.create_role_list_item(role_name, role_data)
-                self.role_list.addItem(item)
-
-    def create_role_list_item(self, name: str, role_data: Dict[str, Any]) -> QListWidgetItem:
-        """创建角色列表项"""
-        item = QListWidgetItem()
-        item.setText(name)
-        item.setData(Qt.UserRole, name)
-        item.setSizeHint(self.role_list_item_size())
-        return item
-
-    def role_list_item_size(self):
-        """设置角色列表项大小"""
-        from PySide6.QtCore import QSize
-        return QSize(0, 70)
+        self.role_model.clear()
 
     def on_basic_info_changed(self):
         """基本信息变更"""
@@ -854,13 +803,10 @@ class RoleManager(QWidget):
                 # 确保分类写回
                 role_data["category"] = role_data.get("category", "未分类")
 
-            # 保存到内存中的角色列表
-            self.all_roles[role_name] = role_data
+            # 保存到内存中的角色列表（模型只更新这一行）
+            self.role_model.upsert_role(role_name, role_data)
             self.current_role = role_name
 
-            # 刷新角色列表
-            self.refresh_role_list()
-
             # 保存到项目文件
             if hasattr(self, 'save_roles'):
                 self.save_roles()
@@ -891,16 +837,13 @@ class RoleManager(QWidget):
         if reply == QMessageBox.Yes:
             # 从 all_roles 中删除角色
             if self.current_role in self.all_roles:
-                del self.all_roles[self.current_role]
+                self.role_model.remove_role(self.current_role)
                 # 保存更新后的角色列表
                 if hasattr(self, 'save_roles'):
                     self.save_roles()
 
             self.role_deleted.emit(self.current_role)
 
-            # 刷新角色列表
-            self.refresh_role_list()
-
             # 清空编辑器
             self.clear_editor()
 
@@ -1008,8 +951,7 @@ class RoleManager(QWidget):
             }
 
             # 写入文件
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(final_data, f, ensure_ascii=False, indent=2)
+            atomic_write_json(file_path, final_data)
 
             file_name = os.path.basename(file_path)
             show_info_dialog(
@@ -1025,88 +967,64 @@ class RoleManager(QWidget):
             show_error_dialog(self, "错误", f"导出角色失败:\n{str(e)}")
 
     def import_role(self):
-        """导入角色"""
-        from PySide6.QtWidgets import QFileDialog, QMessageBox
-        import json
-        import os
-
-        try:
-            # 打开文件选择对话框
-            file_path, _ = QFileDialog.getOpenFileName(
-                self,
-                "导入角色",
-                "",
-                "JSON文件 (*.json);;所有文件 (*)"
-            )
-
-            if not file_path:
-                return
-
-            # 检查文件是否存在
-            if not os.path.exists(file_path):
-                show_error_dialog(self, "错误", "选择的文件不存在")
-                return
-
-            # 读取并解析JSON文件
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+        """导入角色（文件在导入对话框的后台线程中解析，选中的角色再加入项目）"""
+        from ..dialogs.role_import_dialog import RoleImportDialog
 
-            # 处理不同的数据格式
-            roles_to_import = {}
-
-            if "metadata" in data and "roles" in data:
-                # 格式1: 包含元信息
-                roles_to_import = data["roles"]
-            elif isinstance(data, dict) and any(k for k in data.keys() if k != "metadata"):
-                # 格式2: 直接是角色字典
-                roles_to_import = data
-            else:
-                show_error_dialog(self, "错误", "无效的角色数据格式")
-                return
+        dialog = RoleImportDialog(self)
+        dialog.roles_imported.connect(
+            lambda roles: self.add_imported_roles(roles, dialog.overwrite_existing.isChecked())
+        )
+        dialog.exec()
+        dialog.deleteLater()
 
-            if not roles_to_import:
-                show_error_dialog(self, "错误", "文件中没有找到角色数据")
-                return
+    def add_imported_roles(self, roles: List[Dict[str, Any]], overwrite: bool = False):
+        """
+        将导入对话框选中的角色加入项目
 
-            # 处理重复的角色名
+        Args:
+            roles: 角色数据列表（以 name 字段为角色名）
+            overwrite: 是否覆盖同名角色，否则重命名为“xxx(导入)”
+        """
+        try:
             imported_count = 0
             skipped_count = 0
-            for role_name, role_data in roles_to_import.items():
+            new_roles = {}
+            for role_data in roles:
+                role_name = str(role_data.get("name", "")).strip()
+                if not role_name:
+                    skipped_count += 1
+                    continue
+
                 # 检查角色名是否已存在
-                if role_name in self.all_roles:
+                if not overwrite and (role_name in self.all_roles or role_name in new_roles):
                     # 生成新名称
                     new_name = f"{role_name}(导入)"
                     counter = 1
-                    while new_name in self.all_roles:
+                    while new_name in self.all_roles or new_name in new_roles:
                         new_name = f"{role_name}(导入{counter})"
                         counter += 1
+                    role_name = new_name
 
-                    # 更新角色名
-                    role_data["name"] = new_name
-                    self.add_role(new_name, role_data.get("category", "未分类"), role_data)
-                    imported_count += 1
-                else:
-                    # 直接添加
-                    self.add_role(role_name, role_data.get("category", "未分类"), role_data)
-                    imported_count += 1
+                role_data["name"] = role_name
+                new_roles[role_name] = role_data
+                imported_count += 1
+
+            # 一次性插入，列表只更新一次
+            self.role_model.add_roles(new_roles)
 
             # 保存到项目
             if hasattr(self, 'save_roles'):
                 self.save_roles()
 
-            file_name = os.path.basename(file_path)
             show_info_dialog(
                 self,
                 "成功",
                 f"角色导入完成！\n\n"
-                f"文件: {file_name}\n"
                 f"成功导入: {imported_count} 个角色\n"
                 f"跳过: {skipped_count} 个角色\n"
                 f"总角色数: {len(self.all_roles)}"
             )
 
-        except json.JSONDecodeError as e:
-            show_error_dialog(self, "错误", f"JSON格式错误:\n{str(e)}")
         except Exception as e:
             show_error_dialog(self, "错误", f"导入角色失败:\n{str(e)}")
 
@@ -1411,9 +1329,8 @@ class RoleManager(QWidget):
             if hasattr(self.data_manager, 'load_roles'):
                 roles_data = self.data_manager.load_roles()
                 if roles_data:
-                    # 加载保存的角色
-                    for role_name, role_data in roles_data.items():
-                        self.add_role(role_name, role_data.get("category", "未分类"), role_data)
+                    # 加载保存的角色（模型整体重置一次）
+                    self.role_model.set_roles(roles_data)
                     logger.info(f"已加载 {len(roles_data)} 个项目角色")
                 else:
                     # 如果没有保存的角色数据，加载示例数据
@@ -1426,33 +1343,31 @@ class RoleManager(QWidget):
             show_error_dialog(self, "加载错误", f"加载项目角色数据失败:\n{str(e)}\n\n将使用示例角色数据")
             self.load_sample_data()
 
+    def apply_project(self, snapshot):
+        """
+        使用后台读取好的项目数据，不在主线程访问磁盘
+
+        Args:
+            snapshot: ProjectSnapshot（见 ui_qt.project_loader）
+        """
+        self.current_project_path = snapshot.project_path
+        self.data_manager = snapshot.data_manager
+        self.clear_all_roles()
+        if snapshot.roles:
+            self.role_model.set_roles(snapshot.roles)
+            logger.info(f"已加载 {len(snapshot.roles)} 个项目角色")
+        else:
+            self.load_sample_data()
+            logger.info("未找到项目角色数据，已加载示例角色")
+
     def clear_all_roles(self):
         """清除所有角色"""
-        self.all_roles.clear()
         self.clear_role_list()
 
     def refresh_role_list(self):
-        """刷新角色列表显示"""
-        # 保存当前选中的角色
-        current_item = self.role_list.currentItem()
-        current_role_name = None
-        if current_item:
-            current_role_name = current_item.text().split(" - ")[0]
-        
-        # 清除列表显示
-        self.clear_role_list()
-        
-        # 重新添加所有符合过滤条件的角色
-        for role_name, role_data in self.all_roles.items():
-            if self._role_matches_filter(role_data):
-                item = self.create_role_list_item(role_name, role_data)
-                self.role_list.addItem(item)
-                # 如果是之前选中的角色，重新选中
-                if current_role_name and role_name == current_role_name:
-                    self.role_list.setCurrentItem(item)
-        
-        logger.info(f"角色列表已刷新，显示 {self.role_list.count()} 个角色")
-
+        """刷新角色列表显示（按当前搜索文本和分类重新过滤）"""
+        self.filter_roles(self.role_search.text())
+        logger.info(f"角色列表已刷新，显示 {self.role_proxy.rowCount()} 个角色")
 
     def save_roles(self):
         """保存角色数据到项目"""
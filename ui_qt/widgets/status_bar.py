@@ -12,6 +12,8 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import QTimer, Signal, QObject
 from PySide6.QtGui import QFont
 
+from ..utils.theme_manager import register_polish_widget
+
 
 class StatusBar(QStatusBar):
     """自定义状态栏组件"""
@@ -50,6 +52,8 @@ class StatusBar(QStatusBar):
         # 创建生成状态指示器
         self.generation_status = QLabel("空闲")
         self.generation_status.setObjectName("GenerationStatusIndicator")
+        # 样式依赖 status 动态属性，主题切换后需要重新 polish
+        register_polish_widget(self.generation_status)
         self.generation_status.setStyleSheet("""
             QLabel {
                 padding: 2px 8px;
@@ -148,9 +152,21 @@ class StatusBar(QStatusBar):
         else:
             self.progress_bar.hide()
 
+    def set_busy(self, message: str):
+        """显示不确定进度的忙碌状态（如后台加载项目）
+
+        Args:
+            message: 状态消息
+        """
+        self.show_message(message)
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setFormat("")
+        self.progress_bar.show()
+
     def hide_progress(self):
         """隐藏进度条"""
         self.progress_bar.hide()
+        self.progress_bar.setRange(0, 100)
 
     def set_project_path(self, path: str):
         """设置项目路径
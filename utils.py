@@ -3,6 +3,7 @@
 import os
 import json
 from typing import Optional
+from storage import atomic_write_text, atomic_write_json, atomic_write_many
 
 def read_file(filename: str) -> str:
     """读取文件的全部内容，若文件不存在或异常则返回空字符串。"""
@@ -28,26 +29,39 @@ def append_text_to_file(text_to_append: str, file_path: str):
         print(f"[append_text_to_file] 发生错误：{e}")
 
 def clear_file_content(filename: str):
-    """清空指定文件内容。"""
+    """清空指定文件内容（原子写入空文件）。"""
     try:
-        with open(filename, 'w', encoding='utf-8') as file:
-            pass
+        atomic_write_text(filename, "")
     except IOError as e:
         print(f"[clear_file_content] 无法清空文件 '{filename}' 的内容：{e}")
 
 def save_string_to_txt(content: str, filename: str):
-    """将字符串保存为 txt 文件（覆盖写）。"""
+    """将字符串原子地保存为 txt 文件（覆盖写），无需先 clear_file_content。"""
     try:
-        with open(filename, 'w', encoding='utf-8') as file:
-            file.write(content)
+        atomic_write_text(filename, content)
     except Exception as e:
         print(f"[save_string_to_txt] 保存文件时发生错误: {e}")
 
+def save_strings_to_txt_atomic(file_contents: dict) -> bool:
+    """
+    将一组文本文件原子地保存（覆盖写）。
+    全部写入临时文件并 fsync 后再替换目标文件，重命名过程有日志保护（见 storage.atomic_write_many）；
+    任一写入失败则目标文件保持原样。
+
+    Args:
+        file_contents: {文件路径: 文本内容}
+    """
+    try:
+        atomic_write_many(file_contents)
+        return True
+    except Exception as e:
+        print(f"[save_strings_to_txt_atomic] 保存文件时发生错误: {e}")
+        return False
+
 def save_data_to_json(data: dict, file_path: str) -> bool:
     """将数据保存到 JSON 文件。"""
     try:
-        with open(file_path, 'w', encoding='utf-8') as json_file:
-            json.dump(data, json_file, ensure_ascii=False, indent=4)
+        atomic_write_json(file_path, data, indent=4)
         return True
     except Exception as e:
         print(f"[save_data_to_json] 保存数据到JSON文件时出错: {e}")